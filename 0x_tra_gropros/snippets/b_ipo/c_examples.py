@@ -46,11 +46,15 @@ Additional Notes
 """
 
 from dataclasses import dataclass, replace
-from typing import Self, Iterator, Callable
+from typing import Self, Iterator, AsyncIterator, Callable
 
 from utils import print_function_header
 
+import asyncio
+import json
+import numpy as np
 import sys
+import tempfile
 import time
 
 import logging
@@ -59,7 +63,9 @@ logging.getLogger('ipo').setLevel(logging.DEBUG)
 
 from contextvars import ContextVar
 
-from gropro import Producer, Processor, Consumer, IPO, Tee, Merge, Chain, ipo_context
+from gropro import (Producer, Processor, Consumer, IPO, Tee, Merge, Chain, Execution, ipo_context,
+                    AsyncIPO, AsyncProducer, AsyncConsumer, Fold, Best,
+                    Trace, Profiler, trace_ctx, CachedProcessor, Journal)
 
 # pylint: disable=too-few-public-methods
 # pylint: disable=missing-class-docstring
@@ -118,6 +124,13 @@ class SquarePlusOneProcessor(Processor[SquarePlusOneSolution]):
         y = process_data.x ** 2 + 1
         return replace(process_data, y=y)
 
+    def apply_batch(self, batch: list[SquarePlusOneSolution]) -> list[SquarePlusOneSolution]:
+        # one vectorized call for the whole batch; like apply, new objects
+        # are returned and the batch items are left as they are
+        xs = np.fromiter((process_data.x for process_data in batch), dtype=np.int64, count=len(batch))
+        return [replace(process_data, y=y)
+                for process_data, y in zip(batch, (xs * xs + 1).tolist(), strict=True)]
+
 
 class Console(Consumer):
     def write(self, output_data: SquarePlusOneResult) -> None:
@@ -165,7 +178,8 @@ def solve_with_file_io():
             self.folder = folder
 
         def read(self, input_data: SquarePlusOneSpec) -> Iterator[SquarePlusOneSpec]:
-            folder_data = ((x+1,self.folder+"/"+filename) for x,filename in enumerate(("data1.in","data2.in","data3.in")))
+            folder_data = ((x+1,self.folder+"/"+filename)
+                           for x,filename in enumerate(("data1.in","data2.in","data3.in")))
             for x,filename in folder_data:
                 yield SquarePlusOneSpec(source=filename, x=x)
 
@@ -266,6 +280,36 @@ def solve_with_multiple_input_and_output():
         output=Console()
     ).solve()
 
+    class Sorted(Producer[SquarePlusOneSpec]):
+        def __init__(self, source: str, xs: list[int]) -> None:
+            self.source, self.xs = source, xs
+
+        def read(self, input_data: SquarePlusOneSpec) -> Iterator[SquarePlusOneSpec]:
+            for x in self.xs:
+                yield replace(input_data, source=self.source, x=x)
+
+    print(" 3| streamed input, k-way merged by x")
+    SquarePlusOneProblem.of(
+        input=Merge(Sorted("a.in", [1, 4, 7]), Sorted("b.in", [2, 3, 9]), strategy="kmerge", key=lambda d: d.x),
+        process=SquarePlusOneProcessor(),
+        output=Console()
+    ).solve()
+
+    class SlowLogfile(Logfile):
+        def write(self, output_data: SquarePlusOneResult) -> None:
+            time.sleep(0.05)
+            super().write(output_data)
+
+        def close(self) -> None:
+            print("flush 'log'")
+
+    print(" 4| buffered output, each sink on its own thread")
+    SquarePlusOneProblem.of(
+        input=Sorted("a.in", [1, 2, 3]),
+        process=SquarePlusOneProcessor(),
+        output=Tee(Console(), SlowLogfile(), buffer=8, overflow="block")
+    ).solve()
+
 
 @print_function_header
 def solve_with_chained_processors():
@@ -320,6 +364,244 @@ def solve_with_parallel_processors():
     ).solve()
 
 
+@print_function_header
+def solve_with_execution_modes():
+    """ run processor.apply on a pool, producer and consumer stay on this thread """
+
+    class SleepyProcessor(Processor[SquarePlusOneSolution]):
+        def apply(self, process_data: SquarePlusOneSolution) -> SquarePlusOneSolution:
+            time.sleep(0.1 * (5 - process_data.x))      # later items finish earlier
+            return replace(process_data, y=process_data.x ** 2 + 1)
+
+    class RangeData(Producer[SquarePlusOneSpec]):
+        def read(self, input_data: SquarePlusOneSpec) -> Iterator[SquarePlusOneSpec]:
+            for x in range(5):
+                yield replace(input_data, source=f"range[{x}]", x=x)
+
+    print(" 1| threads, input order kept")
+    SquarePlusOneProblem.of(
+        input=RangeData(),
+        process=SleepyProcessor(),
+        output=Console(),
+        execute=Execution(mode="thread", workers=4, window=8),
+    ).solve()
+
+    print(" 2| threads, as completed")
+    SquarePlusOneProblem.of(
+        input=RangeData(),
+        process=SleepyProcessor(),
+        output=Console(),
+    ).execute(Execution(mode="thread", workers=4, ordered=False)).solve()
+
+
+@print_function_header
+def solve_in_batches():
+    """ micro-batches: one apply_batch call per batch_size items """
+
+    class RangeData(Producer[SquarePlusOneSpec]):
+        def __init__(self, n: int) -> None:
+            self.n = n
+
+        def read(self, input_data: SquarePlusOneSpec) -> Iterator[SquarePlusOneSpec]:
+            for x in range(self.n):
+                yield SquarePlusOneSpec(source="range", x=x)
+
+    class Sum(Consumer[SquarePlusOneResult]):
+        def __init__(self) -> None:
+            self.total = 0
+        def write(self, output_data: SquarePlusOneResult) -> None:
+            self.total += output_data.y
+
+    logging.getLogger('ipo').setLevel(logging.INFO)
+    for step, batch_size in enumerate((1, 1000), start=1):
+        total = Sum()
+        t0 = time.perf_counter()
+        SquarePlusOneProblem.of(
+            input=RangeData(100_000),
+            process=Chain(SquarePlusOneProcessor()),
+            output=total,
+            execute=Execution(batch_size=batch_size),
+        ).solve()
+        dt_ms = (time.perf_counter() - t0) * 1000
+        print(f" {step}| batch_size={batch_size}: sum={total.total}, {dt_ms:.1f} ms")
+    logging.getLogger('ipo').setLevel(logging.DEBUG)
+
+
+class SquarePlusOneAsyncProblem(AsyncIPO[SquarePlusOneSpec, SquarePlusOneSolution, SquarePlusOneResult]):
+    pass
+
+
+@print_function_header
+def solve_async():
+    """ slow source and slow sink overlap instead of adding up """
+
+    class SlowSource(AsyncProducer[SquarePlusOneSpec]):
+        async def read(self, input_data: SquarePlusOneSpec) -> AsyncIterator[SquarePlusOneSpec]:
+            for x in range(5):
+                await asyncio.sleep(0.1)                # e.g. a network read
+                yield SquarePlusOneSpec(source="net", x=x)
+
+    class SlowSink(AsyncConsumer[SquarePlusOneResult]):
+        async def write(self, output_data: SquarePlusOneResult) -> None:
+            await asyncio.sleep(0.1)                    # e.g. a database insert
+            print(f"write '{output_data}' to 'db'")
+
+    print(" 1| async stages, sync processor in a thread")
+    t0 = time.perf_counter()
+    asyncio.run(SquarePlusOneAsyncProblem.of(
+        input=SlowSource(),
+        process=SquarePlusOneProcessor(),
+        output=SlowSink(),
+        queue_size=2,
+    ).solve())
+    print(f"    {time.perf_counter() - t0:.2f} s (~0.6 s overlapped, 1.0 s serial)")
+
+
+@print_function_header
+def solve_with_cache():
+    """ skip expensive processors for inputs seen before """
+
+    class ExpensiveProcessor(Processor[SquarePlusOneSolution]):
+        def apply(self, process_data: SquarePlusOneSolution) -> SquarePlusOneSolution:
+            time.sleep(0.1)
+            return replace(process_data, y=process_data.x ** 2 + 1)
+
+    class RepeatedData(Producer[SquarePlusOneSpec]):
+        def read(self, input_data: SquarePlusOneSpec) -> Iterator[SquarePlusOneSpec]:
+            for x in (2, 3, 2, 2, 3):
+                yield replace(input_data, source="repeated", x=x)
+
+    print(" 1| in-memory LRU")
+    cached = CachedProcessor(ExpensiveProcessor(), maxsize=16)
+    t0 = time.perf_counter()
+    SquarePlusOneProblem.of(
+        input=RepeatedData(),
+        process=cached,
+        output=Console()
+    ).solve()
+    print(f"    {time.perf_counter() - t0:.2f} s, {cached.stats}")
+
+
+@print_function_header
+def solve_with_checkpoint():
+    """ resume a crashed run from its journal """
+
+    class RangeData(Producer[SquarePlusOneSpec]):
+        def read(self, input_data: SquarePlusOneSpec) -> Iterator[SquarePlusOneSpec]:
+            for x in range(5):
+                yield replace(input_data, source=f"range[{x}]", x=x)
+
+    class FlakyProcessor(Processor[SquarePlusOneSolution]):
+        def __init__(self, crash_at: int | None) -> None:
+            self.crash_at = crash_at
+        def apply(self, process_data: SquarePlusOneSolution) -> SquarePlusOneSolution:
+            if process_data.x == self.crash_at:
+                raise RuntimeError(f"crash at x={process_data.x}")
+            return replace(process_data, y=process_data.x ** 2 + 1)
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = f"{folder}/run.journal"
+
+        print(" 1| first run dies")
+        try:
+            with Journal(path) as journal:
+                SquarePlusOneProblem.of(
+                    input=RangeData(),
+                    process=FlakyProcessor(crash_at=3),
+                    output=Console(),
+                    checkpoint=journal,
+                ).solve()
+        except RuntimeError as e:
+            print(f"    {e}")
+
+        print(" 2| second run resumes, only x=3 and x=4 are processed, x=0..2 are written from the journal")
+        with Journal(path) as journal:
+            results = SquarePlusOneProblem.of(
+                input=RangeData(),
+                process=FlakyProcessor(crash_at=None),
+                output=Console(),
+                checkpoint=journal,
+            ).solve()
+        print(f"    {len(results)} results: {[result.y for result in results]}")
+
+
+@print_function_header
+def solve_with_summary():
+    """ run() keeps no results, only statistics and reduced values """
+
+    class RangeData(Producer[SquarePlusOneSpec]):
+        def read(self, input_data: SquarePlusOneSpec) -> Iterator[SquarePlusOneSpec]:
+            for x in range(-3, 4):
+                yield replace(input_data, source=f"range[{x}]", x=x)
+
+    class SkipNegatives(Processor[SquarePlusOneSolution]):
+        def apply(self, process_data: SquarePlusOneSolution) -> SquarePlusOneSolution:
+            if process_data.x < 0:
+                raise ValueError("negative x")
+            return replace(process_data, y=process_data.x ** 2 + 1)
+
+    print(" 1| run with reducers, errors skipped")
+    logging.getLogger('ipo').setLevel(logging.ERROR)
+    summary = SquarePlusOneProblem.of(
+        input=RangeData(),
+        process=SkipNegatives(),
+        output=Console(),
+        execute=Execution(errors="skip"),
+    ).run(Fold(lambda acc, result: acc + result.y, 0, name="sum_y"), Best(lambda result: result.y, largest=True))
+    logging.getLogger('ipo').setLevel(logging.DEBUG)
+    print(f"    {summary.count=}, {summary.errors=}, {summary.wall_time=:.6f}")
+    print(f"    {summary.reduced=}")
+
+
+@print_function_header
+def solve_with_trace():
+    """ structured timings instead of formatted debug strings """
+
+    print(" 1| trace, logging off")
+    logging.getLogger('ipo').setLevel(logging.INFO)
+    trace = Trace()
+    with ipo_context(trace_ctx, trace):
+        SquarePlusOneProblem.of(
+            input=Merge(ConfigData(initial_x=2), ConfigData(initial_x=3)),
+            process=Chain(SquarePlusOneProcessor(), SquarePlusOneProcessor()),
+            output=Console()
+        ).solve()
+    logging.getLogger('ipo').setLevel(logging.DEBUG)
+
+    for event in trace.events:
+        print(f"    {event.stage:<8} {event.component:<24} {event.seconds * 1e6:8.1f} µs {event.size:>5} B")
+
+
+@print_function_header
+def solve_with_profiler():
+    """ per-component latency percentiles, throughput and queue depths """
+
+    class RangeData(Producer[SquarePlusOneSpec]):
+        def read(self, input_data: SquarePlusOneSpec) -> Iterator[SquarePlusOneSpec]:
+            for x in range(200):
+                yield replace(input_data, source=f"range[{x}]", x=x)
+
+    class Archive(Consumer):
+        def write(self, output_data: SquarePlusOneResult) -> None:
+            time.sleep(0.0002)
+
+    print(" 1| profiled run, 4 threads, buffered output")
+    logging.getLogger('ipo').setLevel(logging.INFO)
+    with tempfile.TemporaryDirectory() as tmp:
+        profiler = Profiler(path=f"{tmp}/profile.json")
+        with ipo_context(trace_ctx, profiler):
+            SquarePlusOneProblem.of(
+                input=RangeData(),
+                process=Chain(SquarePlusOneProcessor(), SquarePlusOneProcessor()),
+                output=Tee(Archive(), Archive(), buffer=8),
+                execute=Execution(mode="thread", workers=4)
+            ).drain()
+        with open(profiler.path, encoding="utf-8") as file:
+            print(f" 2| report written, {len(json.load(file)['stages'])} components")
+    logging.getLogger('ipo').setLevel(logging.DEBUG)
+    print(profiler.format())
+
+
 @print_function_header
 def solve_in_stages():
     """ Stage 1: x → x²+1 ;  Stage 2: y → 2·y .  Output of stage 1 becomes input of stage 2. """
@@ -443,6 +725,14 @@ if __name__ == "__main__":
     solve_with_multiple_input_and_output()
     solve_with_chained_processors()
     solve_with_parallel_processors()
+    solve_with_execution_modes()
+    solve_in_batches()
+    solve_async()
+    solve_with_cache()
+    solve_with_checkpoint()
+    solve_with_summary()
+    solve_with_trace()
+    solve_with_profiler()
     solve_in_stages()
     solve_with_runtime_args()
     solve_with_incomplete_pipeline()
@@ -6,11 +6,18 @@ Solve the crossword task using the IPO structure.
 
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from array import array
 from dataclasses import dataclass, field
-from typing import Self, Sequence, Iterator
+from operator import itemgetter
+from typing import Callable, Self, Sequence, Iterator
+import multiprocessing
+import os
 import random
+import sys
+import time
 
-from gropro import Producer, Processor, Consumer, IPO
+from gropro import Producer, Processor, Consumer, IPO, Execution, CachedProcessor
 
 
 """
@@ -48,54 +55,84 @@ class InputData:
 # A placement records 'where and how' a single word ended up on the grid:
 # (word_idx, row, col, vertical?). The word_idx refers into ProcessData.words /
 # OutputData.words — using an index keeps inner-loop comparisons cheap and
-# makes lookup of the precomputed char_dist/keys O(1).
+# makes lookup of the precomputed crossing table O(1).
 Placement = tuple[int, int, int, bool]
 
+# A legal next placement of a given word, as collected by the solver:
+# (bbox area, bbox, row, col, vertical?) with bbox = (min_y, max_y, min_x, max_x)
+# of the grid after placing it.
+Option = tuple[int, tuple[int, int, int, int], int, int, bool]
+
 @dataclass
 class ProcessData:
     """ working state of the backtracking solver """
     words: list[str]
 
-    # precomputed per-word indexes (filled by the solver's apply()):
-    #   char_dist[i][c] = list of indices in words[i] where character c appears
-    #   keys[i]         = set of distinct characters in words[i]
-    # These are exactly the WordData fields from the reference solution; we
-    # keep them on ProcessData so the solver can use them without smuggling
-    # state outside of the IPO data flow.
-    char_dist: list[dict[str, list[int]]] = field(default_factory=list)
-    keys: list[set[str]] = field(default_factory=list)
-
-    # current attempt (mutated during backtracking)
-    grid: dict[tuple[int, int], str] = field(default_factory=dict)
-    # cells covered specifically by horizontal / vertical placements; the
-    # flanking-cell embedding check needs to know the direction of an
-    # already-occupied cell (a horizontal word can sit right next to a
-    # perpendicular vertical word without 'extending' it).
-    h_cells: set[tuple[int, int]] = field(default_factory=set)
-    v_cells: set[tuple[int, int]] = field(default_factory=set)
+    # precomputed per-word-pair indexes (filled by the solver's apply()):
+    #   crossings[i][j] = every (k, m) with words[i][k] == words[j][m], i.e.
+    #                     every way words[i] can cross words[j]
+    #   partners[i]     = indices of the other words sharing a character with words[i]
+    # We keep them on ProcessData so the solver can use them without
+    # smuggling state outside of the IPO data flow.
+    crossings: list[list[tuple[tuple[int, int], ...]]] = field(default_factory=list)
+    partners: list[set[int]] = field(default_factory=list)
+
+    # current attempt (mutated during backtracking), on a preallocated flat
+    # board: cell (y, x) lives at index origin + y*stride + x, with (0,0) in
+    # the middle and room for every word in every direction, so a cell test
+    # is one array lookup instead of hashing a coordinate tuple.
+    #   alphabet[code] = character, code 0 is the empty cell
+    #   codes[i]       = words[i] encoded as bytes over alphabet
+    #   grid[cell]     = code of the letter on that cell, 0 if empty
+    #   dirs[cell]     = H_BIT / V_BIT if covered by a horizontal / vertical
+    #                    placement; the flanking-cell embedding check needs the
+    #                    direction of an occupied cell (a horizontal word can
+    #                    sit right next to a perpendicular vertical word
+    #                    without 'extending' it).
+    alphabet: str = ""
+    codes: list[bytes] = field(default_factory=list)
+    stride: int = 0
+    origin: int = 0
+    grid: bytearray = field(default_factory=bytearray)
+    dirs: bytearray = field(default_factory=bytearray)
     placements: list[Placement] = field(default_factory=list)
     used: set[int] = field(default_factory=set)
-    # parallel stack: which cells were *newly added* by each placement,
-    # so that an unplace step touches only those cells (O(len(word))
-    # rather than rebuilding the whole grid).
-    owned_stack: list[list[tuple[int, int]]] = field(default_factory=list)
-    # parallel stack of all cells (newly added or crossed) belonging to each
-    # placement; used to undo h_cells/v_cells on backtrack.
-    all_cells_stack: list[list[tuple[int, int]]] = field(default_factory=list)
-    # current bounding box, kept O(1)-fresh via a stack
-    # (min_y, max_y, min_x, max_x); empty when no word placed yet.
-    bounds_stack: list[tuple[int, int, int, int]] = field(default_factory=list)
+    # current bounding box (min_y, max_y, min_x, max_x), updated per placement
+    bounds: tuple[int, int, int, int] = (0, 0, 0, 0)
+    # undo log ('trail'), preallocated for all words: per placement the cells
+    # it newly covered, the bbox before it and the number of those cells, so
+    # that an unplace step touches only those cells (O(len(word)) rather than
+    # rebuilding the whole grid). trail_top is the fill level.
+    trail: array = field(default_factory=lambda: array('i'))
+    trail_top: int = 0
+    # transposition table: canonical keys of the partial grids already
+    # searched (see CrosswordSolver._canonical), at most
+    # CrosswordSolver.table_size of them
+    seen: set[bytes] = field(default_factory=set)
+    # search nodes visited so far, and the time.monotonic() at which an
+    # anytime search stops (None for no time budget); the clock is shared
+    # by the processes of the pool
+    nodes: int = 0
+    deadline: float | None = None
 
     # best result so far
     best_size: int = 0
-    best_grid: dict[tuple[int, int], str] = field(default_factory=dict)
+    best_grid: bytes = b""      # letter codes inside best_bounds, row by row
     best_bounds: tuple[int, int, int, int] = (0, 0, 0, 0)  # min_y, max_y, min_x, max_x
     best_placements: list[Placement] = field(default_factory=list)
+    optimal: bool = False       # False if the search stopped at its budget
 
     @classmethod
     def of(cls, input_data: InputData) -> Self:
         return cls(words=list(input_data.words))
 
+    def best_cells(self) -> dict[tuple[int, int], str]:
+        """ the occupied cells of the best grid as (y, x) -> character """
+        min_y, max_y, min_x, max_x = self.best_bounds
+        width = max_x - min_x + 1
+        return {(min_y + k // width, min_x + k % width): self.alphabet[code]
+                for k, code in enumerate(self.best_grid) if code}
+
 
 @dataclass
 class OutputData:
@@ -107,6 +144,7 @@ class OutputData:
     best_grid: dict[tuple[int, int], str]
     best_bounds: tuple[int, int, int, int]
     best_placements: list[Placement]
+    optimal: bool = True
 
     @classmethod
     def of(cls, input_data: InputData, process_data: ProcessData) -> Self:
@@ -115,9 +153,10 @@ class OutputData:
             comment=input_data.comment,
             words=input_data.words,
             best_size=process_data.best_size,
-            best_grid=dict(process_data.best_grid),
+            best_grid=process_data.best_cells(),
             best_bounds=process_data.best_bounds,
             best_placements=list(process_data.best_placements),
+            optimal=process_data.optimal,
         )
 
 """
@@ -126,7 +165,8 @@ Producers
   - StreamProducer   : a sequence of (source, textblock) pairs
 
 Consumers
-  - ConsoleConsumer  : pretty-print the result table to stdout
+  - ConsoleConsumer       : pretty-print the result table to stdout
+  - BatchedWriterConsumer : the same text, written in batches to a file or stdout
 """
 
 class StreamProducer(Producer[InputData]):
@@ -142,32 +182,45 @@ class StreamProducer(Producer[InputData]):
 
 def _render_grid(grid: dict[tuple[int, int], str],
                  bounds: tuple[int, int, int, int],
-                 fill: str = " ") -> str:
-    """ render the grid in the task's '|---' table style; `fill` for empty cells """
+                 fill: str = " ",
+                 rng: random.Random | None = None) -> str:
+    """ render the grid in the task's '|---' table style; `fill` for empty cells,
+    or random letters from rng for the 'Buchstabensalat' filler
+
+    One row buffer per grid row is filled from the grid's cells, then every
+    row is joined once, instead of one lookup and f-string per cell.
+    """
     min_y, max_y, min_x, max_x = bounds
     width = max_x - min_x + 1
-    sep = "|".join(["---"] * width)
-
-    rows: list[str] = []
-    for y in range(min_y, max_y + 1):
-        cells = [f" {grid.get((y, x), fill)} " for x in range(min_x, max_x + 1)]
-        rows.append("|".join(cells))
-        if y != max_y:
-            rows.append(sep)
-    return "\n".join(rows)
-
+    rows: list[list[str | None]] = [[None] * width for _ in range(max_y - min_y + 1)]
+    for (y, x), ch in grid.items():
+        if min_y <= y <= max_y and min_x <= x <= max_x:
+            rows[y - min_y][x - min_x] = ch
+    for row in rows:                        # row-major, like the order of the random letters
+        for k, ch in enumerate(row):
+            if ch is None:
+                row[k] = fill if rng is None else chr(ord('A') + rng.randint(0, 25))
+    sep = "\n" + "|".join(["---"] * width) + "\n"
+    return sep.join(" " + " | ".join(row) + " " for row in rows)
+
+
+def _format_result(d: OutputData, with_filled: bool, seed: int | None) -> str:
+    """ the complete text block of one result, ending with a newline """
+    lines = [d.comment, f"Wörter: {', '.join(d.words)}", ""]
+    if d.best_size == 0:
+        if d.optimal:
+            lines.append("Lösung: keine gefunden (keine gemeinsamen Buchstaben?).")
+        else:
+            lines.append("Lösung: keine gefunden, das Suchbudget war vorher erschöpft.")
+        return "\n".join(lines) + "\n"
 
-def _filled_grid(grid: dict[tuple[int, int], str],
-                 bounds: tuple[int, int, int, int],
-                 rng: random.Random) -> dict[tuple[int, int], str]:
-    """ copy of grid where all blank cells are stuffed with random letters """
-    min_y, max_y, min_x, max_x = bounds
-    out = dict(grid)
-    for y in range(min_y, max_y + 1):
-        for x in range(min_x, max_x + 1):
-            if (y, x) not in out:
-                out[(y, x)] = chr(ord('A') + rng.randint(0, 25))
-    return out
+    lines += ["Lösung:", "", _render_grid(d.best_grid, d.best_bounds)]
+    if with_filled:
+        lines += ["", "Aufgefüllt:", "", _render_grid(d.best_grid, d.best_bounds, rng=random.Random(seed))]
+    lines += ["", f"Diese Lösung nimmt {d.best_size} Felder ein."]
+    if not d.optimal:
+        lines.append("(Suche am Suchbudget abgebrochen, Optimalität nicht bewiesen.)")
+    return "\n".join(lines) + "\n"
 
 
 class ConsoleConsumer(Consumer[OutputData]):
@@ -178,45 +231,59 @@ class ConsoleConsumer(Consumer[OutputData]):
         self.seed = seed
 
     def write(self, output_data: OutputData) -> None:
-        d = output_data
-        print(d.comment)
-        print(f"Wörter: {', '.join(d.words)}")
-        print()
+        print(_format_result(output_data, self.with_filled, self.seed), end="")
 
-        if d.best_size == 0:
-            print("Lösung: keine gefunden (keine gemeinsamen Buchstaben?).")
-            return
 
-        print("Lösung:")
-        print()
-        print(_render_grid(d.best_grid, d.best_bounds))
+class BatchedWriterConsumer(Consumer[OutputData]):
+    """ like ConsoleConsumer, but collects the rendered results and writes
+    batch_size of them at once, to a file or to stdout """
 
-        if self.with_filled:
-            rng = random.Random(self.seed)
-            print()
-            print("Aufgefüllt:")
-            print()
-            print(_render_grid(_filled_grid(d.best_grid, d.best_bounds, rng),
-                               d.best_bounds))
+    def __init__(self, path: str | os.PathLike | None = None, *,
+                 with_filled: bool = True, seed: int | None = 42, batch_size: int = 256) -> None:
+        self.with_filled = with_filled
+        self.seed = seed
+        self.batch_size = batch_size
+        self.file = open(path, "w", encoding="utf-8") if path is not None else None   # pylint: disable=consider-using-with
+        self.pending: list[str] = []
 
-        print()
-        print(f"Diese Lösung nimmt {d.best_size} Felder ein.")
+    def write(self, output_data: OutputData) -> None:
+        self.pending.append(_format_result(output_data, self.with_filled, self.seed))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """ write all pending results in one go """
+        if self.pending:
+            out = self.file if self.file is not None else sys.stdout
+            out.write("".join(self.pending))
+            out.flush()
+            self.pending.clear()
+
+    def close(self) -> None:
+        self.flush()
+        if self.file is not None:
+            self.file.close()
 
 """
 Strategy:
   - Place the longest word first (heuristic: tends to anchor the grid well).
   - Backtrack: at each step, pick a not-yet-placed word and try every
     perpendicular crossing on every already-placed word.
-  - Two layers of pruning:
-      a) Candidate-time: estimate the new bounding box *before* placing;
+  - Branch and bound:
+      a) Upper bound: a greedy pass (always the placement with the smallest
+         bbox) yields a first solution before the search starts.
+      b) Node-time: a lower bound of the final bbox area for the words
+         still to place; the whole subtree is cut if it meets/exceeds the
+         current best (see _lower_bound).
+      c) Candidate-time: estimate the new bounding box *before* placing;
          skip if the estimate already meets/exceeds the current best.
-      b) Post-place: re-check the actual bbox area before recursing.
 
 Performance notes:
-  - For each word we precompute `char_dist[c] -> list[int]` and `keys`
-    (the set of distinct characters). 
-  - We also maintain a `bounds_stack` so that the current bbox is always
-    available in O(1), instead of scanning the whole grid each time.
+  - For each pair of words we precompute all crossings, so candidate
+    generation is a table scan. The same table tells up front whether the
+    words are connected by common characters at all.
+  - We also maintain the current bbox incrementally (restored from the
+    undo log), instead of scanning the whole grid each time.
 
 Validity rules per placement:
   - Crossing cells must agree on the shared character.
@@ -232,59 +299,320 @@ at least one previously placed word, so the result is always connected
 through crossings.
 """
 
+H_BIT, V_BIT = 1, 2      # direction flags in ProcessData.dirs
+
+WORD_ORDERS = ("index", "fewest-options")
+VALUE_ORDERS = ("generated", "smallest-area")
+
+
 class CrosswordSolver(Processor[ProcessData]):
-    """ backtracking solver minimising the bounding-box area """
+    """ backtracking solver minimising the bounding-box area
+
+    workers     : with more than one, the top levels of the search tree are
+                  split into subtrees searched on a process pool; all workers
+                  prune against the best area found so far by any of them
+    time_budget : seconds after which the search stops (anytime mode)
+    node_budget : search nodes after which the search stops (anytime mode)
+    on_improve  : called with the ProcessData whenever a smaller grid is found,
+                  e.g. to emit intermediate results
+    word_order  : which unplaced word to branch on first at every node
+                  'index'          : list order
+                  'fewest-options' : most constrained first (fewest legal crossings)
+    value_order : which placement of a word to try first
+                  'generated'      : candidate order
+                  'smallest-area'  : smallest resulting bbox first
+    table_size  : max. number of partial grids in the transposition table;
+                  a full table is cleared, which costs search time only
+
+    With a budget the best grid found so far is returned; ProcessData.optimal
+    tells whether the search completed.
+    """
+
+    def __init__(self, *,
+                 workers: int = 1,
+                 time_budget: float | None = None,
+                 node_budget: int | None = None,
+                 on_improve: Callable[[ProcessData], None] | None = None,
+                 word_order: str = "fewest-options",
+                 value_order: str = "smallest-area",
+                 table_size: int = 250_000) -> None:
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        if word_order not in WORD_ORDERS:
+            raise ValueError(f"unknown word order {word_order!r}, expected one of {WORD_ORDERS}")
+        if value_order not in VALUE_ORDERS:
+            raise ValueError(f"unknown value order {value_order!r}, expected one of {VALUE_ORDERS}")
+        if table_size < 1:
+            raise ValueError("table_size must be >= 1")
+        self.workers = workers
+        self.time_budget = time_budget
+        self.node_budget = node_budget
+        self.on_improve = on_improve
+        self.word_order = word_order
+        self.value_order = value_order
+        self.table_size = table_size
+        self._shared_best = None            # multiprocessing.Value in pool workers
+
+    def cache_token(self) -> dict[str, object]:
+        """ the settings a result depends on, for CachedProcessor (on_improve does not count) """
+        return {"workers": self.workers, "time_budget": self.time_budget, "node_budget": self.node_budget,
+                "word_order": self.word_order, "value_order": self.value_order}
 
     def apply(self, pd: ProcessData) -> ProcessData:
         if not pd.words:
+            pd.optimal = True
+            return pd
+        self._prepare(pd)
+        if not self._connected(pd):
+            pd.optimal = True               # proven: no grid crosses all words
             return pd
 
-        # one-time precomputation: char_dist + keys per word
-        pd.char_dist = [self._char_distribution(w) for w in pd.words]
-        pd.keys = [set(d.keys()) for d in pd.char_dist]
-
-        # anchor: longest word at (0,0). Try BOTH orientations — placing the
-        # longest word horizontally locks the bbox width to len(word) for the
-        # rest of the search, so any optimum where the longest word is
-        # vertical (e.g. example 3 → 5×17) would otherwise be unreachable.
+        # anchor: longest word at (0,0), in both orientations. The vertical
+        # anchor only reaches the transposes of the horizontal anchor's grids,
+        # so its exact search is skipped by the transposition table; its
+        # greedy pass may still find a different first bound.
         first_idx = max(range(len(pd.words)), key=lambda i: len(pd.words[i]))
-        first = pd.words[first_idx]
-
-        for vertical in (False, True):
-            owned, all_cells = self._place(pd, first, 0, 0, vertical=vertical)
-            pd.owned_stack.append(owned)
-            pd.all_cells_stack.append(all_cells)
-            pd.placements.append((first_idx, 0, 0, vertical))
-            if vertical:
-                pd.bounds_stack.append((0, len(first) - 1, 0, 0))
+        anchors: list[Placement] = [(first_idx, 0, 0, False), (first_idx, 0, 0, True)]
+
+        # greedy upper bounds from both anchors first, so that the exact
+        # search of either anchor is pruned by the better of the two
+        if self.time_budget is not None:
+            pd.deadline = time.monotonic() + self.time_budget
+        try:
+            for anchor in anchors:
+                self._replayed(pd, [anchor], self._greedy)
+            if self.workers > 1:
+                pd.optimal = self._solve_parallel(pd, anchors[0])
             else:
-                pd.bounds_stack.append((0, 0, 0, len(first) - 1))
-            pd.used.add(first_idx)
-
-            self._solve(pd)
-
-            pd.used.remove(first_idx)
-            pd.bounds_stack.pop()
-            pd.placements.pop()
-            for cell in pd.owned_stack.pop():
-                del pd.grid[cell]
-            cells_set = pd.v_cells if vertical else pd.h_cells
-            for cell in pd.all_cells_stack.pop():
-                cells_set.discard(cell)
+                for anchor in anchors:
+                    self._replayed(pd, [anchor], self._solve)
+                pd.optimal = True
+        except _BudgetExhausted:
+            pd.optimal = False
+        pd.seen.clear()                     # search scratch, not part of the result
         return pd
 
+    def _prepare(self, pd: ProcessData) -> None:
+        """ one-time precomputation: crossing table and partners per word,
+        encoded words and the board """
+        char_dist = [self._char_distribution(w) for w in pd.words]
+        pd.crossings = [[tuple((k, m)
+                               for c, positions in word_dist.items() if c in other_dist
+                               for k in positions for m in other_dist[c])
+                         for other_dist in char_dist]
+                        for word_dist in char_dist]
+        pd.partners = [{j for j, crossings in enumerate(row) if j != i and crossings}
+                       for i, row in enumerate(pd.crossings)]
+        self._allocate(pd)
+
+    @staticmethod
+    def _connected(pd: ProcessData) -> bool:
+        """ whether every word can be reached from the first through common characters """
+        reached, todo = {0}, [0]
+        while todo:
+            for j in pd.partners[todo.pop()] - reached:
+                reached.add(j)
+                todo.append(j)
+        return len(reached) == len(pd.words)
+
+    @staticmethod
+    def _allocate(pd: ProcessData) -> None:
+        """ encode the words and allocate an empty board large enough for any placement """
+        pd.alphabet = "\0" + "".join(sorted(set("".join(pd.words))))
+        if len(pd.alphabet) > 256:
+            raise ValueError("more than 255 distinct characters in the word list")
+        code_of = {c: i for i, c in enumerate(pd.alphabet)}
+        pd.codes = [bytes(code_of[c] for c in w) for w in pd.words]
+        # a word crossing the board reaches at most sum(lengths) cells away
+        # from (0,0); one more cell on each side for the flanking check
+        reach = sum(len(w) for w in pd.words) + 1
+        pd.stride = 2 * reach + 1
+        pd.origin = reach * pd.stride + reach
+        pd.grid = bytearray(pd.stride * pd.stride)
+        pd.dirs = bytearray(pd.stride * pd.stride)
+        # at most every letter newly covers a cell, plus 5 entries per word
+        pd.trail = array('i', bytes(array('i').itemsize * (reach + 5 * len(pd.words))))
+        pd.trail_top = 0
+
+    # parallel root split
+
+    def _solve_parallel(self, pd: ProcessData, anchor: Placement) -> bool:
+        """ search the subtrees below the first one or two levels on a process pool,
+        False if any of them stopped at its budget """
+        frontier: list[list[Placement]] = [[anchor]]
+        for _ in range(2):
+            if len(frontier) >= 4 * self.workers:
+                break
+            frontier = [extended for prefix in frontier for extended in self._extended(pd, prefix)]
+        if not frontier:
+            return True                     # every move was pruned against the greedy bound
+
+        # the node budget is shared out evenly, the deadline is absolute
+        node_budget = None if self.node_budget is None else max(1, self.node_budget // len(frontier))
+        context = multiprocessing.get_context()
+        shared_best = context.Value('i', pd.best_size)
+        optimal = True
+        with ProcessPoolExecutor(self.workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(shared_best,)) as pool:
+            solver = CrosswordSolver(node_budget=node_budget, word_order=self.word_order,
+                                     value_order=self.value_order, table_size=self.table_size)
+            futures = [pool.submit(_search_subtree, solver, pd.words, prefix, pd.deadline)
+                       for prefix in frontier]
+            for future in as_completed(futures):
+                complete, result = future.result()
+                optimal &= complete
+                if result is not None and (pd.best_size == 0 or result[0] < pd.best_size):
+                    pd.best_size, pd.best_grid, pd.best_bounds, pd.best_placements = result
+                    if self.on_improve is not None:
+                        self.on_improve(pd)
+        return optimal
+
+    def _extended(self, pd: ProcessData, prefix: list[Placement]) -> list[list[Placement]]:
+        """ prefix plus each legal next placement; a complete prefix is kept as it
+        is (its subtree search just scores it), a dead end is dropped """
+        if len(prefix) == len(pd.words):
+            return [prefix]
+        return [prefix + [(i, y, x, vertical)]
+                for i, options in self._replayed(pd, prefix, self._moves)
+                for (_, _, y, x, vertical) in options]
+
+    def _replayed(self, pd: ProcessData, placements: list[Placement], search):
+        """ result of search(pd) with the given placements pushed, undone afterwards
+        (also if the search stopped at its budget) """
+        depth = len(pd.placements)
+        for (i, y, x, vertical) in placements:
+            cur_bounds = pd.bounds if pd.placements else (y, y, x, x)
+            self._push(pd, i, y, x, vertical, self._extend_bounds(cur_bounds, len(pd.words[i]), y, x, vertical))
+        try:
+            return search(pd)
+        finally:
+            while len(pd.placements) > depth:
+                self._pop(pd)
+
     # backtracking core
 
+    def _tick(self, pd: ProcessData, clock_mask: int = 0xff) -> None:
+        """ count a search node, stop the search if a budget is exhausted;
+        the clock is read only if no bit of nodes & clock_mask is set """
+        pd.nodes += 1
+        if self.node_budget is not None and pd.nodes > self.node_budget:
+            raise _BudgetExhausted
+        if pd.deadline is not None and not pd.nodes & clock_mask and time.monotonic() >= pd.deadline:
+            raise _BudgetExhausted
+
     def _solve(self, pd: ProcessData) -> None:
-        if len(pd.used) == len(pd.words):
+        self._tick(pd)
+        if len(pd.placements) == len(pd.words):
             self._record_if_better(pd)
             return
+        if self._shared_best is not None and \
+                (shared := self._shared_best.value) and (pd.best_size == 0 or shared < pd.best_size):
+            pd.best_size = shared           # another worker found a smaller grid
+
+        # the same partial grid, reached through another placement order or
+        # as a transpose, has been searched already with a best >= the
+        # current one, so it cannot lead to a better grid this time. The
+        # table is bounded; forgetting entries only means searching a
+        # subtree again.
+        if (key := self._canonical(pd, pd.placements)) in pd.seen:
+            return
+        if len(pd.seen) >= self.table_size:
+            pd.seen.clear()
+        pd.seen.add(key)
 
-        cur_bounds = pd.bounds_stack[-1]
+        moves = self._moves(pd)
+        if (bound := self._lower_bound(pd, moves)) is None:
+            return
+        if pd.best_size > 0 and bound >= pd.best_size:
+            return
+
+        if self.word_order == "fewest-options":
+            moves.sort(key=lambda move: len(move[1]))
+        if self.value_order == "smallest-area":
+            for _, options in moves:
+                options.sort(key=itemgetter(0))
+        for i, options in moves:
+            for (size, est, y, x, vertical) in options:
+                # the best may have improved since the moves were collected
+                if pd.best_size > 0 and size >= pd.best_size:
+                    continue
 
+                self._push(pd, i, y, x, vertical, est)
+                self._solve(pd)
+                self._pop(pd)
+
+    @staticmethod
+    def _canonical(pd: ProcessData, placements: list[Placement]) -> bytes:
+        """ key of the partial grid independent of placement order and transposition
+
+        Positions are already relative to the anchor at (0,0), and mirroring
+        would reverse the words, so transposition is the only symmetry
+        left. The anchor is always placements[0]; transposing every grid
+        with a vertical anchor maps a grid and its transpose to one key.
+        Each placement is packed into one number (board cell, direction,
+        word) and the sorted numbers into bytes, a tenth of the size of a
+        frozenset of tuples.
+        """
+        n, stride = len(pd.words), pd.stride
+        if placements[0][3]:
+            codes = [((x * stride + y) * 2 + (not vertical)) * n + i for (i, y, x, vertical) in placements]
+        else:
+            codes = [((y * stride + x) * 2 + vertical) * n + i for (i, y, x, vertical) in placements]
+        codes.sort()
+        return array('q', codes).tobytes()
+
+    def _greedy(self, pd: ProcessData) -> None:
+        """ initial upper bound: for every first move, complete the grid by
+        repeatedly taking the placement with the smallest bbox """
+        if len(pd.placements) == len(pd.words):
+            self._record_if_better(pd)      # nothing left to place, e.g. a single word
+            return
+        for i, options in self._moves(pd):
+            for (_, est, y, x, vertical) in options:
+                self._tick(pd, clock_mask=0)    # a greedy run is expensive, check the clock every time
+                self._push(pd, i, y, x, vertical, est)
+                self._greedy_completion(pd)
+                self._pop(pd)
+
+    def _greedy_completion(self, pd: ProcessData) -> None:
+        """ place the remaining words greedily, record the grid if complete, undo """
+        depth = len(pd.placements)
+        while len(pd.placements) < len(pd.words):
+            options = [option + (i,) for i, word_options in self._moves(pd) for option in word_options]
+            if not options:
+                break                       # stuck, no bound from this start
+            _, est, y, x, vertical, i = min(options, key=lambda option: option[0])
+            self._push(pd, i, y, x, vertical, est)
+        else:
+            self._record_if_better(pd)
+        while len(pd.placements) > depth:
+            self._pop(pd)
+
+    def _push(self, pd: ProcessData, i: int, y: int, x: int, vertical: bool,
+              bounds: tuple[int, int, int, int]) -> None:
+        """ place words[i], bounds being the new bbox """
+        self._place(pd, i, y, x, vertical, bounds)
+        pd.placements.append((i, y, x, vertical))
+        pd.used.add(i)
+
+    def _pop(self, pd: ProcessData) -> None:
+        """ undo the last _push """
+        i, y, x, vertical = pd.placements.pop()
+        pd.used.remove(i)
+        self._unplace(pd, i, y, x, vertical)
+
+    def _moves(self, pd: ProcessData) -> list[tuple[int, list[Option]]]:
+        """ legal placements of every unplaced word that could still beat the best
+
+        One (word_idx, options) entry per unplaced word, options being
+        (bbox area, bbox, y, x, vertical) in candidate order.
+        """
+        cur_bounds = pd.bounds
+        moves = []
         for i, word in enumerate(pd.words):
             if i in pd.used:
                 continue
+            options: list[Option] = []
             for (y, x, vertical) in self._candidates(pd, i):
                 # (a) early prune: would the bbox be too large already?
                 est = self._extend_bounds(cur_bounds, len(word), y, x, vertical)
@@ -292,60 +620,63 @@ class CrosswordSolver(Processor[ProcessData]):
                 if pd.best_size > 0 and est_size >= pd.best_size:
                     continue
                 # (b) legality check
-                if not self._fits(pd, word, y, x, vertical):
+                if not self._fits(pd, i, y, x, vertical):
                     continue
+                options.append((est_size, est, y, x, vertical))
+            moves.append((i, options))
+        return moves
 
-                owned, all_cells = self._place(pd, word, y, x, vertical)
-                pd.owned_stack.append(owned)
-                pd.all_cells_stack.append(all_cells)
-                pd.placements.append((i, y, x, vertical))
-                pd.bounds_stack.append(est)
-                pd.used.add(i)
-
-                self._solve(pd)
-
-                pd.used.remove(i)
-                pd.bounds_stack.pop()
-                pd.placements.pop()
-                for cell in pd.owned_stack.pop():
-                    del pd.grid[cell]
-                cells_set = pd.v_cells if vertical else pd.h_cells
-                for cell in pd.all_cells_stack.pop():
-                    cells_set.discard(cell)
+    @staticmethod
+    def _lower_bound(pd: ProcessData,
+                     moves: list[tuple[int, list[Option]]]) -> int | None:
+        """ admissible lower bound of the final bbox area, None if no completion exists
+
+        A word whose partners are all placed can only cross one of them,
+        i.e. it ends up at one of its current options (the board only grows,
+        so an option that does not fit now never will). Without such an
+        option there is no solution below the best. Otherwise the final bbox
+        is at least as high as the lowest and as wide as the narrowest of
+        its options, and at least as large as the smallest one. Finally the
+        longest unplaced word has to fit, across or down.
+        """
+        min_y, max_y, min_x, max_x = pd.bounds
+        height, width = max_y - min_y + 1, max_x - min_x + 1
+        area = 0
+        for i, options in moves:
+            if pd.partners[i] <= pd.used:
+                if not options:
+                    return None
+                height = max(height, min(est[1] - est[0] + 1 for _, est, _, _, _ in options))
+                width = max(width, min(est[3] - est[2] + 1 for _, est, _, _, _ in options))
+                area = max(area, min(option[0] for option in options))
+        longest = max(len(pd.words[i]) for i, _ in moves)
+        return max(area, min(height * max(width, longest), max(height, longest) * width))
 
     def _candidates(self,
                     pd: ProcessData,
                     word_idx: int) -> Iterator[tuple[int, int, bool]]:
         """ yield (y, x, vertical) for every perpendicular cross with a placed word """
-        word_keys = pd.keys[word_idx]
-        word_dist = pd.char_dist[word_idx]
-
-        seen: set[tuple[int, int, bool]] = set()
+        crossings = pd.crossings[word_idx]
+        seen: set[int] = set()              # flat cell index * 2 + vertical
+        stride = pd.stride
         for (placed_idx, py, px, p_vertical) in pd.placements:
-            common = word_keys & pd.keys[placed_idx]
-            if not common:
-                continue
-            placed_dist = pd.char_dist[placed_idx]
-            for c in common:
-                placed_indices = placed_dist[c]
-                new_indices = word_dist[c]
-                for j in placed_indices:
-                    for i in new_indices:
-                        if p_vertical:
-                            # placed runs vertically; new word runs horizontally
-                            ny, nx, nv = py + j, px - i, False
-                        else:
-                            # placed runs horizontally; new word runs vertically
-                            ny, nx, nv = py - i, px + j, True
-                        pos = (ny, nx, nv)
-                        if pos in seen:
-                            continue
-                        seen.add(pos)
-                        yield pos
-
-    def _fits(self,
-              pd: ProcessData,
-              word: str,
+            for (i, j) in crossings[placed_idx]:
+                if p_vertical:
+                    # placed runs vertically; new word runs horizontally
+                    ny, nx = py + j, px - i
+                    key = (ny * stride + nx) * 2
+                else:
+                    # placed runs horizontally; new word runs vertically
+                    ny, nx = py - i, px + j
+                    key = (ny * stride + nx) * 2 + 1
+                if key in seen:
+                    continue
+                seen.add(key)
+                yield ny, nx, not p_vertical
+
+    @staticmethod
+    def _fits(pd: ProcessData,
+              word_idx: int,
               y: int,
               x: int,
               vertical: bool) -> bool:
@@ -354,52 +685,68 @@ class CrosswordSolver(Processor[ProcessData]):
         # silently extend / be extended by an existing word ('embedding').
         # A flanking cell that belongs only to a perpendicular word is fine,
         # because that's just a neighbour, not a continuation.
-        if vertical:
-            before, after = (y - 1, x), (y + len(word), x)
-            same_dir_cells = pd.v_cells
-        else:
-            before, after = (y, x - 1), (y, x + len(word))
-            same_dir_cells = pd.h_cells
-        if before in same_dir_cells or after in same_dir_cells:
+        code = pd.codes[word_idx]
+        step, bit = (pd.stride, V_BIT) if vertical else (1, H_BIT)
+        start = pd.origin + y * pd.stride + x
+        end = start + len(code) * step
+        dirs = pd.dirs
+        if dirs[start - step] & bit or dirs[end] & bit:
             return False
 
-        for (cy, cx), ch in self._cells(word, y, x, vertical):
-            existing = pd.grid.get((cy, cx))
-            if existing is not None and existing != ch:
+        for existing, ch in zip(pd.grid[start:end:step], code, strict=True):
+            if existing and existing != ch:
                 return False
             # else: cell empty, or matches existing letter (valid crossing)
         return True
 
     @staticmethod
-    def _cells(word: str,
-               y: int,
-               x: int,
-               vertical: bool) -> list[tuple[tuple[int, int], str]]:
-        if vertical:
-            return [((y + i, x), ch) for i, ch in enumerate(word)]
-        return [((y, x + i), ch) for i, ch in enumerate(word)]
-
-    def _place(self,
-               pd: ProcessData,
-               word: str,
+    def _place(pd: ProcessData,
+               word_idx: int,
                y: int,
                x: int,
-               vertical: bool) -> tuple[list[tuple[int, int]], list[tuple[int, int]]]:
-        """ write newly added grid cells AND record direction-typed cells.
+               vertical: bool,
+               bounds: tuple[int, int, int, int]) -> None:
+        """ write the word, mark its cells with the direction flag and set the bbox
 
-        Returns (owned_grid_cells, all_cells_for_this_placement) so unplace
-        can revert both pd.grid and pd.h_cells / pd.v_cells precisely.
+        Logs the newly covered cells and the previous bbox on the trail so
+        unplace can revert both precisely; crossed cells keep the letter
+        of the earlier word.
         """
-        owned: list[tuple[int, int]] = []
-        all_cells: list[tuple[int, int]] = []
-        cells_set = pd.v_cells if vertical else pd.h_cells
-        for (cy, cx), ch in self._cells(word, y, x, vertical):
-            if (cy, cx) not in pd.grid:
-                pd.grid[(cy, cx)] = ch
-                owned.append((cy, cx))
-            cells_set.add((cy, cx))
-            all_cells.append((cy, cx))
-        return owned, all_cells
+        code = pd.codes[word_idx]
+        step, bit = (pd.stride, V_BIT) if vertical else (1, H_BIT)
+        start = pd.origin + y * pd.stride + x
+        end = start + len(code) * step
+        grid, dirs, trail = pd.grid, pd.dirs, pd.trail
+        top = mark = pd.trail_top
+        for cell in range(start, end, step):
+            if not grid[cell]:
+                trail[top] = cell
+                top += 1
+            dirs[cell] |= bit
+        grid[start:end:step] = code             # crossed cells hold the same letter
+        trail[top], trail[top + 1], trail[top + 2], trail[top + 3] = pd.bounds
+        trail[top + 4] = top - mark
+        pd.trail_top = top + 5
+        pd.bounds = bounds
+
+    @staticmethod
+    def _unplace(pd: ProcessData,
+                 word_idx: int,
+                 y: int,
+                 x: int,
+                 vertical: bool) -> None:
+        """ revert the topmost _place """
+        step, mask = (pd.stride, ~V_BIT) if vertical else (1, ~H_BIT)
+        start = pd.origin + y * pd.stride + x
+        grid, dirs, trail = pd.grid, pd.dirs, pd.trail
+        top = pd.trail_top - 5
+        pd.bounds = (trail[top], trail[top + 1], trail[top + 2], trail[top + 3])
+        mark = top - trail[top + 4]
+        for k in range(mark, top):
+            grid[trail[k]] = 0
+        pd.trail_top = mark
+        for cell in range(start, start + len(pd.codes[word_idx]) * step, step):
+            dirs[cell] &= mask
 
     # helpers
 
@@ -429,15 +776,53 @@ class CrosswordSolver(Processor[ProcessData]):
             new_max_x = end_x if end_x > max_x else max_x
             return (min_y, max_y, new_min_x, new_max_x)
 
-    @staticmethod
-    def _record_if_better(pd: ProcessData) -> None:
-        min_y, max_y, min_x, max_x = pd.bounds_stack[-1]
+    def _record_if_better(self, pd: ProcessData) -> None:
+        min_y, max_y, min_x, max_x = pd.bounds
         size = (max_y - min_y + 1) * (max_x - min_x + 1)
         if pd.best_size == 0 or size < pd.best_size:
+            if self._shared_best is not None:
+                with self._shared_best.get_lock():
+                    if self._shared_best.value == 0 or size < self._shared_best.value:
+                        self._shared_best.value = size
             pd.best_size = size
-            pd.best_grid = dict(pd.grid)
+            row = pd.origin + min_x
+            pd.best_grid = b"".join(pd.grid[row + y * pd.stride:row + y * pd.stride + max_x - min_x + 1]
+                                    for y in range(min_y, max_y + 1))
             pd.best_bounds = (min_y, max_y, min_x, max_x)
             pd.best_placements = list(pd.placements)
+            if self.on_improve is not None:
+                self.on_improve(pd)
+
+
+class _BudgetExhausted(Exception):
+    """ raised inside the search when the time or node budget is used up """
+
+
+_worker_best = None     # the shared best area inside a pool worker
+
+
+def _init_worker(shared_best) -> None:
+    global _worker_best                 # pylint: disable=global-statement
+    _worker_best = shared_best
+
+
+def _search_subtree(solver: CrosswordSolver, words: list[str], placements: list[Placement],
+                    deadline: float | None) -> tuple[bool, tuple | None]:
+    """ search below the given placements; returns whether the search completed,
+    and the best grid found as (size, grid, bounds, placements) or None """
+    solver._shared_best = _worker_best  # pylint: disable=protected-access
+    pd = ProcessData(words=list(words), deadline=deadline)
+    solver._prepare(pd)                 # pylint: disable=protected-access
+    pd.best_size = _worker_best.value
+    try:
+        solver._replayed(pd, placements, solver._solve)     # pylint: disable=protected-access
+        complete = True
+    except _BudgetExhausted:
+        complete = False
+    if not pd.best_placements:
+        return complete, None
+    min_y, max_y, min_x, max_x = pd.best_bounds
+    return complete, ((max_y - min_y + 1) * (max_x - min_x + 1), pd.best_grid, pd.best_bounds, pd.best_placements)
 
 
 class CrosswordsProblem(IPO[InputData, ProcessData, OutputData]):
@@ -472,7 +857,17 @@ EXAMPLE_5 = """\
 PROGRAMMIERUNG, ZEIT, KONZENTRATION, RECHNEN, ERGEBNIS, INTEGRAL, STOCHASTIK, STATISTIK
 """
 
-def solve_all_examples(with_filled: bool = False) -> None:
+def solve_all_examples(with_filled: bool = False,
+                       execution: Execution | None = None,
+                       cache_dir: str | None = None,
+                       workers: int = 1,
+                       time_budget: float | None = None,
+                       output_path: str | None = None) -> None:
+    """ solve all inline examples; pass e.g. Execution(mode="auto") to use all cores
+    for many word lists, or workers > 1 to split the search of each word list,
+    a cache_dir to reuse results of word lists solved in earlier runs, and a
+    time_budget (seconds per word list) to accept the best grid found so far;
+    with an output_path the results are written there in batches """
     examples: list[tuple[str, str]] = [
         ("example_1", EXAMPLE_1),
         ("example_2", EXAMPLE_2),
@@ -480,10 +875,13 @@ def solve_all_examples(with_filled: bool = False) -> None:
         ("example_4", EXAMPLE_4),
         ("example_5", EXAMPLE_5),
     ]
+    solver = CrosswordSolver(workers=workers, time_budget=time_budget)
     CrosswordsProblem.of(
         input=StreamProducer(examples),
-        process=CrosswordSolver(),
-        output=ConsoleConsumer(with_filled=with_filled),
+        process=CachedProcessor(solver, directory=cache_dir) if cache_dir else solver,
+        output=BatchedWriterConsumer(output_path, with_filled=with_filled) if output_path
+        else ConsoleConsumer(with_filled=with_filled),
+        execute=execution,
     ).solve()
 
 
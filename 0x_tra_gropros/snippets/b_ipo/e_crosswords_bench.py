@@ -0,0 +1,213 @@
+# (C) Alexander Voß, a.voss@fh-aachen.de, info@codebasedlearning.dev
+
+"""
+Benchmark of the crossword solver (see d_crosswords.py) on a reproducible corpus.
+
+Corpus
+  - the five inline examples
+  - seeded random word lists of 5 to 20 words, each with a small alphabet
+    (many common letters, many crossings) and a large one (few crossings)
+
+Per word list we record
+  - the area found and whether it is proven optimal (the search runs with a
+    time budget, see CrosswordSolver)
+  - the search nodes expanded
+  - the time to the first and to the best solution, and the total time
+  - the peak memory, measured with tracemalloc in a second run limited to
+    the same number of nodes (tracemalloc slows down the search, so the
+    timings come from the first run)
+
+and compare with a stored baseline:
+
+    python e_crosswords_bench.py                    # compare
+    python e_crosswords_bench.py --update-baseline  # store the current results
+
+Areas and node counts of proven-optimal runs are reproducible; runs stopped
+by the budget and all timings depend on the machine, so for timings only
+the ratio to the baseline is shown.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import string
+import time
+import tracemalloc
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Self
+
+from d_crosswords import (
+    EXAMPLE_1,
+    EXAMPLE_2,
+    EXAMPLE_3,
+    EXAMPLE_4,
+    EXAMPLE_5,
+    CrosswordSolver,
+    InputData,
+    OutputData,
+    ProcessData,
+    StreamProducer,
+)
+
+from gropro import IPO, Consumer, Processor
+
+BASELINE = Path(__file__).parents[2] / "gropros" / "crosswords" / "data" / "benchmark_baseline.json"
+
+
+"""
+Corpus
+"""
+
+def generate_word_list(n: int, alphabet_size: int, rng: random.Random,
+                       min_len: int = 3, max_len: int = 10) -> list[str]:
+    """ n distinct random words over the first alphabet_size letters, each sharing
+    at least one letter with an earlier word (so the list is connected) """
+    alphabet = string.ascii_uppercase[:alphabet_size]
+    words: list[str] = []
+    while len(words) < n:
+        word = "".join(rng.choice(alphabet) for _ in range(rng.randint(min_len, max_len)))
+        if word not in words and (not words or any(set(word) & set(other) for other in words)):
+            words.append(word)
+    return words
+
+
+def corpus(seed: int = 2024,
+           sizes: tuple[int, ...] = (5, 8, 11, 14, 17, 20),
+           alphabets: tuple[int, ...] = (8, 20)) -> list[tuple[str, str]]:
+    """ (source, textblock) pairs: the inline examples, then the generated word lists """
+    examples = (EXAMPLE_1, EXAMPLE_2, EXAMPLE_3, EXAMPLE_4, EXAMPLE_5)
+    items = [(f"example_{k}", text) for k, text in enumerate(examples, 1)]
+    for n in sizes:
+        for alphabet_size in alphabets:
+            rng = random.Random(f"{seed}-{n}-{alphabet_size}")
+            words = generate_word_list(n, alphabet_size, rng)
+            items.append((f"gen_{n:02}w_{alphabet_size:02}a",
+                          f"# generated, {n} words over {alphabet_size} letters\n{', '.join(words)}\n"))
+    return items
+
+
+"""
+Data classes with the measurements, solver and consumer
+"""
+
+@dataclass
+class BenchProcessData(ProcessData):
+    """ ProcessData plus the measurements of one solver run """
+    first_s: float | None = None    # time to the first solution
+    best_s: float | None = None     # time to the best solution
+    seconds: float = 0.0
+    peak_kib: float = 0.0
+
+    @classmethod
+    def of(cls, input_data: InputData) -> Self:
+        return cls(words=list(input_data.words))
+
+
+@dataclass
+class BenchOutputData(OutputData):
+    """ OutputData plus the measurements """
+    nodes: int = 0
+    first_s: float | None = None
+    best_s: float | None = None
+    seconds: float = 0.0
+    peak_kib: float = 0.0
+
+    @classmethod
+    def of(cls, input_data: InputData, process_data: BenchProcessData) -> Self:
+        return replace(super().of(input_data, process_data),
+                       nodes=process_data.nodes,
+                       first_s=process_data.first_s,
+                       best_s=process_data.best_s,
+                       seconds=process_data.seconds,
+                       peak_kib=process_data.peak_kib)
+
+
+class MeasuredSolver(Processor[BenchProcessData]):
+    """ runs CrosswordSolver with a time budget and records timings and peak memory """
+
+    def __init__(self, time_budget: float) -> None:
+        self.time_budget = time_budget
+
+    def apply(self, pd: BenchProcessData) -> BenchProcessData:
+        t0 = time.perf_counter()
+
+        def on_improve(improved: ProcessData) -> None:
+            now = time.perf_counter() - t0
+            if pd.first_s is None:
+                pd.first_s = now
+            pd.best_s = now
+
+        CrosswordSolver(time_budget=self.time_budget, on_improve=on_improve).apply(pd)
+        pd.seconds = time.perf_counter() - t0
+
+        tracemalloc.start()
+        try:
+            CrosswordSolver(node_budget=max(1, pd.nodes)).apply(ProcessData(words=list(pd.words)))
+            pd.peak_kib = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+        return pd
+
+
+class BenchProblem(IPO[InputData, BenchProcessData, BenchOutputData]):
+    """ the crossword problem with measurements """
+
+
+class ComparisonConsumer(Consumer[BenchOutputData]):
+    """ print one row per word list next to the baseline, and collect the results """
+
+    def __init__(self, baseline: dict[str, dict]) -> None:
+        self.baseline = baseline
+        self.results: dict[str, dict] = {}
+        print(f"{'source':<16} {'area':>5} {'opt':>3} {'nodes':>9} {'first s':>8} {'best s':>8} "
+              f"{'total s':>8} {'peak KiB':>9} | {'Δarea':>5} {'nodes×':>7} {'time×':>6}")
+
+    def write(self, output_data: BenchOutputData) -> None:
+        d = output_data
+        result = {"area": d.best_size, "optimal": d.optimal, "nodes": d.nodes,
+                  "first_s": d.first_s, "best_s": d.best_s, "seconds": d.seconds,
+                  "peak_kib": round(d.peak_kib, 1)}
+        self.results[d.source] = result
+
+        def seconds(value: float | None) -> str:
+            return f"{value:8.3f}" if value is not None else f"{'-':>8}"
+
+        row = (f"{d.source:<16} {d.best_size:>5} {'yes' if d.optimal else 'no':>3} {d.nodes:>9} "
+               f"{seconds(d.first_s)} {seconds(d.best_s)} {seconds(d.seconds)} {d.peak_kib:>9.1f}")
+        if (base := self.baseline.get(d.source)) is None:
+            print(f"{row} | {'new':>5}")
+            return
+        nodes_ratio = d.nodes / base["nodes"] if base["nodes"] else float("nan")
+        time_ratio = d.seconds / base["seconds"] if base["seconds"] else float("nan")
+        print(f"{row} | {d.best_size - base['area']:>+5} {nodes_ratio:>7.2f} {time_ratio:>6.2f}")
+
+
+def run_benchmark(time_budget: float = 2.0, seed: int = 2024, update_baseline: bool = False) -> dict[str, dict]:
+    """ solve the corpus, compare with the stored baseline, optionally replace it """
+    baseline = json.loads(BASELINE.read_text(encoding="utf-8")) if BASELINE.exists() else {}
+    consumer = ComparisonConsumer(baseline)
+    BenchProblem.of(
+        input=StreamProducer(corpus(seed)),
+        process=MeasuredSolver(time_budget),
+        output=consumer,
+    ).drain()
+    if update_baseline:
+        BASELINE.write_text(json.dumps(consumer.results, indent=2) + "\n", encoding="utf-8")
+        print(f"baseline written to {BASELINE}")
+    return consumer.results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="crossword solver benchmark")
+    parser.add_argument("--budget", type=float, default=2.0, help="time budget per word list in seconds")
+    parser.add_argument("--seed", type=int, default=2024, help="seed of the generated word lists")
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args()
+    run_benchmark(args.budget, args.seed, args.update_baseline)
+
+
+if __name__ == "__main__":
+    main()
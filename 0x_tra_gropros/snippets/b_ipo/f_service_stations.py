@@ -0,0 +1,954 @@
+# (C) Alexander Voß, a.voss@fh-aachen.de, info@codebasedlearning.dev
+
+"""
+Solve the service stations task using the IPO structure.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import heapq
+import mmap
+import os
+import time
+from array import array
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Self
+
+from gropro import IPO, Chain, Consumer, Execution, Processor, Producer
+
+DATA = Path(__file__).parents[2] / "gropros" / "service_stations" / "data"
+
+
+"""
+Problem-specific data classes for the service stations task.
+
+  - InputData   : the trains of one file as arrays of interned station ids
+  - ProcessData : trains and stations as bitmasks, the reduced core and the
+                  working state of the branch-and-bound search
+  - OutputData  : the chosen stations and some statistics
+"""
+
+_BLANK = b" \t\r"
+
+
+@dataclass
+class InputData:
+    """ everything a producer extracts from one input file
+
+    The trains are stored compactly: station names are interned to ids in
+    order of first appearance, the stops of all trains form one array of
+    ids, and train t is stops[offsets[t]:offsets[t + 1]].
+    """
+    source: str = ""         # logical name of the source (e.g. 'test_1_1.txt')
+    comment: str = ""        # the first '# ...' comment line (kept verbatim)
+    names: list[str] = field(default_factory=list)                  # station name per id
+    stops: array = field(default_factory=lambda: array('i'))         # station ids of all trains
+    offsets: array = field(default_factory=lambda: array('i', [0]))  # start of each train in stops
+
+    @classmethod
+    def of(cls, source: str, textblock: str) -> Self:
+        """ parse a textblock, see parse() """
+        return cls.parse(source, textblock.encode("utf-8"))
+
+    @classmethod
+    def parse(cls, source: str, buffer: bytes | mmap.mmap) -> Self:
+        """ parse one train per line, stations separated by ';' (or ',' if a
+        line has no ';'); names are case-insensitive, empty names are dropped
+
+        One pass over the utf-8 buffer: lines are located with find() and
+        split in C, the fields are looked up by their raw spelling, so only
+        a spelling seen for the first time is stripped and decoded. Nothing
+        per line or per name outlives the parse but the interned names.
+        Locating every field with find() as well would save the short-lived
+        line copy and field list, but a Python loop per field took about
+        1.5x as long for the same peak memory, so the split stays.
+        """
+        ids: dict[str, int] = {}            # upper-case name -> id
+        spellings: dict[bytes, int] = {}    # field as in the file (with blanks) -> id, -1 if empty
+
+        def intern(spelling: bytes) -> int:
+            if (i := spellings.get(spelling)) is None:
+                name = str(spelling, "utf-8").strip().upper()
+                i = spellings[spelling] = ids.setdefault(name, len(ids)) if name else -1
+            return i
+
+        stops, offsets = array('i'), array('i', [0])
+        comment = ""
+        find, known = buffer.find, spellings.__getitem__
+        pos, size = 0, len(buffer)
+        while pos < size:
+            if (end := find(b"\n", pos)) < 0:
+                end = size
+            line, pos = buffer[pos:end], end + 1
+            if line[:1] in _BLANK:       # also true for an empty line
+                line = line.lstrip(_BLANK)
+            if not line:
+                continue
+            if line[0] == ord('#'):
+                if not comment:
+                    comment = str(line, "utf-8").rstrip()
+                continue
+            fields = line.split(b";" if b";" in line else b",")
+            try:
+                train = list(map(known, fields))
+            except KeyError:
+                train = list(map(intern, fields))
+            if -1 in train:
+                train = [i for i in train if i >= 0]
+            if train:
+                stops.extend(train)
+                offsets.append(len(stops))
+        return cls(source=source, comment=comment, names=list(ids), stops=stops, offsets=offsets)
+
+    @property
+    def train_count(self) -> int:
+        return len(self.offsets) - 1
+
+    def train(self, t: int) -> list[str]:
+        """ the station names of train t """
+        return [self.names[s] for s in self.stops[self.offsets[t]:self.offsets[t + 1]]]
+
+
+@dataclass
+class ProcessData:
+    """ bitmask encoding, reductions and search state
+
+    Station i is bit i of a station mask, train t is bit t of a train mask;
+    both are plain ints, so 'train u stops at every station of train t' is
+    `t & ~u == 0` and stays one operation for any network size.
+    """
+    stations: list[str]                 # station names by id, in order of first appearance
+    trains: list[int]                   # station mask per train (duplicates within a train vanish)
+
+    # result of the reductions: stations forced into every cover, and the
+    # core that is left for the search, as station masks over the surviving
+    # stations
+    forced: list[int] = field(default_factory=list)
+    core: list[int] = field(default_factory=list)
+    dominated_stations: int = 0
+    dominated_trains: int = 0
+    rounds: int = 0
+
+    # search nodes visited so far, and the time.monotonic() at which the
+    # reductions and the search stop (None for no time budget)
+    nodes: int = 0
+    deadline: float | None = None
+
+    # minimum cover of the core (station ids); if the search stopped at its
+    # budget, the best cover found and a lower bound for the whole network
+    best: list[int] = field(default_factory=list)
+    optimal: bool = False
+    lower_bound: int = 0
+
+    @classmethod
+    def of(cls, input_data: InputData) -> Self:
+        stops, offsets = input_data.stops, input_data.offsets
+        trains = []
+        for t in range(input_data.train_count):
+            mask = 0
+            for s in stops[offsets[t]:offsets[t + 1]]:
+                mask |= 1 << s
+            trains.append(mask)
+        return cls(stations=list(input_data.names), trains=trains)
+
+    def solution(self) -> list[int]:
+        """ the complete cover: forced stations plus the cover of the core, by id """
+        return sorted(self.forced + self.best)
+
+
+@dataclass
+class OutputData:
+    """ snapshot of the final result, ready to be rendered by a consumer """
+    source: str
+    comment: str
+    trains: int
+    stations: int
+    core_trains: int
+    core_stations: int
+    forced: int
+    nodes: int
+    service_stations: list[str]
+    optimal: bool = True
+    lower_bound: int = 0
+
+    @classmethod
+    def of(cls, input_data: InputData, process_data: ProcessData) -> Self:
+        pd = process_data
+        core_stations = 0
+        for mask in pd.core:
+            core_stations |= mask
+        return cls(
+            source=input_data.source,
+            comment=input_data.comment,
+            trains=len(pd.trains),
+            stations=len(pd.stations),
+            core_trains=len(pd.core),
+            core_stations=core_stations.bit_count(),
+            forced=len(pd.forced),
+            nodes=pd.nodes,
+            service_stations=[pd.stations[s] for s in pd.solution()],
+            optimal=pd.optimal,
+            lower_bound=pd.lower_bound,
+        )
+
+"""
+Producers
+  - StreamProducer : a sequence of (source, textblock) pairs
+  - FileProducer   : the given files, memory-mapped
+  - FolderProducer : all '*.txt' files below a folder, in sorted order
+
+Consumers
+  - ConsoleConsumer : print the result in the task's format
+  - FileConsumer    : the result line per input in a '.out' file
+"""
+
+class StreamProducer(Producer[InputData]):
+    """ many (source, textblock) pairs, fed sequentially """
+
+    def __init__(self, items: Sequence[tuple[str, str]]) -> None:
+        self.items = items
+
+    def read(self, input_data) -> Iterator[InputData]:
+        for source, textblock in self.items:
+            yield InputData.of(source=source, textblock=textblock)
+
+
+def _parse_file(source: str, path: Path) -> InputData:
+    """ parse a file through a read-only memory map, without reading it into a str """
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:        # an empty file cannot be mapped
+            return InputData(source=source)
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return InputData.parse(source, mapped)
+
+
+class FileProducer(Producer[InputData]):
+    """ the given files, in order """
+
+    def __init__(self, *paths: str | os.PathLike) -> None:
+        self.paths = [Path(path) for path in paths]
+
+    def read(self, input_data) -> Iterator[InputData]:
+        for path in self.paths:
+            yield _parse_file(path.name, path)
+
+
+class FolderProducer(Producer[InputData]):
+    """ every '*.txt' file below folder """
+
+    def __init__(self, folder: str | os.PathLike) -> None:
+        self.folder = Path(folder)
+
+    def read(self, input_data) -> Iterator[InputData]:
+        for path in sorted(self.folder.rglob("*.txt")):
+            yield _parse_file(str(path.relative_to(self.folder)), path)
+
+
+class ConsoleConsumer(Consumer[OutputData]):
+    """ print the stations, optionally with the effect of the reductions """
+
+    def __init__(self, *, with_stats: bool = True) -> None:
+        self.with_stats = with_stats
+
+    def write(self, output_data: OutputData) -> None:
+        d = output_data
+        lines = [f"{d.source}: {d.comment}" if d.comment else d.source,
+                 f"Servicestationen in: {';'.join(d.service_stations)}"]
+        if self.with_stats:
+            lines.append(f"({d.trains} Züge, {d.stations} Bahnhöfe, reduziert auf {d.core_trains} Züge, "
+                         f"{d.core_stations} Bahnhöfe, {d.forced} gesetzt, {d.nodes} Suchknoten)")
+        if not d.optimal:
+            lines.append(f"(Suche am Budget abgebrochen, mindestens {d.lower_bound} Servicestationen nötig.)")
+        print("\n".join(lines) + "\n")
+
+
+class FileConsumer(Consumer[OutputData]):
+    """ write 'Servicestationen in: ...' to folder/<source>.out """
+
+    def __init__(self, folder: str | os.PathLike) -> None:
+        self.folder = Path(folder)
+
+    def write(self, output_data: OutputData) -> None:
+        path = (self.folder / output_data.source).with_suffix(".out")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"Servicestationen in: {';'.join(output_data.service_stations)}\n", encoding="utf-8")
+
+
+"""
+Strategy:
+  - Reductions, repeated until none of them changes anything:
+      1) duplicate stations within a train vanish in the bitmask encoding
+      2) dominated stations: if every train stopping at A also stops at B,
+         A is removed (of several stations with the same trains, one stays)
+      3) dominated trains: if train T stops at every station of train U,
+         any cover of U covers T, so T is removed (of identical trains, one
+         stays)
+      4) forced stations: a train with a single station left forces that
+         station into the cover; it and all trains stopping there are removed
+    Each reduction may enable another one, hence the fixpoint.
+  - Branch and bound on the reduced core:
+      a) Upper bound: greedy cover (always the station covering the most
+         trains, redundant stations dropped afterwards) before the search
+         starts.
+      b) Components: trains without a common station, even indirectly,
+         are covered independently; the search splits them at every node.
+      c) Branching: the train with the fewest stations, one branch per
+         station, busiest station first. After its branch a station is
+         removed from the trains of its siblings, so each cover is
+         enumerated once, and the reductions are applied again, which
+         often forces the next stations.
+      d) Lower bound: trains pairwise without a common station need one
+         station each; a greedy packing of such trains is a valid bound,
+         a subtree is cut if it cannot beat the best cover.
+      e) Anytime: with a time or node budget, a component whose search is
+         stopped keeps its greedy cover, and the packing bound tells how
+         far from the optimum that can be.
+
+Performance notes:
+  - Candidates for a domination are only looked up among the stations of
+    one train (resp. the trains at one station) with the fewest entries,
+    not among all pairs, so a reduction round is close to linear in the
+    size of the input for sparse networks.
+"""
+
+@lru_cache(maxsize=1 << 16)
+def _bits(mask: int) -> tuple[int, ...]:
+    """ indices of the set bits of mask, ascending; cached, as the search
+    sees the same train masks over and over
+
+    The digits of bin() are scanned instead of clearing the lowest bit in
+    a loop, which would copy a mask over thousands of stations per bit.
+    """
+    digits = bin(mask)[:1:-1]
+    bits = []
+    i = digits.find('1')
+    while i >= 0:
+        bits.append(i)
+        i = digits.find('1', i + 1)
+    return tuple(bits)
+
+
+class StationReducer(Processor[ProcessData]):
+    """ reduces pd.trains to the forced stations and the core
+
+    time_budget : seconds for the reductions and the search after them; the
+                  deadline is kept in pd.deadline, so the time spent here
+                  is taken from the search's budget
+
+    Past pd.deadline no further round is started; what the rounds so far
+    have reduced is valid, only less reduced.
+    """
+
+    def __init__(self, *, time_budget: float | None = None) -> None:
+        self.time_budget = time_budget
+
+    def apply(self, pd: ProcessData) -> ProcessData:
+        if self.time_budget is not None:
+            pd.deadline = time.monotonic() + self.time_budget
+        forced, pd.core = self.reduce(pd.trains, pd, pd.deadline)
+        pd.forced = list(_bits(forced))
+        return pd
+
+    @classmethod
+    def reduce(cls, trains: list[int], stats: ProcessData | None = None,
+               deadline: float | None = None) -> tuple[int, list[int]]:
+        """ apply the reductions until a fixpoint (or the deadline), returns the
+        forced stations (as a mask) and the remaining trains; counts them in
+        stats if given """
+        forced = 0
+        changed = True
+        while changed and trains and (deadline is None or time.monotonic() < deadline):
+            more, trains = cls._forced_stations(trains)
+            kept = cls._dominated_trains(trains)
+            removed, kept = cls._dominated_stations(kept)
+            changed = more or removed or len(kept) < len(trains)
+            if stats is not None:
+                stats.rounds += 1
+                stats.dominated_trains += len(trains) - len(kept)
+                stats.dominated_stations += removed.bit_count()
+            forced |= more
+            trains = kept
+        return forced, trains
+
+    @staticmethod
+    def _forced_stations(trains: list[int]) -> tuple[int, list[int]]:
+        """ stations of single-station trains (as a mask) and the trains not stopping there """
+        forced = 0
+        for mask in trains:
+            if mask & (mask - 1) == 0:
+                forced |= mask
+        if not forced:
+            return 0, trains
+        return forced, [mask for mask in trains if not mask & forced]
+
+    @staticmethod
+    def _dominated_trains(trains: list[int]) -> list[int]:
+        """ the trains without those stopping at every station of another train """
+        kept: list[int] = []
+        at_station: dict[int, list[int]] = {}        # station -> kept trains stopping there
+        for mask in sorted(set(trains), key=int.bit_count):
+            # a kept subset of mask stops at each of its stations, so the
+            # station with the fewest kept trains is enough to check
+            s = min(_bits(mask), key=lambda s: len(at_station.get(s, ())))
+            outside = ~mask
+            if any(not other & outside for other in at_station.get(s, ())):
+                continue
+            kept.append(mask)
+            for s in _bits(mask):
+                at_station.setdefault(s, []).append(mask)
+        return kept
+
+    @staticmethod
+    def _dominated_stations(trains: list[int]) -> tuple[int, list[int]]:
+        """ stations whose trains all stop at another station as well (as a
+        mask), and the trains without them """
+        trains_at: dict[int, set[int]] = {}          # station -> train indices
+        for t, mask in enumerate(trains):
+            for s in _bits(mask):
+                trains_at.setdefault(s, set()).add(t)
+        sizes = [mask.bit_count() for mask in trains]
+        removed: set[int] = set()
+        for a, at_a in trains_at.items():
+            # a dominating station stops every train of a, in particular the
+            # train of a with the fewest stations
+            t = min(at_a, key=sizes.__getitem__)
+            for b in _bits(trains[t]):
+                if b == a or b in removed:
+                    continue
+                at_b = trains_at[b]
+                if at_a <= at_b and (b < a or len(at_a) < len(at_b)):
+                    removed.add(a)
+                    break
+        if not removed:
+            return 0, trains
+        mask = sum(1 << s for s in removed)
+        return mask, [train & ~mask for train in trains]
+
+
+class CoverSearch(Processor[ProcessData]):
+    """ minimum cover of pd.core by branch and bound
+
+    time_budget : seconds after which the search stops (anytime mode)
+    node_budget : search nodes after which the search stops (anytime mode)
+
+    The components of the core are searched one after the other; one whose
+    search is stopped keeps its greedy cover. ProcessData.optimal tells
+    whether all searches completed. A deadline already set in pd (by
+    StationReducer) is kept. The greedy covers are always completed, as
+    they are the result if the budget is used up; their time counts
+    against the budget, which is checked before every search node.
+    """
+
+    def __init__(self, *, time_budget: float | None = None, node_budget: int | None = None) -> None:
+        self.time_budget = time_budget
+        self.node_budget = node_budget
+
+    def apply(self, pd: ProcessData) -> ProcessData:
+        if self.time_budget is not None and pd.deadline is None:
+            pd.deadline = time.monotonic() + self.time_budget
+        pd.best, pd.optimal = [], True
+        pd.lower_bound = len(pd.forced)
+        for component in self._components(pd.core):
+            greedy = self._greedy(component)
+            try:
+                cover = self._search(pd, component, len(greedy)) or greedy
+                pd.lower_bound += len(cover)
+            except _BudgetExhausted:
+                cover, pd.optimal = greedy, False
+                pd.lower_bound += self._lower_bound(component)
+            pd.best += cover
+        return pd
+
+    def _tick(self, pd: ProcessData) -> None:
+        """ count a search node, stop the search if a budget is used up """
+        pd.nodes += 1
+        if (self.node_budget is not None and pd.nodes > self.node_budget) or \
+                (pd.deadline is not None and time.monotonic() > pd.deadline):
+            raise _BudgetExhausted
+
+    def _search(self, pd: ProcessData, trains: list[int], limit: int) -> list[int] | None:
+        """ a minimum cover of trains with fewer than limit stations, None if there is none """
+        self._tick(pd)
+        forced, trains = StationReducer.reduce(trains)
+        found = list(_bits(forced))
+        components = self._components(trains)
+        bounds = [self._lower_bound(component) for component in components]
+        rest = sum(bounds)
+        if len(found) + rest >= limit:
+            return None
+        for component, bound in zip(components, bounds, strict=True):
+            rest -= bound
+            cover = self._branch(pd, component, limit - len(found) - rest)
+            if cover is None:
+                return None
+            found += cover
+        return found
+
+    def _branch(self, pd: ProcessData, trains: list[int], limit: int) -> list[int] | None:
+        """ a minimum cover of one component, branching on the stations of its smallest train """
+        smallest = min(trains, key=int.bit_count)
+        options = sorted(_bits(smallest), key=lambda s: -sum(mask >> s & 1 for mask in trains))
+        best = None
+        for s in options:
+            bit = 1 << s
+            cover = self._search(pd, [mask for mask in trains if not mask & bit], limit - 1)
+            if cover is not None:
+                best = [s] + cover
+                limit = len(best)
+            trains = [mask & ~bit for mask in trains]
+        return best
+
+    @staticmethod
+    def _components(trains: list[int]) -> list[list[int]]:
+        """ the trains grouped by connected components of the station-train graph """
+        parent: dict[int, int] = {}
+
+        def find(s: int) -> int:
+            while (p := parent.setdefault(s, s)) != s:
+                parent[s] = parent.setdefault(p, p)
+                s = p
+            return s
+
+        for mask in trains:
+            bits = _bits(mask)
+            first = find(bits[0])
+            for s in bits[1:]:
+                parent[find(s)] = first
+        groups: dict[int, list[int]] = {}
+        for mask in trains:
+            groups.setdefault(find(_bits(mask)[0]), []).append(mask)
+        return list(groups.values())
+
+    @staticmethod
+    def _greedy(trains: list[int]) -> list[int]:
+        """ a first cover: repeatedly the station covering the most uncovered
+        trains, then without the stations made redundant by later ones
+
+        The gain of a station never grows, so it is only recomputed when the
+        station comes up in the heap (lazy greedy).
+        """
+        trains_at: dict[int, list[int]] = {}         # station -> train indices
+        for t, mask in enumerate(trains):
+            for s in _bits(mask):
+                trains_at.setdefault(s, []).append(t)
+        covered = [0] * len(trains)                  # chosen stations per train
+        heap = [(-len(at), s) for s, at in trains_at.items()]
+        heapq.heapify(heap)
+        chosen, uncovered = [], len(trains)
+        while uncovered:
+            _, s = heapq.heappop(heap)
+            gain = sum(1 for t in trains_at[s] if not covered[t])
+            if heap and gain < -heap[0][0]:
+                heapq.heappush(heap, (-gain, s))
+                continue
+            chosen.append(s)
+            for t in trains_at[s]:
+                uncovered -= not covered[t]
+                covered[t] += 1
+        cover = []
+        for s in reversed(chosen):
+            if all(covered[t] > 1 for t in trains_at[s]):
+                for t in trains_at[s]:
+                    covered[t] -= 1
+            else:
+                cover.append(s)
+        return cover
+
+    @staticmethod
+    def _lower_bound(trains: list[int]) -> int:
+        """ number of trains pairwise without a common station """
+        return len(CoverSearch._packing(trains))
+
+    @staticmethod
+    def _packing(trains: list[int]) -> list[int]:
+        """ trains pairwise without a common station (greedy, small trains first) """
+        used, packing = 0, []
+        for mask in sorted(trains, key=int.bit_count):
+            if not mask & used:
+                used |= mask
+                packing.append(mask)
+        return packing
+
+
+class _BudgetExhausted(Exception):
+    """ raised inside the search once a time or node budget is used up """
+
+
+class StationCoverSolver(Chain[ProcessData]):
+    """ minimum set of stations such that every train stops at one of them:
+    the reductions, then the search on what is left (see CoverSearch for
+    the budgets) """
+
+    def __init__(self, *, time_budget: float | None = None, node_budget: int | None = None) -> None:
+        super().__init__(StationReducer(time_budget=time_budget),
+                         CoverSearch(time_budget=time_budget, node_budget=node_budget))
+
+
+class ServiceStationsProblem(IPO[InputData, ProcessData, OutputData]):
+    """ binds Input/Process/Output classes to the generic IPO solver """
+
+
+"""
+Incremental re-solve, for a timetable that changes train by train:
+  - the trains are grouped into the components of the station-train graph;
+    each component keeps a cover, whether it is proven optimal, a lower
+    bound and a packing (trains pairwise without a common station)
+  - an edit only touches the components at the stations of its train and
+    often settles them without a search:
+      add    : a cover of more trains needs at least as many stations, so a
+               cover that stops the new train stays optimal; otherwise the
+               busiest station of the train is added, which is optimal if
+               the train extends the packing to the size of the cover
+      remove : the optimum drops by one station at most, so the cover stays
+               optimal if another train only stops at stations of the
+               removed one, or if one of its stations became redundant
+  - replan() searches what the edits left unsettled, split into connected
+    pieces; a piece whose cover was optimal before the edit only has to
+    beat it by one station, and the pieces are solved on the pool of an
+    Execution
+  - a component whose search was stopped at the budget is patched by the
+    edits but not searched again, unless replan(retry=True)
+"""
+
+@dataclass(eq=False)
+class _Component:
+    """ trains of one component of the station-train graph, and their cover """
+    stations: int = 0                                   # stations with trains, as mask
+    trains: set[int] = field(default_factory=set)       # distinct trains, as station masks
+    cover: int = 0                                      # service stations, as mask
+    optimal: bool = True
+    lower_bound: int = 0
+    packing: set[int] = field(default_factory=set)      # trains pairwise without a common station
+    packed: int = 0                                     # their stations, as mask (the sum, as they are disjoint)
+    dirty: bool = False                                 # to be searched by the next replan()
+
+    def absorb(self, other: _Component) -> None:
+        """ merge other into self; covers, packings and bounds of disjoint components add up """
+        self.stations |= other.stations
+        self.trains |= other.trains
+        self.cover |= other.cover
+        self.optimal &= other.optimal
+        self.lower_bound += other.lower_bound
+        self.packing |= other.packing
+        self.packed |= other.packed
+        self.dirty |= other.dirty
+
+
+@dataclass
+class _Piece:
+    """ search result for one connected piece, as returned from the pool """
+    cover: int
+    optimal: bool
+    lower_bound: int
+    packing: list[int]
+    nodes: int
+
+
+def _solve_piece(trains: list[int], incumbent: int, near: bool,
+                 deadline: float | None, node_budget: int | None) -> _Piece:
+    """ a minimum cover of one connected piece, or the best found within the
+    budget; incumbent is a known cover (as mask), near tells that it is at
+    most one station above the optimum """
+    pd = ProcessData(stations=[], trains=trains, deadline=deadline)
+    packing = CoverSearch._packing(trains)
+    if near:
+        try:
+            found = CoverSearch(node_budget=node_budget)._search(pd, trains, incumbent.bit_count())
+            cover = sum(1 << s for s in found) if found is not None else incumbent
+            return _Piece(cover, True, cover.bit_count(), packing, pd.nodes)
+        except _BudgetExhausted:
+            return _Piece(incumbent, False, max(incumbent.bit_count() - 1, len(packing)), packing, pd.nodes)
+    StationCoverSolver(node_budget=node_budget).apply(pd)
+    cover = sum(1 << s for s in pd.solution())
+    if incumbent and incumbent.bit_count() < cover.bit_count():
+        cover = incumbent
+    return _Piece(cover, pd.optimal, max(pd.lower_bound, len(packing)), packing, pd.nodes)
+
+
+class IncrementalCover:
+    """ minimum service stations of a timetable that changes train by train
+
+    add() and remove() edit the timetable and keep a valid cover at once,
+    replan() searches what the edits left unsettled (see above).
+
+    execution   : pool for the pieces of a re-plan, serial by default
+    time_budget : seconds per re-plan; a piece whose search is stopped
+                  keeps its cover (anytime mode, see CoverSearch)
+    node_budget : search nodes per piece
+    """
+
+    def __init__(self, *, execution: Execution | None = None,
+                 time_budget: float | None = None, node_budget: int | None = None) -> None:
+        self.execution = execution or Execution()
+        self.time_budget = time_budget
+        self.node_budget = node_budget
+        self.stations: list[str] = []                   # station names by id
+        self.nodes = 0                                  # search nodes of all re-plans
+        self._ids: dict[str, int] = {}
+        self._count: dict[int, int] = {}                # train -> number of identical trains
+        self._at: dict[int, set[int]] = {}              # station -> distinct trains stopping there
+        self._of: dict[int, _Component] = {}            # station -> its component
+        self._components: set[_Component] = set()
+        self._dirty: set[_Component] = set()
+        self._pool: concurrent.futures.Executor | None = None
+
+    @classmethod
+    def of(cls, input_data: InputData, **kwargs) -> Self:
+        """ a solver holding the trains of input_data with a greedy cover,
+        call replan() to solve them """
+        solver = cls(**kwargs)
+        solver.stations = list(input_data.names)
+        solver._ids = {name: s for s, name in enumerate(solver.stations)}
+        for mask in ProcessData.of(input_data).trains:
+            solver._count[mask] = solver._count.get(mask, 0) + 1
+        for mask in solver._count:
+            for s in _bits(mask):
+                solver._at.setdefault(s, set()).add(mask)
+        for trains in CoverSearch._components(list(solver._count)):
+            cover = sum(1 << s for s in CoverSearch._greedy(trains))
+            packing = CoverSearch._packing(trains)
+            optimal = len(packing) >= cover.bit_count()
+            component = solver._place(trains, _Piece(cover, optimal, len(packing), packing, 0))
+            if not optimal:
+                component.dirty = True
+                solver._dirty.add(component)
+        return solver
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """ shut down the pool, if one was started """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    @property
+    def train_count(self) -> int:
+        return sum(self._count.values())
+
+    @property
+    def cover(self) -> list[str]:
+        """ the current service stations, valid after every edit """
+        cover = 0
+        for component in self._components:
+            cover |= component.cover
+        return [self.stations[s] for s in _bits(cover)]
+
+    @property
+    def optimal(self) -> bool:
+        return all(component.optimal for component in self._components)
+
+    @property
+    def lower_bound(self) -> int:
+        return sum(component.lower_bound for component in self._components)
+
+    def add(self, names: Sequence[str]) -> None:
+        """ add a train with these stations (case-insensitive, empty names are dropped) """
+        if not (mask := self._mask(names, create=True)):
+            return
+        count = self._count.get(mask, 0)
+        self._count[mask] = count + 1
+        if count:
+            return                                      # the same stations are stopped already
+        bits = _bits(mask)
+        for s in bits:
+            self._at.setdefault(s, set()).add(mask)
+        component = self._merge(bits)
+        component.stations |= mask
+        component.trains.add(mask)
+        if mask & component.cover:
+            return
+        optimal, component.optimal = component.optimal, False
+        component.cover |= 1 << max(bits, key=lambda s: len(self._at[s]))
+        if not mask & component.packed:
+            component.packing.add(mask)
+            component.packed |= mask
+            component.lower_bound = max(component.lower_bound, len(component.packing))
+        self._settle(component, optimal)
+
+    def remove(self, names: Sequence[str]) -> None:
+        """ remove one train with exactly these stations, ValueError if there is none """
+        mask = self._mask(names, create=False)
+        if not (count := self._count.get(mask)):
+            raise ValueError(f"no train with stations {';'.join(names)!r}")
+        if count > 1:
+            self._count[mask] = count - 1
+            return
+        del self._count[mask]
+        bits = _bits(mask)
+        component = self._of[bits[0]]
+        component.trains.discard(mask)
+        for s in bits:
+            (at := self._at[s]).discard(mask)
+            if not at:
+                del self._at[s], self._of[s]
+                component.stations &= ~(1 << s)
+        component.cover &= component.stations
+        if not component.trains:
+            self._components.discard(component)
+            self._dirty.discard(component)
+            return
+        if mask in component.packing:
+            component.packing.discard(mask)
+            component.packed &= ~mask
+        optimal = component.optimal
+        outside = ~mask
+        if not any(not other & outside for s in bits for other in self._at.get(s, ())):
+            # no remaining train stops only at stations of mask, so each
+            # of its cover stations may have become redundant
+            dropped = False
+            for s in bits:
+                bit = 1 << s
+                if component.cover & bit and all(other & component.cover & ~bit for other in self._at.get(s, ())):
+                    component.cover &= ~bit
+                    dropped = True
+            component.optimal = optimal and dropped
+            component.lower_bound = max(component.lower_bound - 1, len(component.packing))
+        self._settle(component, optimal)
+
+    def replan(self, *, retry: bool = False) -> int:
+        """ search the components the edits left unsettled (with retry also
+        those stopped at the budget before), returns the pieces searched """
+        components = set(self._dirty)
+        if retry:
+            components |= {c for c in self._components if not c.optimal}
+        self._dirty.clear()
+        deadline = time.monotonic() + self.time_budget if self.time_budget is not None else None
+        jobs = []
+        for component in components:
+            self._components.discard(component)
+            near = component.cover.bit_count() <= component.lower_bound + 1
+            for trains in CoverSearch._components(list(component.trains)):
+                mask = 0
+                for train in trains:
+                    mask |= train
+                jobs.append((trains, component.cover & mask, near))
+        for (trains, _, _), piece in zip(jobs, self._solve(jobs, deadline), strict=True):
+            self._place(trains, piece)
+            self.nodes += piece.nodes
+        return len(jobs)
+
+    def _solve(self, jobs: list[tuple[list[int], int, bool]], deadline: float | None) -> Iterator[_Piece]:
+        """ solve the pieces, on the pool if there is more than one """
+        solve = partial(_solve_piece, deadline=deadline, node_budget=self.node_budget)
+        if self.execution.is_serial or len(jobs) < 2:
+            return (solve(*job) for job in jobs)
+        if self._pool is None:
+            self._pool = self.execution.executor()
+        return self._pool.map(solve, *zip(*jobs, strict=True))
+
+    def _place(self, trains: list[int], piece: _Piece) -> _Component:
+        """ a new component of trains (a connected piece) with its cover """
+        component = _Component(trains=set(trains), cover=piece.cover, optimal=piece.optimal,
+                               lower_bound=piece.lower_bound, packing=set(piece.packing),
+                               packed=sum(piece.packing))
+        for mask in trains:
+            component.stations |= mask
+        for s in _bits(component.stations):
+            self._of[s] = component
+        self._components.add(component)
+        return component
+
+    def _mask(self, names: Sequence[str], create: bool) -> int:
+        """ the train as station mask, new stations get an id if create is set """
+        mask = 0
+        for name in names:
+            if not (name := name.strip().upper()):
+                continue
+            if (s := self._ids.get(name)) is None:
+                if not create:
+                    return 0
+                s = self._ids[name] = len(self.stations)
+                self.stations.append(name)
+            mask |= 1 << s
+        return mask
+
+    def _merge(self, bits: tuple[int, ...]) -> _Component:
+        """ the component of these stations, merging the components they connect """
+        found = list({id(c): c for s in bits if (c := self._of.get(s)) is not None}.values())
+        if not found:
+            component = _Component()
+            self._components.add(component)
+        else:
+            component = max(found, key=lambda c: len(c.trains))
+            for other in found:
+                if other is not component:
+                    component.absorb(other)
+                    for s in _bits(other.stations):
+                        self._of[s] = component
+                    self._components.discard(other)
+                    self._dirty.discard(other)
+            if component.dirty:
+                self._dirty.add(component)
+        for s in bits:
+            self._of[s] = component
+        return component
+
+    def _settle(self, component: _Component, optimal: bool) -> None:
+        """ after an edit: optimal if the bound is reached, to be searched if it was optimal before """
+        if component.optimal or component.lower_bound >= component.cover.bit_count():
+            component.optimal = True
+            component.lower_bound = component.cover.bit_count()
+        elif optimal or component.dirty:
+            component.dirty = True
+            self._dirty.add(component)
+
+
+"""
+Inline copy of the example from the task description
+"""
+
+EXAMPLE_1 = """\
+# Beispiel 1 => 2
+HH,H,B,L
+K,FFM,S
+HH,H,FFM,N,M
+H,FFM,N
+DA,FFM,N
+HH,FFM,M
+"""
+
+
+def solve_all_examples(folder: str | os.PathLike = DATA,
+                       execution: Execution | None = None,
+                       time_budget: float | None = None) -> None:
+    """ solve the inline example and every data file below folder, with a
+    time_budget (seconds per file) to accept the best cover found so far """
+    ServiceStationsProblem.of(
+        input=StreamProducer([("example_1", EXAMPLE_1)]),
+        process=StationCoverSolver(time_budget=time_budget),
+        output=ConsoleConsumer(),
+        execute=execution or Execution(),
+    ).solve()
+    ServiceStationsProblem.of(
+        input=FolderProducer(folder),
+        process=StationCoverSolver(time_budget=time_budget),
+        output=ConsoleConsumer(),
+        execute=execution or Execution(),
+    ).solve()
+
+
+def replan_example(execution: Execution | None = None) -> None:
+    """ the inline example as a timetable that changes: solve it once, then
+    re-plan after each edit """
+    with IncrementalCover.of(InputData.of("example_1", EXAMPLE_1), execution=execution) as solver:
+        solver.replan()
+        print(f"example_1, inkrementell\nServicestationen in: {';'.join(solver.cover)}")
+        for edit, train in (("-", "HH,FFM,M"), ("+", "K,DA"), ("-", "K,FFM,S"), ("+", "B,L,S")):
+            (solver.add if edit == "+" else solver.remove)(train.split(","))
+            searched = solver.replan()
+            print(f"{edit} {train:<9} Servicestationen in: {';'.join(solver.cover)} "
+                  f"({searched} Teilnetz(e) durchsucht)")
+
+
+if __name__ == "__main__":
+    solve_all_examples()
+    replan_example()
@@ -0,0 +1,216 @@
+# (C) Alexander Voß, a.voss@fh-aachen.de, info@codebasedlearning.dev
+
+"""
+Benchmark of the service stations solver (see f_service_stations.py) on
+generated rail networks.
+
+Generator
+  - stations on a square grid, neighbours are the adjacent grid cells
+  - lines are walks through the grid that prefer to keep their direction;
+    where lines cross, hubs with many trains arise
+  - every train runs a section of one line, either stopping everywhere or
+    as an express that skips about half of the intermediate stations
+  - overlap is the mean fraction of its line a train runs: the higher, the
+    more trains share stations (and the more the reductions remove)
+
+Per network the pipeline runs with a time budget for the search (large
+cores are not solved exactly in reasonable time, see CoverSearch) and with
+a Profiler, which yields the time per phase:
+  - parse  : reading and parsing the file (the producer)
+  - reduce : StationReducer
+  - search : CoverSearch
+  - output : writing the result file (the consumer)
+  - other  : the rest of the wall time, mostly encoding the trains as bitmasks
+
+    python g_service_stations_bench.py                # default corpus, 2 s per search
+    python g_service_stations_bench.py --budget 10    # 10 s per search
+    python g_service_stations_bench.py --keep out/    # keep the generated files
+
+Next to the cover size the table shows whether it is proven optimal, and
+otherwise the lower bound from the search.
+
+With --edits the networks are solved incrementally instead (see
+IncrementalCover): after the first plan, every edit removes a random train
+and adds a new one of the same network, followed by a re-plan. The table
+compares the time of the first plan with the mean and max time per edit
+and counts the edits that needed a search.
+
+    python g_service_stations_bench.py --edits 200    # 200 edits per network
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from f_service_stations import (
+    FileConsumer,
+    FileProducer,
+    IncrementalCover,
+    InputData,
+    ServiceStationsProblem,
+    StationCoverSolver,
+)
+
+from gropro import Profiler, ipo_context, trace_ctx
+
+"""
+Generator
+"""
+
+_STEPS = ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1))
+
+
+def generate_network(stations: int, trains: int, overlap: float, rng: random.Random,
+                     lines: int | None = None, line_length: tuple[int, int] = (10, 60)) -> list[list[str]]:
+    """ trains (as station names) of a network with the given number of
+    stations and trains; lines defaults to one per 25 stations """
+    if not 0.0 < overlap <= 1.0:
+        raise ValueError("overlap must be in (0, 1]")
+    side = math.ceil(math.sqrt(stations))
+
+    def walk() -> list[int]:
+        x, y = rng.randrange(side), rng.randrange(side)
+        direction = rng.randrange(len(_STEPS))
+        path, visited = [], set()
+        for _ in range(rng.randint(*line_length)):
+            path.append(y * side + x)
+            visited.add(path[-1])
+            # keep the direction or turn by 45°, whatever is still free
+            for turn in sorted((0, 1, -1), key=lambda t: (t != 0, rng.random())):
+                dx, dy = _STEPS[(direction + turn) % len(_STEPS)]
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < side and 0 <= ny < side and ny * side + nx < stations \
+                        and ny * side + nx not in visited:
+                    x, y, direction = nx, ny, (direction + turn) % len(_STEPS)
+                    break
+            else:
+                break
+        return path
+
+    network = [line for line in (walk() for _ in range(lines or max(1, stations // 25))) if len(line) > 1]
+    result = []
+    for _ in range(trains):
+        line = rng.choice(network)
+        length = min(len(line), max(2, round(len(line) * overlap * rng.uniform(0.5, 1.5))))
+        start = rng.randrange(len(line) - length + 1)
+        section = line[start:start + length]
+        if length > 2 and rng.random() < 0.3:
+            section = [section[0]] + [s for s in section[1:-1] if rng.random() < 0.5] + [section[-1]]
+        result.append([f"S{s:05}" for s in section])
+    return result
+
+
+def corpus() -> list[tuple[str, int, int, float]]:
+    """ (name, stations, trains, overlap) of the benchmark networks """
+    return [(f"net_{stations:05}s_{trains:05}t_{round(overlap * 100):02}o", stations, trains, overlap)
+            for stations, trains in ((1_000, 2_000), (2_000, 10_000), (5_000, 20_000), (10_000, 50_000))
+            for overlap in (0.2, 0.6)]
+
+
+def write_network(path: Path, trains: list[list[str]], comment: str) -> None:
+    """ store trains in the task's file format """
+    path.write_text("\n".join([f"# {comment}"] + [";".join(train) for train in trains]) + "\n", encoding="utf-8")
+
+
+"""
+Benchmark
+"""
+
+PHASES = (("parse", "input"), ("reduce", "chain:StationReducer"), ("search", "chain:CoverSearch"),
+          ("output", "output"))
+
+
+def run_benchmark(time_budget: float = 2.0, seed: int = 2024, keep: str | None = None) -> list[dict]:
+    """ generate the corpus, solve every network with a Profiler and print one row per network """
+    with tempfile.TemporaryDirectory(prefix="service-stations-") as tmp:
+        folder = Path(keep) if keep else Path(tmp)
+        folder.mkdir(parents=True, exist_ok=True)
+        print(f"{'network':<28} {'core':>6} {'cover':>6} {'opt/lb':>6} {'nodes':>7} "
+              + " ".join(f"{name + ' ms':>10}" for name, _ in PHASES) + f" {'other ms':>10} {'total ms':>10}")
+        rows = []
+        for name, stations, trains, overlap in corpus():
+            path = folder / f"{name}.txt"
+            write_network(path, generate_network(stations, trains, overlap, random.Random(f"{seed}-{name}")),
+                          f"generated, {stations} stations, {trains} trains, overlap {overlap}")
+            profiler = Profiler()
+            t0 = time.perf_counter()
+            with ipo_context(trace_ctx, profiler):
+                (result,) = ServiceStationsProblem.of(
+                    input=FileProducer(path),
+                    process=StationCoverSolver(time_budget=time_budget),
+                    output=FileConsumer(folder),
+                ).solve()
+            wall = time.perf_counter() - t0
+            totals = {}
+            for entry in profiler.report()["stages"]:
+                stage = entry["stage"]
+                totals[stage if stage in ("input", "output") else f"{stage}:{entry['component']}"] = entry["total_s"]
+            phases = {phase: totals.get(key, 0.0) for phase, key in PHASES}
+            row = {"network": name, "core": result.core_trains, "cover": len(result.service_stations),
+                   "optimal": result.optimal, "lower_bound": result.lower_bound, "nodes": result.nodes,
+                   **phases, "other": max(0.0, wall - sum(phases.values())), "total": wall}
+            rows.append(row)
+            bound = "opt" if row["optimal"] else row["lower_bound"]
+            print(f"{name:<28} {row['core']:>6} {row['cover']:>6} {bound:>6} {row['nodes']:>7} "
+                  + " ".join(f"{row[phase] * 1e3:10.1f}" for phase, _ in PHASES)
+                  + f" {row['other'] * 1e3:10.1f} {row['total'] * 1e3:10.1f}")
+        return rows
+
+
+def run_incremental(edits: int = 200, time_budget: float = 2.0, seed: int = 2024) -> list[dict]:
+    """ solve every network once, then re-plan after each of edits train
+    changes and print one row per network """
+    print(f"{'network':<28} {'cover':>6} {'opt/lb':>6} {'plan ms':>10} {'edit ms':>10} {'max ms':>10} "
+          f"{'searched':>8} {'cover':>6} {'opt/lb':>6}")
+    rows = []
+    for name, stations, trains, overlap in corpus():
+        # the first trains form the timetable, the others are added by the edits
+        network = generate_network(stations, trains + edits, overlap, random.Random(f"{seed}-{name}"))
+        timetable, reserve = network[:trains], network[trains:]
+        rng = random.Random(f"{seed}-{name}-edits")
+        t0 = time.perf_counter()
+        solver = IncrementalCover.of(InputData.of(name, "\n".join(";".join(train) for train in timetable)),
+                                     time_budget=time_budget)
+        solver.replan()
+        plan = time.perf_counter() - t0
+        first = (len(solver.cover), "opt" if solver.optimal else solver.lower_bound)
+        times, searched = [], 0
+        for train in reserve:
+            t0 = time.perf_counter()
+            index = rng.randrange(len(timetable))
+            solver.remove(timetable[index])
+            timetable[index] = train
+            solver.add(train)
+            searched += solver.replan() > 0
+            times.append(time.perf_counter() - t0)
+        row = {"network": name, "first": first, "plan": plan, "edit": sum(times) / max(1, len(times)),
+               "max": max(times, default=0.0), "searched": searched,
+               "cover": len(solver.cover), "optimal": solver.optimal, "lower_bound": solver.lower_bound}
+        rows.append(row)
+        print(f"{name:<28} {first[0]:>6} {first[1]:>6} {plan * 1e3:10.1f} {row['edit'] * 1e3:10.1f} "
+              f"{row['max'] * 1e3:10.1f} {searched:>8} {row['cover']:>6} "
+              f"{'opt' if row['optimal'] else row['lower_bound']:>6}")
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="service stations benchmark")
+    parser.add_argument("--budget", type=float, default=2.0, help="time budget per search in seconds")
+    parser.add_argument("--seed", type=int, default=2024, help="seed of the generated networks")
+    parser.add_argument("--keep", metavar="DIR",
+                        help="write the networks and results to DIR instead of a temporary folder")
+    parser.add_argument("--edits", type=int, metavar="N", help="solve incrementally, with N edits per network")
+    args = parser.parse_args()
+    if args.edits is not None:
+        run_incremental(args.edits, args.budget, args.seed)
+    else:
+        run_benchmark(args.budget, args.seed, args.keep)
+
+
+if __name__ == "__main__":
+    main()
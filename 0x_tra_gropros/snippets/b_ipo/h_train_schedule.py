@@ -0,0 +1,578 @@
+# (C) Alexander Voß, a.voss@fh-aachen.de, info@codebasedlearning.dev
+
+"""
+Solve the train schedule task using the IPO structure.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import time
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import pairwise
+from pathlib import Path
+from typing import Self
+
+from gropro import IPO, Chain, Consumer, Execution, Processor, Producer
+
+"""
+Problem-specific data classes for the train schedule task.
+
+  - InputData   : the line (stations, running times), the start of the
+                  outbound train and the dwell and safety times
+  - ProcessData : the same, plus the plans of the strategies
+  - OutputData  : the plans, ready to be printed
+"""
+
+_SECTIONS = {"strecke": "stations", "abstaende": "distances", "abstände": "distances",
+             "start hinfahrt": "start", "haltezeit": "dwell", "sicherheitswartezeit": "safety"}
+
+
+@dataclass
+class InputData:
+    """ everything a producer extracts from one input file """
+    source: str = ""                                        # logical name of the source (e.g. 'example_1')
+    stations: list[str] = field(default_factory=list)       # station names along the line
+    distances: list[int] = field(default_factory=list)      # running times between neighbouring stations
+    start: int = 0                                          # departure of the outbound train, minute of the hour
+    dwell: int = 1                                          # minimum stop at every intermediate station
+    safety: int = 1                                         # minutes between an arrival and the opposing departure
+
+    @classmethod
+    def of(cls, source: str, textblock: str) -> Self:
+        """ parse the sections 'Strecke:', 'Abstaende:' and 'Start Hinfahrt:',
+        each a header line followed by its values; 'Haltezeit:' and
+        'Sicherheitswartezeit:' are optional """
+        values: dict[str, list[str]] = {}
+        current = None
+        for line in textblock.splitlines():
+            stripped = line.strip()
+            if not stripped:
+                continue
+            if stripped.endswith(':'):
+                if (current := _SECTIONS.get(stripped[:-1].strip().lower())) is None:
+                    raise ValueError(f"{source}: unknown section {stripped!r}, expected one of {tuple(_SECTIONS)}")
+                values[current] = []
+            elif current is None:
+                raise ValueError(f"{source}: values before the first section: {stripped!r}")
+            else:
+                values[current] += stripped.split()
+        if missing := [key for key in ("stations", "distances", "start") if key not in values]:
+            raise ValueError(f"{source}: missing sections {missing}")
+        try:
+            numbers = {key: [int(value) for value in values.get(key, ())]
+                       for key in ("distances", "start", "dwell", "safety")}
+        except ValueError as e:
+            raise ValueError(f"{source}: {e}") from None
+        data = cls(source=source, stations=values["stations"], distances=numbers["distances"],
+                   start=sum(numbers["start"]), dwell=sum(numbers["dwell"] or [1]),
+                   safety=sum(numbers["safety"] or [1]))
+        if len(data.stations) < 2 or len(data.distances) != len(data.stations) - 1:
+            raise ValueError(f"{source}: expected at least two stations and one distance less than stations")
+        if min(data.distances) < 1 or not 0 <= data.start < HOUR or data.dwell < 0 or data.safety < 0:
+            raise ValueError(f"{source}: distances must be positive, the start a minute of the hour")
+        return data
+
+
+@dataclass
+class ProcessData:
+    """ the line and the plans of the strategies, in the order they ran """
+    stations: list[str]
+    distances: list[int]
+    start: int
+    dwell: int = 1
+    safety: int = 1
+    plans: list[Plan] = field(default_factory=list)
+
+    @classmethod
+    def of(cls, input_data: InputData) -> Self:
+        return cls(stations=list(input_data.stations), distances=list(input_data.distances),
+                   start=input_data.start, dwell=input_data.dwell, safety=input_data.safety)
+
+    @property
+    def min_duration(self) -> int:
+        """ running times plus the stops at the intermediate stations """
+        return sum(self.distances) + self.dwell * (len(self.stations) - 2)
+
+    def turnaround(self, forward: Run) -> int:
+        """ earliest departure of the return train: the outbound train arrived and stopped """
+        return forward.arrivals[-1] + self.dwell
+
+
+@dataclass
+class OutputData:
+    """ snapshot of the final result, ready to be rendered by a consumer """
+    source: str
+    stations: list[str]
+    distances: list[int]
+    start: int
+    dwell: int
+    safety: int
+    min_duration: int
+    plans: list[Plan]
+
+    @classmethod
+    def of(cls, input_data: InputData, process_data: ProcessData) -> Self:
+        pd = process_data
+        return cls(source=input_data.source, stations=pd.stations, distances=pd.distances, start=pd.start,
+                   dwell=pd.dwell, safety=pd.safety, min_duration=pd.min_duration, plans=pd.plans)
+
+
+"""
+Core: runs and the occupancy of the sections, modulo the hour.
+
+  - A run is one train through the line in one direction, given by its
+    start and its additional waits. It is simulated event by event:
+    departure, arrival after the running time, departure after the stop
+    and the wait. As the timetable is clocked, the run repeats every hour.
+  - A train occupies a section from its departure until its arrival plus
+    the safety time, in which no opposing train may enter. Within the
+    hour that is an arc of minutes, kept as an interval set: a 60-bit int,
+    bit m for minute m (all times are whole minutes).
+  - Occupancy holds the sets of all sections of a run in one int, section
+    i in bits 60i..60i+59. Whether two runs meet anywhere on the line is
+    one AND, and a run started later is one rotation of all sets, both
+    independent of the number of stations. Nothing is stepped minute by
+    minute.
+"""
+
+HOUR = 60
+_MINUTES = (1 << HOUR) - 1
+
+
+def _rotate(minutes: int, shift: int) -> int:
+    """ the set of minutes shifted by shift (mod 60) """
+    shift %= HOUR
+    return ((minutes << shift) | (minutes >> (HOUR - shift))) & _MINUTES if shift else minutes
+
+
+def _arc(start: int, length: int) -> int:
+    """ the set of minutes [start, start + length) of the hour """
+    return _MINUTES if length >= HOUR else _rotate((1 << length) - 1, start)
+
+
+def _entries(occupied: int, length: int) -> int:
+    """ the minutes at which a train occupying a section for length minutes
+    can enter it without meeting any occupied minute """
+    if length >= HOUR:
+        return 0 if occupied else _MINUTES
+    blocked, span = occupied, 1         # blocked: t with an occupied minute in [t, t + span)
+    while span < length:
+        step = min(span, length - span)
+        blocked |= _rotate(blocked, -step)
+        span += step
+    return ~blocked & _MINUTES
+
+
+def _wait(entries: int, t: int) -> int | None:
+    """ minutes from t until the next of the entries, None if there is none """
+    ahead = _rotate(entries, -t)
+    return (ahead & -ahead).bit_length() - 1 if ahead else None
+
+
+@lru_cache(maxsize=64)
+def _lowest_bits(sections: int) -> int:
+    """ bit 0 of every section's set """
+    return ((1 << (HOUR * sections)) - 1) // _MINUTES
+
+
+@dataclass
+class Run:
+    """ one direction of the clocked timetable
+
+    Times are minutes from the full hour of the outbound start, not reduced
+    modulo 60. The lists are indexed by station in line order; None where
+    the run does not depart (its last station) or arrive (its first).
+    """
+    start: int
+    departures: list[int | None]
+    arrivals: list[int | None]
+    waits: list[int]                    # additional waits per station
+    backward: bool = False
+
+    @classmethod
+    def of(cls, pd: ProcessData, start: int, waits: Sequence[int] | None = None, *, backward: bool = False) -> Self:
+        """ simulate the run from start, waiting waits[k] minutes at station k
+        in addition to the stop """
+        n = len(pd.stations)
+        waits = list(waits) if waits is not None else [0] * n
+        order = range(n - 1, -1, -1) if backward else range(n)
+        departures: list[int | None] = [None] * n
+        arrivals: list[int | None] = [None] * n
+        t = start
+        for k, (a, b) in enumerate(pairwise(order)):
+            t += (pd.dwell if k else 0) + waits[a]
+            departures[a] = t
+            t += pd.distances[min(a, b)]
+            arrivals[b] = t
+        return cls(start=start, departures=departures, arrivals=arrivals, waits=waits, backward=backward)
+
+    @property
+    def duration(self) -> int:
+        return (self.arrivals[0] if self.backward else self.arrivals[-1]) - self.start
+
+    @property
+    def total_wait(self) -> int:
+        return sum(self.waits)
+
+    def intervals(self, pd: ProcessData) -> list[tuple[int, int]]:
+        """ (entry minute, minutes occupied) per section """
+        return [(self.departures[i + 1] if self.backward else self.departures[i], distance + pd.safety)
+                for i, distance in enumerate(pd.distances)]
+
+
+@dataclass(frozen=True, slots=True)
+class Occupancy:
+    """ occupied minutes of the hour for every section of a run, section i in
+    bits 60i..60i+59 of one int """
+    minutes: int
+    sections: int
+
+    @classmethod
+    def of(cls, pd: ProcessData, run: Run) -> Self:
+        minutes = 0
+        for i, (entry, length) in enumerate(run.intervals(pd)):
+            minutes |= _arc(entry, length) << (HOUR * i)
+        return cls(minutes, len(pd.distances))
+
+    def section(self, i: int) -> int:
+        """ the occupied minutes of section i """
+        return self.minutes >> (HOUR * i) & _MINUTES
+
+    def shifted(self, shift: int) -> Occupancy:
+        """ the occupancy of the same run started shift minutes later """
+        if not (shift := shift % HOUR):
+            return self
+        lowest = _lowest_bits(self.sections)
+        wrapped = ((1 << shift) - 1) * lowest                  # bits that leave a section at the top
+        return Occupancy(((self.minutes << shift) & (_MINUTES * lowest ^ wrapped))
+                         | ((self.minutes >> (HOUR - shift)) & wrapped), self.sections)
+
+    def collides(self, other: Occupancy) -> bool:
+        return self.minutes & other.minutes != 0
+
+    def collisions(self, other: Occupancy) -> list[int]:
+        """ the sections occupied by both at the same minute """
+        both = self.minutes & other.minutes
+        return [i for i in range(self.sections) if both >> (HOUR * i) & _MINUTES]
+
+
+@dataclass
+class Plan:
+    """ outbound and return run of one strategy """
+    name: str
+    forward: Run
+    backward: Run
+    collisions: list[int]               # sections in which the trains meet, empty for a valid plan
+
+    @classmethod
+    def of(cls, pd: ProcessData, name: str, forward: Run, backward: Run) -> Self:
+        return cls(name, forward, backward, Occupancy.of(pd, forward).collisions(Occupancy.of(pd, backward)))
+
+    @property
+    def score(self) -> int:
+        """ penalty: the waits of each direction, squared """
+        return self.forward.total_wait ** 2 + self.backward.total_wait ** 2
+
+
+"""
+Strategies, each a processor that appends its plan to pd.plans; all use
+Run for the timetables and Occupancy for the meetings:
+
+  1) SimpleRun    : no waits, the return train leaves right after the
+                    outbound train arrived; the reference for the minimal
+                    durations, usually with collisions
+  2) OneSidedWait : the outbound run of 1); the return train leaves a
+                    station only at a minute at which the next section
+                    stays clear for its whole run, else it waits for the
+                    next such minute (one lookup, see _wait)
+  3) TwoSidedWait : the start of the return train is free, and the waits
+                    are spread over both directions, see there
+"""
+
+class SimpleRun(Processor[ProcessData]):
+    """ Einfache Fahrt """
+
+    def apply(self, pd: ProcessData) -> ProcessData:
+        forward = Run.of(pd, pd.start)
+        backward = Run.of(pd, pd.turnaround(forward), backward=True)
+        pd.plans.append(Plan.of(pd, "Einfache Fahrt", forward, backward))
+        return pd
+
+
+class OneSidedWait(Processor[ProcessData]):
+    """ Einseitiges Warten """
+
+    def apply(self, pd: ProcessData) -> ProcessData:
+        forward = Run.of(pd, pd.start)
+        occupied = Occupancy.of(pd, forward)
+        n = len(pd.stations)
+        waits = [0] * n
+        t = start = pd.turnaround(forward)
+        for i in reversed(range(n - 1)):                # from station i + 1 into section i
+            length = pd.distances[i] + pd.safety
+            if (wait := _wait(_entries(occupied.section(i), length), t)) is None:
+                raise ValueError(_too_long(pd, i))
+            waits[i + 1] = wait
+            t += wait + pd.distances[i] + pd.dwell
+        pd.plans.append(Plan.of(pd, "Einseitiges Warten", forward, Run.of(pd, start, waits, backward=True)))
+        return pd
+
+
+class TwoSidedWait(Processor[ProcessData]):
+    """ Beidseitiges Warten
+
+    Only the offset of the two trains in a section matters: let x_i be how
+    much later the return train enters section i than in plan 1), minus how
+    much later the outbound train enters it. Section i is clear for the
+    offsets in a set X_i (from the occupancy of plan 1). A wait of w minutes
+    at the station between sections i and i + 1, by either train, gives
+    x_i = x_(i+1) + w, and the start of the return train shifts all x_i.
+
+    So the least total wait W is the least descent of a sequence x_0 >= x_1
+    >= ... with x_i in X_i (mod 60). It is found level by level: the offsets
+    reachable in section i with a total wait <= W are X_i & (those of
+    section i - 1 with <= W | those of section i with <= W - 1, shifted by
+    one minute), a few int operations per section and level.
+
+    The penalty W_out² + W_ret² is smallest for the least W split evenly,
+    and as only the sum per station counts, every station's wait is split
+    between the trains. Of several starts, the one closest to plan 1 wins,
+    and a wait is taken as late as possible on the way back.
+    """
+
+    def apply(self, pd: ProcessData) -> ProcessData:
+        forward = Run.of(pd, pd.start)
+        backward = Run.of(pd, pd.turnaround(forward), backward=True)
+        occupied = Occupancy.of(pd, forward)
+        clear = []                                      # X_i
+        for i, (entry, length) in enumerate(backward.intervals(pd)):
+            if not (entries := _entries(occupied.section(i), length)):
+                raise ValueError(_too_long(pd, i))
+            clear.append(_rotate(entries, -entry))
+        total, levels = self._least_wait(clear)
+        offset = min((x for x in range(HOUR) if levels[total][-1] >> x & 1), key=lambda x: (min(x, HOUR - x), x))
+        station_waits = self._waits(levels, total, offset)
+        n = len(pd.stations)
+        forward_waits, backward_waits = [0] * n, [0] * n
+        for k, wait in enumerate(station_waits):        # the odd minute goes to the direction waiting less
+            half = wait // 2
+            more = wait - half
+            if sum(forward_waits) < sum(backward_waits):
+                forward_waits[k], backward_waits[k] = more, half
+            else:
+                forward_waits[k], backward_waits[k] = half, more
+        forward = Run.of(pd, pd.start, forward_waits)
+        start = pd.turnaround(Run.of(pd, pd.start)) + offset + sum(forward_waits)
+        pd.plans.append(Plan.of(pd, "Beidseitiges Warten", forward, Run.of(pd, start, backward_waits, backward=True)))
+        return pd
+
+    @staticmethod
+    def _least_wait(clear: list[int]) -> tuple[int, list[list[int]]]:
+        """ the least total wait W and, per level w <= W, the offsets reachable in each section """
+        levels: list[list[int]] = []
+        spread: list[int] = [0] * len(clear)            # per section: offsets reachable before its own filter
+        while True:
+            level = [clear[0]]
+            for i in range(1, len(clear)):
+                spread[i] = level[i - 1] | (_rotate(spread[i], -1) if levels else 0)
+                level.append(clear[i] & spread[i])
+            levels.append(level)
+            if level[-1]:
+                return len(levels) - 1, levels
+            if len(levels) > HOUR * len(clear):
+                raise ValueError("no collision-free timetable")
+
+    @staticmethod
+    def _waits(levels: list[list[int]], total: int, offset: int) -> list[int]:
+        """ the total wait per station, walking back from the last section """
+        waits = [0] * (len(levels[0]) + 1)
+        budget = total
+        for i in range(len(levels[0]) - 1, 0, -1):
+            wait = next(w for w in range(budget + 1) if levels[budget - w][i - 1] >> ((offset + w) % HOUR) & 1)
+            waits[i] = wait
+            offset, budget = (offset + wait) % HOUR, budget - wait
+        return waits
+
+
+def _too_long(pd: ProcessData, i: int) -> str:
+    return (f"section {pd.stations[i]}-{pd.stations[i + 1]}: opposing trains cannot pass within the hour "
+            f"({pd.distances[i]} minutes running time, {pd.safety} minutes safety time)")
+
+
+class TimetableSolver(Chain[ProcessData]):
+    """ the three strategies, one plan each """
+
+    def __init__(self) -> None:
+        super().__init__(SimpleRun(), OneSidedWait(), TwoSidedWait())
+
+
+class TrainScheduleProblem(IPO[InputData, ProcessData, OutputData]):
+    """ binds Input/Process/Output classes to the generic IPO solver """
+
+
+"""
+Producers
+  - StreamProducer : a sequence of (source, textblock) pairs
+  - FileProducer   : the given files
+
+Consumers
+  - ConsoleConsumer : print the result in the task's format
+  - FileConsumer    : write it to '<source>.out' in a folder
+"""
+
+class StreamProducer(Producer[InputData]):
+    """ (source, textblock) pairs, e.g. the inline examples """
+
+    def __init__(self, items: Sequence[tuple[str, str]]) -> None:
+        self.items = items
+
+    def read(self, input_data) -> Iterator[InputData]:
+        for source, textblock in self.items:
+            yield InputData.of(source=source, textblock=textblock)
+
+
+class FileProducer(Producer[InputData]):
+    """ the given files, in order """
+
+    def __init__(self, *paths: str | os.PathLike) -> None:
+        self.paths = [Path(path) for path in paths]
+
+    def read(self, input_data) -> Iterator[InputData]:
+        for path in self.paths:
+            yield InputData.of(source=path.name, textblock=path.read_text(encoding="utf-8"))
+
+
+def format_output(d: OutputData) -> str:
+    """ the result in the task's format, see task_train_schedule.md """
+    width = max(2, *(len(name) for name in d.stations)) + 1
+    columns = [6 + width * k for k in range(len(d.stations))]
+
+    def row(label: str, cells: dict[int, str]) -> str:
+        line = label
+        for k, cell in sorted(cells.items()):
+            line = line.ljust(columns[k]) + cell
+        return line
+
+    def minutes(times: list[int | None]) -> dict[int, str]:
+        return {k: f"{t % HOUR:02}" for k, t in enumerate(times) if t is not None}
+
+    def waits(run: Run) -> dict[int, str]:
+        return {k: f"({w:02})" for k, w in enumerate(run.waits) if w}
+
+    def totals(title: str, forward: int, backward: int) -> str:
+        return f"{title:<40} : {forward}, {backward}"
+
+    lines = ["Strecke:", " ".join(d.stations), "", "Abstaende:", " ".join(map(str, d.distances)), "",
+             "Start Hinfahrt:", str(d.start), ""]
+    if d.dwell != 1:
+        lines += ["Haltezeit:", str(d.dwell), ""]
+    if d.safety != 1:
+        lines += ["Sicherheitswartezeit:", str(d.safety), ""]
+    lines += [f"Anzahl Bahnhöfe : {len(d.stations)}", f"Mindestdauer    : {d.min_duration}", ""]
+    for plan in d.plans:
+        header = " " * columns[0] + d.stations[0]
+        for k in range(1, len(d.stations)):
+            header = (header + (" x " if k - 1 in plan.collisions else "  ")).ljust(columns[k]) + d.stations[k]
+        lines += [f"{plan.name}:",
+                  row("An", minutes(plan.forward.arrivals)),
+                  row("Wa", waits(plan.forward)),
+                  row("Ab", minutes(plan.forward.departures)),
+                  header,
+                  row("Ab", minutes(plan.backward.departures)),
+                  row("Wa", waits(plan.backward)),
+                  row("An", minutes(plan.backward.arrivals)),
+                  "",
+                  totals("Gesamtdauer Hinfahrt, Rückfahrt", plan.forward.duration, plan.backward.duration),
+                  totals("Summe Wartezeiten Hinfahrt, Rückfahrt", plan.forward.total_wait, plan.backward.total_wait),
+                  f"{'Summe Strafen':<40} : {plan.score}",
+                  ""]
+    return "\n".join(lines)
+
+
+class ConsoleConsumer(Consumer[OutputData]):
+    """ print the result in the task's format """
+
+    def write(self, output_data: OutputData) -> None:
+        print(f"{output_data.source}:\n\n{format_output(output_data)}")
+
+
+class FileConsumer(Consumer[OutputData]):
+    """ write the result to folder/<source>.out """
+
+    def __init__(self, folder: str | os.PathLike) -> None:
+        self.folder = Path(folder)
+
+    def write(self, output_data: OutputData) -> None:
+        path = (self.folder / output_data.source).with_suffix(".out")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(format_output(output_data), encoding="utf-8")
+
+
+"""
+Inline copies of the examples from the task description
+"""
+
+EXAMPLE_1 = """\
+Strecke:
+A B C
+Abstaende:
+5 7
+Start Hinfahrt:
+17
+"""
+
+EXAMPLE_2 = """\
+Strecke:
+A B C D E F G
+Abstaende:
+5 8 6 7 3 2
+Start Hinfahrt:
+17
+"""
+
+EXAMPLE_3 = """\
+Strecke:
+A B C D E F G H I J
+Abstaende:
+12 8 14 3 5 21 13 6 8
+Start Hinfahrt:
+17
+"""
+
+
+def solve_all_examples(execution: Execution | None = None) -> None:
+    """ solve the inline examples """
+    TrainScheduleProblem.of(
+        input=StreamProducer([("example_1", EXAMPLE_1), ("example_2", EXAMPLE_2), ("example_3", EXAMPLE_3)]),
+        process=TimetableSolver(),
+        output=ConsoleConsumer(),
+        execute=execution or Execution(),
+    ).solve()
+
+
+def time_validation(stations: int = 500, seed: int = 2024) -> None:
+    """ time checking the 60 starts of the return train of a random line with
+    the given number of stations against the outbound train """
+    rng = random.Random(seed)
+    pd = ProcessData(stations=[f"S{k}" for k in range(stations)],
+                     distances=[rng.randint(1, 8) for _ in range(stations - 1)], start=0)
+    forward = Occupancy.of(pd, Run.of(pd, pd.start))
+    backward = Occupancy.of(pd, Run.of(pd, 0, backward=True))
+    candidates = [backward.shifted(shift) for shift in range(HOUR)]
+    t0 = time.perf_counter()
+    valid = sum(not forward.collides(candidate) for candidate in candidates)
+    t1 = time.perf_counter()
+    for shift in range(HOUR):
+        backward.shifted(shift)
+    t2 = time.perf_counter()
+    print(f"{stations} Bahnhöfe: {(t1 - t0) / HOUR * 1e6:.2f} µs je Prüfung eines Fahrplans, "
+          f"{(t2 - t1) / HOUR * 1e6:.2f} µs je verschobener Rückfahrt, {valid} von {HOUR} Startzeiten kollisionsfrei")
+
+
+if __name__ == "__main__":
+    solve_all_examples()
+    time_validation()
@@ -1,6 +1,12 @@
 # (C) A.Voß, a.voss@fh-aachen.de, info@codebasedlearning.dev
 
-from .ipo import Producer, Processor, Consumer, BaseIPO, IPO, Tee, Merge, Chain, ipo_context
+from .ipo import Producer, Processor, Consumer, BaseIPO, IPO, Tee, Merge, Chain, Execution, RunSummary, ipo_context
+from .reducers import Reducer, Fold, Best, Tally
+from .aio import AsyncProducer, AsyncProcessor, AsyncConsumer, AsyncIPO
+from .aio import ThreadedProducer, ThreadedProcessor, ThreadedConsumer
+from .cache import CachedProcessor, CacheStats, fingerprint
+from .journal import Journal
+from .trace import Hook, Hooks, Profiler, StageTotals, Trace, TraceEvent, trace_ctx
 
 __all__ = [
     Producer.__name__,
@@ -11,5 +17,29 @@ __all__ = [
     Tee.__name__,
     Merge.__name__,
     Chain.__name__,
+    Execution.__name__,
+    RunSummary.__name__,
+    Reducer.__name__,
+    Fold.__name__,
+    Best.__name__,
+    Tally.__name__,
     ipo_context.__name__,
+    AsyncProducer.__name__,
+    AsyncProcessor.__name__,
+    AsyncConsumer.__name__,
+    AsyncIPO.__name__,
+    ThreadedProducer.__name__,
+    ThreadedProcessor.__name__,
+    ThreadedConsumer.__name__,
+    CachedProcessor.__name__,
+    CacheStats.__name__,
+    fingerprint.__name__,
+    Journal.__name__,
+    Hook.__name__,
+    Hooks.__name__,
+    Profiler.__name__,
+    StageTotals.__name__,
+    Trace.__name__,
+    TraceEvent.__name__,
+    'trace_ctx',
 ]
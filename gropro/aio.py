@@ -0,0 +1,256 @@
+# (C) Alexander Voß, a.voss@fh-aachen.de, info@codebasedlearning.dev
+
+"""
+Here the asyncio variant of the IPO framework is defined.
+
+AsyncIPO runs producer, processor(s) and consumer as separate tasks in one
+TaskGroup, connected by bounded queues:
+
+    producer --[queue]--> processor x workers --[queue]--> consumer --[queue]--> stream()
+
+A full queue suspends the stage in front of it (backpressure), so a slow
+sink throttles the source instead of piling up items in memory. I/O waits
+of the stages overlap instead of adding up.
+
+Synchronous components are accepted as well; they are offloaded to a
+thread via asyncio.to_thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from time import perf_counter
+from typing import Self
+
+from .ipo import (
+    Consumer,
+    DiscardConsumer,
+    EchoProducer,
+    HasOf,
+    IdentityProcessor,
+    Processor,
+    Producer,
+    bind_data_classes,
+    logger,
+)
+from .trace import trace_ctx
+
+# pylint: disable=too-few-public-methods
+# pylint: disable=missing-function-docstring
+
+_DONE = object()   # end-of-stream marker in the queues
+
+
+class AsyncProducer[I](ABC):
+    """ an async producer, e.g. a network or database reader """
+    @abstractmethod
+    def read(self, input_data: I) -> AsyncIterator[I]: ...
+
+
+class AsyncProcessor[P](ABC):
+    """ an async processor """
+    @abstractmethod
+    async def apply(self, process_data: P) -> P: ...
+
+
+class AsyncConsumer[O](ABC):
+    """ an async consumer, e.g. a network or database writer """
+    @abstractmethod
+    async def write(self, output_data: O) -> None: ...
+
+    async def close(self) -> None:                              # noqa: B027 - optional, nothing to flush by default
+        """ called once the pipeline has finished; flush here """
+
+
+class ThreadedProducer[I](AsyncProducer[I]):
+    """ runs a synchronous producer in a worker thread, item by item """
+    def __init__(self, producer: Producer[I]) -> None:
+        self.producer = producer
+
+    async def read(self, input_data: I) -> AsyncIterator[I]:
+        items = self.producer.read(input_data)
+        while (item := await asyncio.to_thread(next, items, _DONE)) is not _DONE:
+            yield item
+
+
+class ThreadedProcessor[P](AsyncProcessor[P]):
+    """ runs a synchronous processor in a worker thread """
+    def __init__(self, processor: Processor[P]) -> None:
+        self.processor = processor
+
+    async def apply(self, process_data: P) -> P:
+        return await asyncio.to_thread(self.processor.apply, process_data)
+
+
+class ThreadedConsumer[O](AsyncConsumer[O]):
+    """ runs a synchronous consumer in a worker thread """
+    def __init__(self, consumer: Consumer[O]) -> None:
+        self.consumer = consumer
+
+    async def write(self, output_data: O) -> None:
+        await asyncio.to_thread(self.consumer.write, output_data)
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self.consumer.close)
+
+
+def _name(component: object) -> str:
+    """ class name of the component, looking through the thread adapters """
+    match component:
+        case ThreadedProducer(producer=inner) | ThreadedProcessor(processor=inner) | ThreadedConsumer(consumer=inner):
+            return inner.__class__.__name__
+    return component.__class__.__name__
+
+
+class AsyncIPO[I, P, O]:
+    """ asyncio implementation of an IPO problem
+
+    workers    : number of processor tasks; with more than one, results are
+                 delivered as completed, not in input order
+    queue_size : capacity of each queue between two stages
+    """
+    input_data_class:   type[HasOf] = None     # subclass may set this
+    process_data_class: type[HasOf] = None
+    output_data_class:  type[HasOf] = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        bind_data_classes(cls)
+
+    def __init__(self, *, workers: int = 1, queue_size: int = 16) -> None:
+        if workers < 1 or queue_size < 1:
+            raise ValueError("workers and queue_size must be >= 1")
+        self.workers = workers
+        self.queue_size = queue_size
+        self.producer: AsyncProducer = ThreadedProducer(EchoProducer())
+        self.processor: AsyncProcessor = ThreadedProcessor(IdentityProcessor())
+        self.consumer: AsyncConsumer = ThreadedConsumer(DiscardConsumer())
+
+    def input(self, producer: AsyncProducer | Producer) -> Self:
+        self.producer = producer if isinstance(producer, AsyncProducer) else ThreadedProducer(producer)
+        return self
+
+    def process(self, processor: AsyncProcessor | Processor) -> Self:
+        self.processor = processor if isinstance(processor, AsyncProcessor) else ThreadedProcessor(processor)
+        return self
+
+    def output(self, consumer: AsyncConsumer | Consumer) -> Self:
+        self.consumer = consumer if isinstance(consumer, AsyncConsumer) else ThreadedConsumer(consumer)
+        return self
+
+    async def solve(self) -> list[O]:
+        return [output_data async for output_data in self.stream()]
+
+    async def stream(self) -> AsyncIterator[O]:
+        """ the OutputData, as the consumer has written them
+
+        The stages run in a task of their own; the caller only waits on the
+        last queue, so a failing stage never cancels the caller's code. The
+        error is raised here (as ExceptionGroup), after all stages stopped.
+        To stop early, close the stream, e.g. with contextlib.aclosing, which
+        cancels the stages. In any case, consumer.close() and hook.finish()
+        are called once the stages have stopped.
+        """
+        hook = trace_ctx.get()
+        written: asyncio.Queue = asyncio.Queue(self.queue_size)
+        stages = asyncio.create_task(self._run_stages(written, hook), name="ipo-stages")
+        getter: asyncio.Future | None = None
+        try:
+            while True:
+                if stages.done():
+                    stages.result()                 # raises if a stage failed
+                getter = asyncio.ensure_future(written.get())
+                await asyncio.wait((getter, stages), return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():               # stages finished first, check them again
+                    getter.cancel()
+                    continue
+                if (output_data := getter.result()) is _DONE:
+                    break
+                yield output_data
+        finally:
+            if getter is not None:
+                getter.cancel()
+            stages.cancel()
+            await asyncio.gather(stages, return_exceptions=True)
+            try:
+                await self.consumer.close()
+            finally:
+                if hook:
+                    hook.finish()
+
+    async def _run_stages(self, written: asyncio.Queue, hook) -> None:
+        """ producer, processors and consumer in one TaskGroup, feeding written """
+        debug = logger.isEnabledFor(logging.DEBUG)
+        to_process: asyncio.Queue = asyncio.Queue(self.queue_size)
+        to_write: asyncio.Queue = asyncio.Queue(self.queue_size)
+
+        async def read() -> None:
+            name = _name(self.producer)
+            t0 = perf_counter()
+            async for input_data in self.producer.read(self.input_data_class()):
+                if hook:
+                    hook.record("input", name, perf_counter() - t0, input_data)
+                if debug:
+                    logger.debug(f" I| - {f'read from {name}:':<40} {input_data}")
+                await to_process.put((input_data, self.process_data_class.of(input_data)))
+                if hook:
+                    hook.queue_depth("to_process", to_process.qsize())
+                t0 = perf_counter()
+            for _ in range(self.workers):
+                await to_process.put(_DONE)
+
+        async def process() -> None:
+            name = _name(self.processor)
+            while (item := await to_process.get()) is not _DONE:
+                input_data, process_data = item
+                t0 = perf_counter()
+                process_data = await self.processor.apply(process_data)
+                if hook:
+                    hook.record("process", name, perf_counter() - t0, process_data)
+                if debug:
+                    logger.debug(f" P| - {f'processed by {name}:':<40} - {process_data}")
+                await to_write.put((input_data, process_data))
+                if hook:
+                    hook.queue_depth("to_write", to_write.qsize())
+            await to_write.put(_DONE)
+
+        async def write() -> None:
+            name = _name(self.consumer)
+            remaining = self.workers
+            while remaining:
+                if (item := await to_write.get()) is _DONE:
+                    remaining -= 1
+                    continue
+                output_data = self.output_data_class.of(*item)
+                if debug:
+                    logger.debug(f" C| - {f'write to {name}:':<40} {output_data}")
+                t0 = perf_counter()
+                await self.consumer.write(output_data)
+                if hook:
+                    hook.record("output", name, perf_counter() - t0, output_data)
+                await written.put(output_data)
+
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(read(), name="ipo-input")
+            for n in range(self.workers):
+                tg.create_task(process(), name=f"ipo-process-{n}")
+            tg.create_task(write(), name="ipo-output")
+        await written.put(_DONE)
+
+    @classmethod
+    def of(cls,
+           input: AsyncProducer | Producer | None = None,  # pylint: disable=redefined-builtin
+           process: AsyncProcessor | Processor | None = None,
+           output: AsyncConsumer | Consumer | None = None,
+           *,
+           workers: int = 1,
+           queue_size: int = 16,
+           ) -> Self:
+        """ a problem with these stages; a stage left out echoes, passes on or discards """
+        return cls(workers=workers, queue_size=queue_size) \
+            .input(input if input is not None else EchoProducer()) \
+            .process(process if process is not None else IdentityProcessor()) \
+            .output(output if output is not None else DiscardConsumer())
@@ -0,0 +1,135 @@
+# (C) Alexander Voß, a.voss@fh-aachen.de, info@codebasedlearning.dev
+
+"""
+A bounded buffer with its own worker thread in front of a consumer, used by Tee.
+"""
+
+from __future__ import annotations
+
+import pickle
+import tempfile
+import threading
+from collections import deque
+from contextvars import copy_context
+from time import perf_counter
+
+from .trace import trace_ctx
+
+# pylint: disable=missing-function-docstring
+
+OVERFLOW_POLICIES = ("block", "drop-oldest", "spill")
+
+
+class SinkBuffer[O]:
+    """ feeds one consumer from a bounded queue on a dedicated thread
+
+    overflow, if the queue holds `capacity` items
+      'block'       : the writer waits for free space (backpressure)
+      'drop-oldest' : the oldest queued item is discarded (counted in `dropped`)
+      'spill'       : further items are pickled to a temporary file and read
+                      back in order once the queue has drained
+
+    An error raised by the consumer stops the worker and is re-raised on
+    every following put and on close. name identifies the sink in hooks
+    and defaults to the consumer's class name.
+    """
+
+    def __init__(self, consumer, capacity: int, overflow: str = "block", *, name: str | None = None) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"unknown overflow policy {overflow!r}, expected one of {OVERFLOW_POLICIES}")
+        self.consumer = consumer
+        self.name = name or consumer.__class__.__name__
+        self.capacity = capacity
+        self.overflow = overflow
+        self.dropped = 0
+        self.peak_depth = 0
+        self._queue: deque[O] = deque()
+        self._cond = threading.Condition()
+        self._spill = None                  # temporary file, created on first spill
+        self._spill_read = 0                # read offset in the spill file
+        self._spilled = 0                   # number of items in the spill file
+        self._closing = False
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=copy_context().run, args=(self._run,),
+                                        name=f"ipo-sink-{self.name}", daemon=True)
+        self._thread.start()
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue) + self._spilled
+
+    def put(self, item: O) -> None:
+        with self._cond:
+            self._raise_error()
+            if self._spilled or len(self._queue) >= self.capacity:
+                if self.overflow == "block":
+                    self._cond.wait_for(lambda: len(self._queue) < self.capacity or self._error)
+                    self._raise_error()
+                elif self.overflow == "drop-oldest":
+                    self._queue.popleft()
+                    self.dropped += 1
+                else:
+                    self._spill_item(item)
+                    self._cond.notify_all()
+                    return
+            self._queue.append(item)
+            self.peak_depth = max(self.peak_depth, self.depth)
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        """ write all buffered items and stop the worker """
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join()
+        if self._spill is not None:
+            self._spill.close()
+        self._raise_error()
+
+    def _run(self) -> None:
+        hook = trace_ctx.get()                  # the worker runs in a copy of the creator's context
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._spilled or self._closing)
+                if self._queue:
+                    item = self._queue.popleft()
+                elif self._spilled:
+                    item = self._unspill_item()
+                else:
+                    return
+                self._cond.notify_all()
+            try:
+                t0 = perf_counter() if hook else 0.0
+                self.consumer.write(item)
+                if hook:
+                    hook.record("tee", self.name, perf_counter() - t0, item)
+            except BaseException as e:      # pylint: disable=broad-exception-caught
+                with self._cond:
+                    self._error = e
+                    self._cond.notify_all()
+                return
+
+    def _spill_item(self, item: O) -> None:
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile(prefix="ipo-spill-")
+        self._spill.seek(0, 2)
+        pickle.dump(item, self._spill, protocol=pickle.HIGHEST_PROTOCOL)
+        self._spilled += 1
+        self.peak_depth = max(self.peak_depth, self.depth)
+
+    def _unspill_item(self) -> O:
+        self._spill.seek(self._spill_read)
+        item = pickle.load(self._spill)
+        self._spill_read = self._spill.tell()
+        self._spilled -= 1
+        if not self._spilled:               # drained, start over with an empty file
+            self._spill.seek(0)
+            self._spill.truncate()
+            self._spill_read = 0
+        return item
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise self._error
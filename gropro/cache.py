@@ -0,0 +1,303 @@
+# (C) Alexander Voß, a.voss@fh-aachen.de, info@codebasedlearning.dev
+
+"""
+A memoizing processor: results are looked up by a content hash of the
+incoming ProcessData, first in an in-memory LRU, then (optionally) in a
+directory on disk, and only on a miss the inner processor is applied.
+
+    CrosswordsProblem.of(
+        input=...,
+        process=CachedProcessor(CrosswordSolver(), directory=".cache/crosswords"),
+        output=...,
+    )
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, fields, is_dataclass
+from enum import Enum
+from pathlib import Path, PurePath
+from typing import TypeVar
+
+from .ipo import Processor
+
+# pylint: disable=missing-function-docstring
+
+P = TypeVar('P')   # ProcessData
+
+
+_PRIMITIVES = (type(None), bool, int, float, complex, str)
+
+_DISK_LOW_WATER = 0.8   # a full directory is trimmed to this fraction of max_disk_bytes
+
+
+def _canonical(obj: object) -> object:
+    """ a nested tuple that does not depend on dict/set order or hash seeds
+
+    Bytes and other buffers (bytearray, array.array, contiguous NumPy arrays,
+    ...) are represented by a hash of their content. Anything else that
+    has no content-based representation raises TypeError, as a repr() may
+    be truncated or contain the object's id.
+    """
+    if isinstance(obj, _PRIMITIVES):
+        return obj
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return (type(obj).__qualname__,
+                tuple((f.name, _canonical(getattr(obj, f.name))) for f in fields(obj)))
+    if isinstance(obj, dict):
+        return ('dict', tuple(sorted(((_canonical(k), _canonical(v)) for k, v in obj.items()), key=repr)))
+    if isinstance(obj, (set, frozenset)):
+        return ('set', tuple(sorted((_canonical(item) for item in obj), key=repr)))
+    if isinstance(obj, (list, tuple)):
+        return (type(obj).__name__, tuple(_canonical(item) for item in obj))
+    if isinstance(obj, Enum):
+        return (type(obj).__qualname__, obj.name)
+    if isinstance(obj, PurePath):
+        return (type(obj).__name__, str(obj))
+    if isinstance(obj, Processor):
+        return (type(obj).__qualname__, _canonical(processor_config(obj)))
+    try:
+        view = memoryview(obj)
+    except TypeError:
+        view = None
+    if view is None or 'O' in view.format:         # object arrays hold pointers, not content
+        raise TypeError(f"cannot fingerprint {type(obj).__qualname__!r} by content, "
+                        f"use a dataclass, a container, a buffer or a custom key")
+    with view:
+        return (type(obj).__qualname__, view.format, view.shape, hashlib.sha256(view.tobytes()).hexdigest())
+
+
+def fingerprint(obj: object) -> str:
+    """ stable content hash (sha256 hex) of dataclasses, containers, buffers and primitives """
+    return hashlib.sha256(repr(_canonical(obj)).encode()).hexdigest()
+
+
+def processor_config(processor: Processor) -> object:
+    """ the part of a processor's state its results depend on
+
+    processor.cache_token() if it defines one, else its public instance
+    attributes. Define cache_token() if these include callbacks or other
+    objects without a content-based fingerprint, or settings that do not
+    change the result.
+    """
+    if (cache_token := getattr(processor, "cache_token", None)) is not None:
+        return cache_token()
+    return {name: value for name, value in vars(processor).items() if not name.startswith('_')}
+
+
+def is_final(result: object) -> bool:
+    """ False for results flagged as not optimal, e.g. by a search stopped at its budget """
+    return getattr(result, "optimal", True) is not False
+
+
+@dataclass
+class CacheStats:
+    """ counters of a CachedProcessor """
+    hits: int = 0           # found in memory
+    disk_hits: int = 0      # found on disk
+    misses: int = 0         # inner processor was applied
+    uncached: int = 0       # results not stored, see CachedProcessor.store_if
+    evictions: int = 0      # dropped from memory because of maxsize/max_bytes
+    expirations: int = 0    # dropped because older than max_age
+    disk_evictions: int = 0  # removed from disk because of max_disk_bytes
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / lookups if lookups else 0.0
+
+
+class CachedProcessor(Processor[P]):
+    """ skips inner.apply for ProcessData that has been processed before
+
+    maxsize   : max. number of results kept in memory (LRU)
+    max_bytes : max. total size of the pickled results kept in memory
+    max_age   : seconds after which a result is recomputed (memory and disk)
+    directory : optional on-disk store, shared between runs and processes
+    max_disk_bytes : max. total size of the files in directory
+    key       : ProcessData -> str, defaults to fingerprint
+    store_if  : result -> bool, whether to keep a result; by default results
+                with optimal == False (e.g. from a budgeted search) are
+                returned but not stored
+
+    Results are stored pickled, so every hit returns a fresh copy. The key
+    also includes the inner processor's class name and configuration (see
+    processor_config, taken when the cache is created), so different
+    processors, or one processor with different settings, can share one
+    directory.
+
+    The directory is swept when the cache is created and again while
+    writing, once max_age has passed since the last sweep or the files
+    written exceed max_disk_bytes: expired files are removed, then the
+    oldest ones until the rest fits into 80% of max_disk_bytes.
+    """
+
+    def __init__(self, inner: Processor[P], *,
+                 maxsize: int = 1024,
+                 max_bytes: int | None = None,
+                 max_age: float | None = None,
+                 directory: str | os.PathLike | None = None,
+                 max_disk_bytes: int | None = None,
+                 key: Callable[[P], str] = fingerprint,
+                 store_if: Callable[[P], bool] = is_final) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        if max_disk_bytes is not None and max_disk_bytes < 1:
+            raise ValueError("max_disk_bytes must be >= 1")
+        self.inner = inner
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.directory = Path(directory) if directory is not None else None
+        self.max_disk_bytes = max_disk_bytes
+        self.key = key
+        self.store_if = store_if
+        self.stats = CacheStats()
+        self._prefix = f"{inner.__class__.__qualname__}-{fingerprint(inner)[:16]}"
+        self._memory: OrderedDict[str, tuple[float, bytes]] = OrderedDict()     # key -> (created, blob)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._disk_bytes = 0                        # size of the directory, as of the last sweep plus writes
+        self._swept = 0.0                           # time of the last sweep
+        if self.directory is not None and (max_age is not None or max_disk_bytes is not None):
+            self.sweep()
+
+    def __getstate__(self) -> dict:                 # picklable for process pools
+        state = vars(self).copy()
+        state['_memory'], state['_bytes'], state['_lock'] = OrderedDict(), 0, None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        vars(self).update(state)
+        self._lock = threading.Lock()
+
+    def apply(self, process_data: P) -> P:
+        key = f"{self._prefix}-{self.key(process_data)}"
+        if (blob := self._lookup(key)) is not None:
+            return pickle.loads(blob)
+        result = self.inner.apply(process_data)
+        if not self.store_if(result):
+            with self._lock:
+                self.stats.misses += 1
+                self.stats.uncached += 1
+            return result
+        blob = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self.stats.misses += 1
+            self._remember(key, time.time(), blob)
+        self._store(key, blob)
+        return result
+
+    def clear(self) -> None:
+        """ forget all results, in memory and on disk """
+        with self._lock:
+            self._memory.clear()
+            self._bytes = 0
+            self._disk_bytes = 0
+        if self.directory is not None and self.directory.exists():
+            for path in self.directory.glob("*/*.pickle"):
+                path.unlink(missing_ok=True)
+
+    def sweep(self) -> None:
+        """ remove expired files from the directory, then the oldest ones above max_disk_bytes """
+        if self.directory is None:
+            return
+        now = time.time()
+        files, expired = [], 0
+        for path in self.directory.glob("*/*.pickle"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:               # removed by another process meanwhile
+                continue
+            if self._expired(stat.st_mtime):
+                path.unlink(missing_ok=True)
+                expired += 1
+            else:
+                files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        evicted = 0
+        if self.max_disk_bytes is not None and total > self.max_disk_bytes:
+            files.sort(key=lambda file: file[0])
+            for _, size, path in files:
+                if total <= self.max_disk_bytes * _DISK_LOW_WATER:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                evicted += 1
+        with self._lock:
+            self._disk_bytes = total
+            self._swept = now
+            self.stats.expirations += expired
+            self.stats.disk_evictions += evicted
+
+    def _expired(self, created: float) -> bool:
+        return self.max_age is not None and time.time() - created > self.max_age
+
+    def _lookup(self, key: str) -> bytes | None:
+        with self._lock:
+            if (entry := self._memory.get(key)) is not None:
+                created, blob = entry
+                if not self._expired(created):
+                    self._memory.move_to_end(key)
+                    self.stats.hits += 1
+                    return blob
+                self._forget(key)
+                self.stats.expirations += 1
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            created = path.stat().st_mtime
+            if self._expired(created):
+                path.unlink(missing_ok=True)
+                with self._lock:
+                    self.stats.expirations += 1
+                return None
+            blob = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            self.stats.disk_hits += 1
+            self._remember(key, created, blob)
+        return blob
+
+    def _remember(self, key: str, created: float, blob: bytes) -> None:
+        """ add to the LRU and evict the least recently used entries (lock held) """
+        if key in self._memory:
+            self._forget(key)
+        self._memory[key] = (created, blob)
+        self._bytes += len(blob)
+        while len(self._memory) > self.maxsize or \
+                (self.max_bytes is not None and self._bytes > self.max_bytes and len(self._memory) > 1):
+            self._forget(next(iter(self._memory)))
+            self.stats.evictions += 1
+
+    def _forget(self, key: str) -> None:
+        _, blob = self._memory.pop(key)
+        self._bytes -= len(blob)
+
+    def _path(self, key: str) -> Path:
+        digest = key.rsplit('-', 1)[-1]
+        return self.directory / digest[:2] / f"{key}.pickle"
+
+    def _store(self, key: str, blob: bytes) -> None:
+        if self.directory is None:
+            return
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(blob)
+        os.replace(tmp, path)                       # atomic, readers never see half a file
+        with self._lock:
+            self._disk_bytes += len(blob)
+            due = (self.max_disk_bytes is not None and self._disk_bytes > self.max_disk_bytes) or \
+                (self.max_age is not None and time.time() - self._swept > self.max_age)
+        if due:
+            self.sweep()
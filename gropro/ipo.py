@@ -6,24 +6,43 @@ Here the IPO framework is defined.
 
 from __future__ import annotations
 
+import concurrent.futures
+import heapq
+import logging
+import os
+import sys
 from abc import ABC, abstractmethod
-from typing import Iterator, Generic, TypeVar, Protocol, get_args
-try:
-    from typing import Self
-except ImportError:                                  # Python < 3.11
-    from typing_extensions import Self
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
 from contextlib import contextmanager
-from contextvars import ContextVar
+from contextvars import ContextVar, copy_context
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import batched, chain, repeat
+from operator import itemgetter
+from time import perf_counter
+from typing import TYPE_CHECKING, Generic, Protocol, Self, TypeVar, get_args
+
+from .buffer import OVERFLOW_POLICIES, SinkBuffer
+from .trace import Hook, Hooks, StageTotals, trace_ctx
+
+if TYPE_CHECKING:                                    # journal -> cache -> ipo
+    from .journal import Journal
+    from .reducers import Reducer
 
-import logging
 logger = logging.getLogger('ipo')
 
+# Logging rule for the hot loop: check logger.isEnabledFor(logging.DEBUG) once
+# per call and only then build the message, so a disabled 'ipo' logger costs
+# neither string formatting nor a repr of the (possibly large) data objects.
+
 # pylint: disable=too-few-public-methods
 # pylint: disable=missing-function-docstring
 
 I = TypeVar('I')   # InputData
 P = TypeVar('P')   # ProcessData
 O = TypeVar('O')   # OutputData
+T = TypeVar('T')
 
 
 class Producer(ABC, Generic[I]):
@@ -37,37 +56,162 @@ class Processor(ABC, Generic[P]):
     @abstractmethod
     def apply(self, process_data: P) -> P: ...
 
+    def apply_batch(self, batch: list[P]) -> list[P]:
+        """ process a micro-batch, one result per item and in the same order;
+        override to vectorize, e.g. with NumPy """
+        return [self.apply(process_data) for process_data in batch]
+
 
 class Consumer(ABC, Generic[O]):
     """ a consumer such as a file writer """
     @abstractmethod
     def write(self, output_data: O) -> None: ...
 
+    def close(self) -> None:
+        """ called once the pipeline has finished (or failed); flush here """
+
+
+def _component_names(items: Iterable[object]) -> tuple[str, ...]:
+    """ class names of the components for hooks and logs; a name that occurs
+    more than once gets the position appended ('Writer#0', 'Writer#2') """
+    names = [item.__class__.__name__ for item in items]
+    return tuple(f"{name}#{i}" if names.count(name) > 1 else name for i, name in enumerate(names))
+
 
 class Tee(Consumer[O]):
-    """ multiple consumers """
-    def __init__(self, *items: Consumer[O]) -> None: # producers: list[Producer[I]]
+    """ multiple consumers
+
+    buffer=0 (default) calls the consumers one after another. With buffer=n,
+    each consumer gets a queue of n items and a thread of its own, so the
+    pipeline runs at the pace of the slowest sink, not the sum of all sinks;
+    see SinkBuffer for the overflow policies. All sinks receive the same
+    OutputData object and must not modify it.
+    """
+    def __init__(self, *items: Consumer[O], buffer: int = 0, overflow: str = "block") -> None:
         if not all(isinstance(item, Consumer) for item in items):
             raise TypeError("items must all be Consumers")
+        if buffer < 0:
+            raise ValueError("buffer must be >= 0")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"unknown overflow policy {overflow!r}, expected one of {OVERFLOW_POLICIES}")
         self.consumers: tuple[Consumer[O], ...] = items
+        self.names = _component_names(items)
+        self.buffer = buffer
+        self.overflow = overflow
+        self.sinks: list[SinkBuffer[O]] | None = None      # started on first write
+
     def write(self, output_data: O) -> None:
+        hook = trace_ctx.get()
+        if not self.buffer:
+            for consumer, name in zip(self.consumers, self.names, strict=True):
+                t0 = perf_counter() if hook else 0.0
+                consumer.write(output_data)
+                if hook:
+                    hook.record("tee", name, perf_counter() - t0, output_data)
+            return
+        if self.sinks is None:
+            self.sinks = [SinkBuffer(consumer, self.buffer, self.overflow, name=name)
+                          for consumer, name in zip(self.consumers, self.names, strict=True)]
+        for sink in self.sinks:
+            sink.put(output_data)
+            if hook:
+                hook.queue_depth(f"tee:{sink.name}", sink.depth)
+
+    def close(self) -> None:
+        sinks, self.sinks = self.sinks or [], None
+        errors = []
+        for sink in sinks:
+            try:
+                sink.close()
+            except Exception as e:      # pylint: disable=broad-exception-caught
+                errors.append(e)
         for consumer in self.consumers:
-            consumer.write(output_data)
+            consumer.close()
+        if errors:
+            raise errors[0]
+
+
+MERGE_STRATEGIES = ("fold", "latest", "concat", "interleave", "kmerge")
 
 
 class Merge(Producer[I]):
-    """ multiple producers """
-    def __init__(self, *items: Producer[I]) -> None:
+    """ multiple producers
+
+    strategy
+      'fold'       : each producer refines the data of the previous ones, one
+                     item is yielded at the end (default, e.g. config + .env)
+      'latest'     : like 'fold', but every refinement is yielded at once
+      'concat'     : all items of the first producer, then of the second, ...
+      'interleave' : round-robin, one item per producer in turn
+      'kmerge'     : k-way merge of producers that are each sorted by key
+
+    All strategies are lazy and hold at most one pending item per producer.
+    """
+    def __init__(self, *items: Producer[I],
+                 strategy: str = "fold",
+                 key: Callable[[I], object] | None = None) -> None:
         if not all(isinstance(item, Producer) for item in items):
             raise TypeError("items must all be Producers")
+        if strategy not in MERGE_STRATEGIES:
+            raise ValueError(f"unknown merge strategy {strategy!r}, expected one of {MERGE_STRATEGIES}")
         self.producers: tuple[Producer[I], ...] = items
+        self.names = _component_names(items)
+        self.strategy = strategy
+        self.key = key
 
     def read(self, input_data: I) -> Iterator[I]:
-        for producer in self.producers:
-            for partial in producer.read(input_data):
-                input_data = partial
-            logger.debug(f" I|   - {f'read from {producer.__class__.__name__}:':<40} {input_data}")
-        yield input_data
+        if self.strategy in ("fold", "latest"):
+            yield from self._fold(input_data, emit_each=self.strategy == "latest")
+            return
+        debug, hook = logger.isEnabledFor(logging.DEBUG), trace_ctx.get()
+        sources = [self._source(producer, name, input_data, hook)
+                   for producer, name in zip(self.producers, self.names, strict=True)]
+        if self.strategy == "concat":
+            tagged = chain.from_iterable(sources)
+        elif self.strategy == "interleave":
+            tagged = _round_robin(sources)
+        else:
+            key = self.key
+            tagged = heapq.merge(*sources, key=(lambda item: key(item[1])) if key else itemgetter(1))
+        for name, item in tagged:
+            if debug:
+                logger.debug(f" I|   - {f'read from {name}:':<40} {item}")
+            yield item
+
+    def _fold(self, input_data: I, emit_each: bool) -> Iterator[I]:
+        debug, hook = logger.isEnabledFor(logging.DEBUG), trace_ctx.get()
+        for producer, name in zip(self.producers, self.names, strict=True):
+            t0 = perf_counter() if hook else 0.0
+            for partial_data in producer.read(input_data):
+                input_data = partial_data
+                if emit_each:
+                    yield input_data
+            if hook:
+                hook.record("merge", name, perf_counter() - t0, input_data)
+            if debug:
+                logger.debug(f" I|   - {f'read from {name}:':<40} {input_data}")
+        if not emit_each:
+            yield input_data
+
+    @staticmethod
+    def _source(producer: Producer[I], name: str, input_data: I, hook) -> Iterator[tuple[str, I]]:
+        """ the producer's items, tagged with its name """
+        items = producer.read(input_data)
+        if hook:
+            items = _timed_iter(items, hook, "merge", name)
+        return zip(repeat(name), items)
+
+
+def _round_robin[T](iterators: list[Iterator[T]]) -> Iterator[T]:
+    active = deque(iterators)
+    while active:
+        iterator = active.popleft()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            continue
+        active.append(iterator)
+        yield item
 
 
 class Chain(Processor[P]):
@@ -76,13 +220,34 @@ class Chain(Processor[P]):
         if not all(isinstance(item, Processor) for item in items):
             raise TypeError("items must all be Processor")
         self.processors: tuple[Processor[P], ...] = items
+        self.names = _component_names(items)
 
     def apply(self, process_data: P) -> P:
-        for processor in self.processors:
+        debug, hook = logger.isEnabledFor(logging.DEBUG), trace_ctx.get()
+        if not (debug or hook):
+            for processor in self.processors:
+                process_data = processor.apply(process_data)
+            return process_data
+        for processor, name in zip(self.processors, self.names, strict=True):
+            t0 = perf_counter()
             process_data = processor.apply(process_data)
-            logger.debug(f" P|   - {f'processed by {processor.__class__.__name__}:':<40} - {process_data}")
+            if hook:
+                hook.record("chain", name, perf_counter() - t0, process_data)
+            if debug:
+                logger.debug(f" P|   - {f'processed by {name}:':<40} - {process_data}")
         return process_data
 
+    def apply_batch(self, batch: list[P]) -> list[P]:
+        debug, hook = logger.isEnabledFor(logging.DEBUG), trace_ctx.get()
+        for processor, name in zip(self.processors, self.names, strict=True):
+            t0 = perf_counter() if hook else 0.0
+            batch = processor.apply_batch(batch)
+            if hook:
+                hook.record("chain", name, perf_counter() - t0, batch)
+            if debug:
+                logger.debug(f" P|   - {f'processed by {name}:':<40} - {len(batch)} items")
+        return batch
+
 
 class EchoProducer(Producer[I]):
     """ a producer that echoes its input """
@@ -102,6 +267,170 @@ class DiscardConsumer(Consumer):
         pass
 
 
+EXECUTION_MODES = ("serial", "thread", "process", "interpreter", "auto")
+
+
+@dataclass(frozen=True)
+class Execution:
+    """ how IPO.stream runs the processor: serially or on a pool of workers
+
+    mode     : 'serial' (default), 'thread', 'process', 'interpreter' (3.14+),
+               or 'auto' (threads on a free-threaded build, processes otherwise)
+    workers  : pool size, defaults to the number of usable cores
+    window   : max. number of items (or batches) in flight, defaults to 2*workers
+    ordered  : yield results in input order (True) or as completed (False)
+    batch_size : group producer output into micro-batches of this size and
+               call processor.apply_batch instead of processor.apply
+    errors   : 'raise' (default) stops the stream at the first processor error,
+               'skip' logs a warning, reports stage 'error' to the trace hook
+               and continues with the next item (or batch)
+
+    Producer and consumer are always called from the thread that iterates
+    the stream; only processor.apply runs on the pool. For 'process' and
+    'interpreter', processor and ProcessData must be picklable.
+    """
+    mode: str = "serial"
+    workers: int | None = None
+    window: int | None = None
+    ordered: bool = True
+    batch_size: int = 1
+    errors: str = "raise"
+
+    def __post_init__(self) -> None:
+        if self.mode not in EXECUTION_MODES:
+            raise ValueError(f"unknown execution mode {self.mode!r}, expected one of {EXECUTION_MODES}")
+        if self.workers is not None and self.workers < 1:
+            raise ValueError("workers must be >= 1")
+        if self.window is not None and self.window < 1:
+            raise ValueError("window must be >= 1")
+        if self.batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        if self.errors not in ("raise", "skip"):
+            raise ValueError(f"unknown error policy {self.errors!r}, expected 'raise' or 'skip'")
+
+    @property
+    def is_serial(self) -> bool:
+        return self.mode == "serial"
+
+    def resolved_mode(self) -> str:
+        if self.mode != "auto":
+            return self.mode
+        gil_enabled = not hasattr(sys, '_is_gil_enabled') or sys._is_gil_enabled()  # pylint: disable=protected-access
+        return "process" if gil_enabled else "thread"
+
+    def resolved_workers(self) -> int:
+        return self.workers or os.process_cpu_count() or 1
+
+    def resolved_window(self) -> int:
+        return self.window or 2 * self.resolved_workers()
+
+    def executor(self) -> concurrent.futures.Executor:
+        mode, workers = self.resolved_mode(), self.resolved_workers()
+        if mode == "thread":
+            return concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ipo")
+        if mode == "process":
+            return concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        if mode == "interpreter":
+            return concurrent.futures.InterpreterPoolExecutor(max_workers=workers)
+        raise ValueError(f"execution mode {mode!r} has no executor")
+
+
+
+def _timed_call[A, R](func: Callable[[A], R], arg: A) -> tuple[R, float]:
+    """ call func(arg) and return the result with the elapsed seconds (picklable via partial) """
+    t0 = perf_counter()
+    result = func(arg)
+    return result, perf_counter() - t0
+
+
+@dataclass(frozen=True, slots=True)
+class _Failure:
+    """ returned instead of a result if the processor raised (errors='skip') """
+    error: Exception
+
+
+def _guarded_call[A, R](func: Callable[[A], R], arg: A) -> R | _Failure:
+    try:
+        return func(arg)
+    except Exception as e:          # pylint: disable=broad-exception-caught
+        return _Failure(e)
+
+
+def _parallel_map[K, A, R](execution: Execution,
+                           func: Callable[[A], R],
+                           items: Iterable[tuple[K, A]],
+                           hook: Hook | None = None) -> Iterator[tuple[K, R]]:
+    """ apply func to the second element of each pair on a pool, keeping at most
+    execution.window calls in flight; the first element is passed through """
+    window = execution.resolved_window()
+    items = iter(items)
+    executor = execution.executor()
+    # threads get a copy of the caller's context, so ContextVars (trace_ctx,
+    # runtime args set via ipo_context, ...) are visible in the workers
+    in_context = execution.resolved_mode() == "thread"
+    pending: deque[tuple[K, concurrent.futures.Future[R]]] = deque()
+    try:
+        def fill() -> None:
+            while len(pending) < window:
+                try:
+                    tag, arg = next(items)
+                except StopIteration:
+                    return
+                if in_context:
+                    future = executor.submit(copy_context().run, func, arg)
+                else:
+                    future = executor.submit(func, arg)
+                pending.append((tag, future))
+            if hook:
+                hook.queue_depth("in-flight", len(pending))
+
+        fill()
+        while pending:
+            if execution.ordered:
+                tag, future = pending.popleft()
+                result = future.result()
+            else:
+                done, _ = concurrent.futures.wait([f for _, f in pending],
+                                                  return_when=concurrent.futures.FIRST_COMPLETED)
+                index = next(i for i, (_, f) in enumerate(pending) if f in done)
+                tag, future = pending[index]
+                del pending[index]
+                result = future.result()
+            fill()
+            yield tag, result
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _batched_pairs[K, A](pairs: Iterable[tuple[K, A]], size: int) -> Iterator[tuple[tuple[K, ...], list[A]]]:
+    """ group (input, process) pairs into (inputs, process batch) """
+    for chunk in batched(pairs, size, strict=False):    # the last batch may be shorter
+        inputs, batch = zip(*chunk, strict=True)
+        yield inputs, list(batch)
+
+
+def _timed_iter[T](items: Iterator[T], hook, stage: str, component: str) -> Iterator[T]:
+    """ report the time spent producing each item """
+    while True:
+        t0 = perf_counter()
+        try:
+            item = next(items)
+        except StopIteration:
+            return
+        hook.record(stage, component, perf_counter() - t0, item)
+        yield item
+
+
+@dataclass
+class RunSummary:
+    """ what IPO.run reports instead of the list of all OutputData """
+    count: int = 0                                  # outputs yielded
+    errors: int = 0                                 # inputs skipped (Execution(errors='skip'))
+    wall_time: float = 0.0                          # seconds
+    stage_times: dict[str, float] = field(default_factory=dict)   # 'input'/'process'/'output' -> seconds
+    reduced: dict[str, object] = field(default_factory=dict)      # reducer name -> result
+
+
 class BaseIPO(ABC, Generic[I, P, O]):
     """ base interface for an IPO problem """
 
@@ -118,13 +447,36 @@ class BaseIPO(ABC, Generic[I, P, O]):
     def solve(self) -> list[O]: ... # ResultData[I,P,O]
 
     @abstractmethod
-    def stream(self) -> Iterator[O]: ...
+    def run(self, *reducers: Reducer, execution: Execution | None = None) -> RunSummary: ...
+
+    @abstractmethod
+    def drain(self, execution: Execution | None = None) -> int: ...
+
+    @abstractmethod
+    def stream(self, execution: Execution | None = None) -> Iterator[O]: ...
 
 
 class HasOf(Protocol):
     @classmethod
     def of(cls, *args) -> Self: ...
 
+
+def bind_data_classes(cls: type) -> None:
+    """ set input/process/output_data_class from the type arguments of cls[I, P, O] """
+    # Use vars(cls), NOT getattr — getattr would walk the MRO and pick up
+    # IPOProblem's own IPO[I,P,O] bases, silently assigning the raw
+    # TypeVars (~I, ~P, ~O) as data classes.
+    for base in vars(cls).get('__orig_bases__', ()):
+        args = get_args(base)
+        if len(args) == 3:
+            cls.input_data_class, cls.process_data_class, cls.output_data_class = args
+            return
+    if cls.process_data_class is None or cls.output_data_class is None:
+        raise TypeError(
+            f"{cls.__name__} must be parameterized with data classes: "
+            f"class {cls.__name__}(IPOProblem[InputData, ProcessData, OutputData]): ..."
+        )
+
 class IPO(BaseIPO[I,P,O]):
     """ base implementation of an IPO problem """
     input_data_class:   type[HasOf] = None     # subclass may set this
@@ -133,24 +485,14 @@ class IPO(BaseIPO[I,P,O]):
 
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
-        # Use vars(cls), NOT getattr — getattr would walk the MRO and pick up
-        # IPOProblem's own IPO[I,P,O] bases, silently assigning the raw
-        # TypeVars (~I, ~P, ~O) as data classes.
-        for base in vars(cls).get('__orig_bases__', ()):
-            args = get_args(base)
-            if len(args) == 3:
-                cls.input_data_class, cls.process_data_class, cls.output_data_class = args
-                return
-        if cls.process_data_class is None or cls.output_data_class is None:
-            raise TypeError(
-                f"{cls.__name__} must be parameterized with data classes: "
-                f"class {cls.__name__}(IPOProblem[InputData, ProcessData, OutputData]): ..."
-            )
+        bind_data_classes(cls)
 
     def __init__(self) -> None:
         self.producer: Producer = EchoProducer()
         self.processor: Processor = IdentityProcessor()
         self.consumer: Consumer = DiscardConsumer()
+        self.execution: Execution = Execution()
+        self.journal: Journal | None = None
 
     def input(self, producer: Producer) -> Self:
         self.producer = producer
@@ -164,10 +506,45 @@ class IPO(BaseIPO[I,P,O]):
         self.consumer = consumer
         return self
 
+    def execute(self, execution: Execution) -> Self:
+        self.execution = execution
+        return self
+
+    def checkpoint(self, journal: Journal | None) -> Self:
+        """ record completed inputs in journal and skip those recorded before;
+        their journaled outputs are yielded and, unless journal.rewrite is
+        False, written to the consumer again """
+        self.journal = journal
+        return self
+
     def solve(self) -> list[O]:
         return list(self.stream())
 
-    def stream(self) -> Iterator[O]:
+    def run(self, *reducers: Reducer, execution: Execution | None = None) -> RunSummary:
+        """ like solve(), but keeps no OutputData; reducers aggregate them one by one """
+        totals = StageTotals()
+        outer = trace_ctx.get()
+        summary = RunSummary()
+        t0 = perf_counter()
+        with ipo_context(trace_ctx, totals if outer is None else Hooks(outer, totals)):
+            for output_data in self.stream(execution):
+                summary.count += 1
+                for reducer in reducers:
+                    reducer.add(output_data)
+        summary.wall_time = perf_counter() - t0
+        summary.errors = totals.counts.get("error", 0)
+        summary.stage_times = {stage: totals.seconds.get(stage, 0.0) for stage in ("input", "process", "output")}
+        summary.reduced = {reducer.name: reducer.result() for reducer in reducers}
+        return summary
+
+    def drain(self, execution: Execution | None = None) -> int:
+        """ run the pipeline for the consumer's side effects only; returns the number of outputs """
+        count = 0
+        for _ in self.stream(execution):
+            count += 1
+        return count
+
+    def stream(self, execution: Execution | None = None) -> Iterator[O]:
         missing = [name for name, slot in
                    (("input", self.producer),
                     ("process", self.processor),
@@ -176,32 +553,119 @@ class IPO(BaseIPO[I,P,O]):
             raise RuntimeError(
                 f"{type(self).__name__} pipeline incomplete: missing {', '.join(missing)}"
             )
+        execution = execution or self.execution
+        debug, hook = logger.isEnabledFor(logging.DEBUG), trace_ctx.get()
+        producer_name = self.producer.__class__.__name__
+        processor_name = self.processor.__class__.__name__
+        consumer_name = self.consumer.__class__.__name__
+
         input_data_base = self.input_data_class()
-        for input_data in self.producer.read(input_data_base):
+        inputs = self.producer.read(input_data_base)
+        if hook:
+            inputs = _timed_iter(inputs, hook, "input", producer_name)
+        batch_size = execution.batch_size
+        apply = self.processor.apply if batch_size == 1 else self.processor.apply_batch
+        if execution.errors == "skip":
+            apply = partial(_guarded_call, apply)
+        # with a hook, the processor reports its own duration (also from workers)
+        if hook:
+            apply = partial(_timed_call, apply)
+        journal = self.journal
+        replayed: deque[O] = deque()        # journaled outputs of skipped inputs
+        if journal is not None:
+            inputs = self._unjournaled(inputs, journal, replayed)
+        prepared = self._prepared(inputs, debug)
+        if batch_size > 1:
+            prepared = _batched_pairs(prepared, batch_size)
+        if execution.is_serial:
+            results = ((tag, apply(arg)) for tag, arg in prepared)
+        else:
+            results = _parallel_map(execution, apply, prepared, hook)
+
+        def write(output_data: O) -> None:
+            if debug:
+                logger.debug(f" C| - {f'write to {consumer_name}:':<40} {output_data}")
+            if hook:
+                t0 = perf_counter()
+                self.consumer.write(output_data)
+                hook.record("output", consumer_name, perf_counter() - t0, output_data)
+            else:
+                self.consumer.write(output_data)
+
+        def replay() -> Iterator[O]:
+            while replayed:
+                output_data = replayed.popleft()
+                if journal.rewrite:
+                    write(output_data)
+                yield output_data
+
+        try:
+            for tag, processed in results:
+                yield from replay()
+                if hook:
+                    processed, seconds = processed
+                    hook.record("process", processor_name, seconds, processed)
+                if isinstance(processed, _Failure):
+                    self._skip(tag if batch_size > 1 else (tag,), processed.error, hook)
+                    continue
+                if batch_size == 1:
+                    tag, processed = (tag,), (processed,)
+                for input_data, process_data in zip(tag, processed, strict=True):
+                    if debug:
+                        logger.debug(f" P| - {f'processed by {processor_name}:':<40} - {process_data}")
+                    output_data = self.output_data_class.of(input_data, process_data)
+                    write(output_data)
+                    if journal is not None:
+                        journal.append(journal.key(input_data), output_data)
+
+                    yield output_data
+            yield from replay()
+        finally:
+            self.consumer.close()
+            if hook:
+                hook.finish()
+
+    def _skip(self, inputs: tuple[I, ...], error: Exception, hook) -> None:
+        """ report inputs whose processing failed (errors='skip') """
+        name = self.processor.__class__.__name__
+        for input_data in inputs:
+            logger.warning(" P| - %s failed, input skipped: %r (%s)", name, error, input_data)
+            if hook:
+                hook.record("error", name, 0.0, error)
+
+    @staticmethod
+    def _unjournaled(inputs: Iterable[I], journal: Journal, replayed: deque[O]) -> Iterator[I]:
+        """ pass on new inputs; queue the journaled outputs of completed ones """
+        for input_data in inputs:
+            key = journal.key(input_data)
+            if key in journal:
+                replayed.append(journal.get(key))
+            else:
+                yield input_data
+
+    def _prepared(self, inputs: Iterable[I], debug: bool) -> Iterator[tuple[I, P]]:
+        for input_data in inputs:
             process_data = self.process_data_class.of(input_data)
-            logger.debug(f" I| - {f'read from {self.producer.__class__.__name__}:':<40} {input_data}")
-
-            process_data = self.processor.apply(process_data)
-            logger.debug(f" P| - {f'processed by {self.processor.__class__.__name__}:':<40} - {process_data}")
-            output_data = self.output_data_class.of(input_data, process_data)
-
-            logger.debug(f" C| - {f'write to {self.consumer.__class__.__name__}:':<40} {output_data}")
-            self.consumer.write(output_data)
-
-            yield output_data
+            if debug:
+                logger.debug(f" I| - {f'read from {self.producer.__class__.__name__}:':<40} {input_data}")
+            yield input_data, process_data
 
     @classmethod
     def of(cls,
-           input: Producer = EchoProducer(),  # pylint: disable=redefined-builtin
-           process: Processor = IdentityProcessor(),
-           output: Consumer = DiscardConsumer(),
+           input: Producer | None = None,  # pylint: disable=redefined-builtin
+           process: Processor | None = None,
+           output: Consumer | None = None,
+           execute: Execution | None = None,
+           checkpoint: Journal | None = None,
            ) -> Self:
+        """ a problem with these stages; a stage left out echoes, passes on or discards """
         return cls() \
-            .input(input) \
-            .process(process) \
-            .output(output)
+            .input(input if input is not None else EchoProducer()) \
+            .process(process if process is not None else IdentityProcessor()) \
+            .output(output if output is not None else DiscardConsumer()) \
+            .execute(execute or Execution()) \
+            .checkpoint(checkpoint)
 
-T = TypeVar('T')
 
 @contextmanager
 def ipo_context(ctx_var: ContextVar[T], value: T):
@@ -0,0 +1,116 @@
+# (C) Alexander Voß, a.voss@fh-aachen.de, info@codebasedlearning.dev
+
+"""
+Checkpointing for long IPO runs.
+
+A Journal is an append-only file of (key, OutputData) records, one per
+input that has been processed and written by the consumer. A pipeline with
+a journal skips inputs whose key is already recorded, so a crashed run
+resumes where it stopped:
+
+    problem.of(input=..., process=..., output=..., checkpoint=Journal("run.journal")).solve()
+
+The outputs of skipped inputs are taken from the journal and passed to
+the consumer again, so a consumer that rewrites its output (a file, the
+console) gets the complete result. For a consumer that keeps the output of
+the crashed run (appending to a file or a database), pass rewrite=False.
+
+Record layout: key length (2 bytes) and output length (4 bytes, both
+little-endian), the utf-8 key, then the pickled output. Opening a journal
+reads only the keys; a record cut off by a crash is dropped and overwritten.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import struct
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+from .cache import fingerprint
+
+# pylint: disable=missing-function-docstring
+
+_HEADER = struct.Struct("<HI")     # key length, output length
+
+
+class Journal[I, O]:
+    """ append-only record of completed inputs and their OutputData
+
+    key     : InputData -> str identifying an input, defaults to fingerprint
+    durable : fsync after every record (slower, survives power loss)
+    rewrite : on resume, write the journaled outputs to the consumer again
+              (default); if False they are only yielded by the stream
+
+    Only the file offsets are kept in memory; journaled outputs are read
+    back on demand.
+    """
+
+    def __init__(self, path: str | os.PathLike, *,
+                 key: Callable[[I], str] = fingerprint,
+                 durable: bool = False,
+                 rewrite: bool = True) -> None:
+        self.path = Path(path)
+        self.key = key
+        self.durable = durable
+        self.rewrite = rewrite
+        self._offsets: dict[str, int] = {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a+b")     # pylint: disable=consider-using-with
+        self._load_index()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._offsets)
+
+    def __enter__(self) -> Journal[I, O]:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get(self, key: str) -> O:
+        """ the journaled OutputData for key """
+        self._file.seek(self._offsets[key])
+        key_size, size = _HEADER.unpack(self._file.read(_HEADER.size))
+        self._file.seek(key_size, os.SEEK_CUR)
+        output_data = pickle.loads(self._file.read(size))
+        self._file.seek(0, os.SEEK_END)
+        return output_data
+
+    def append(self, key: str, output_data: O) -> None:
+        key_bytes = key.encode()
+        blob = pickle.dumps(output_data, protocol=pickle.HIGHEST_PROTOCOL)
+        offset = self._file.seek(0, os.SEEK_END)
+        self._file.write(_HEADER.pack(len(key_bytes), len(blob)) + key_bytes + blob)
+        self._file.flush()
+        if self.durable:
+            os.fsync(self._file.fileno())
+        self._offsets[key] = offset
+
+    def close(self) -> None:
+        self._file.close()
+
+    def _load_index(self) -> None:
+        """ scan the records, drop an incomplete one at the end """
+        self._file.seek(0)
+        offset = 0
+        while True:
+            header = self._file.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                break
+            key_size, size = _HEADER.unpack(header)
+            key_bytes = self._file.read(key_size)
+            end = offset + _HEADER.size + key_size + size
+            if len(key_bytes) < key_size or self._file.seek(0, os.SEEK_END) < end:
+                break
+            self._offsets[key_bytes.decode()] = offset
+            offset = self._file.seek(end)
+        self._file.truncate(offset)
+        self._file.seek(0, os.SEEK_END)
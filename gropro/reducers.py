@@ -0,0 +1,79 @@
+# (C) Alexander Voß, a.voss@fh-aachen.de, info@codebasedlearning.dev
+
+"""
+Reducers aggregate the OutputData of IPO.run item by item, so a run can
+report aggregate results without keeping the outputs:
+
+    summary = problem.run(Best(lambda o: o.best_size), Fold(lambda acc, o: acc + o.best_size, 0))
+    summary.reduced["Best"]
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections import Counter
+from collections.abc import Callable, Hashable
+
+# pylint: disable=missing-function-docstring
+
+
+class Reducer[O, R](ABC):
+    """ folds a stream of OutputData into one result; `name` keys RunSummary.reduced """
+
+    def __init__(self, name: str | None = None) -> None:
+        self.name = name or self.__class__.__name__
+
+    @abstractmethod
+    def add(self, output_data: O) -> None: ...
+
+    @abstractmethod
+    def result(self) -> R: ...
+
+
+class Fold[O, R](Reducer[O, R]):
+    """ acc = func(acc, output_data), starting with initial """
+
+    def __init__(self, func: Callable[[R, O], R], initial: R, name: str | None = None) -> None:
+        super().__init__(name)
+        self.func = func
+        self.acc = initial
+
+    def add(self, output_data: O) -> None:
+        self.acc = self.func(self.acc, output_data)
+
+    def result(self) -> R:
+        return self.acc
+
+
+class Best[O](Reducer[O, O | None]):
+    """ the output with the smallest key (largest with largest=True) """
+
+    def __init__(self, key: Callable[[O], object], *, largest: bool = False, name: str | None = None) -> None:
+        super().__init__(name)
+        self.key = key
+        self.largest = largest
+        self.best: O | None = None
+        self.best_key: object = None
+
+    def add(self, output_data: O) -> None:
+        key = self.key(output_data)
+        if self.best is None or (key > self.best_key if self.largest else key < self.best_key):
+            self.best, self.best_key = output_data, key
+
+    def result(self) -> O | None:
+        return self.best
+
+
+class Tally[O](Reducer[O, Counter]):
+    """ how often each key(output_data) occurs """
+
+    def __init__(self, key: Callable[[O], Hashable], name: str | None = None) -> None:
+        super().__init__(name)
+        self.key = key
+        self.counter: Counter = Counter()
+
+    def add(self, output_data: O) -> None:
+        self.counter[self.key(output_data)] += 1
+
+    def result(self) -> Counter:
+        return self.counter
@@ -0,0 +1,241 @@
+# (C) Alexander Voß, a.voss@fh-aachen.de, info@codebasedlearning.dev
+
+"""
+Instrumentation for the IPO framework.
+
+The hot loop in IPO.stream, Chain.apply and Merge.read only pays for
+instrumentation if a hook is active, i.e. if `trace_ctx` holds a Hook:
+
+    trace = Trace()
+    with ipo_context(trace_ctx, trace):
+        problem.solve()
+    print(trace.totals())
+
+Without a hook there is one ContextVar lookup per call, no timing and no
+string formatting.
+
+Hooks
+  - Trace       : every call as a TraceEvent, for debugging small runs
+  - StageTotals : counts and seconds per stage, constant memory
+  - Profiler    : counts, latency percentiles, throughput and queue depths
+                  per component, exported as a JSON report
+  - Hooks       : fan-out to several hooks
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import random
+import sys
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, fields, is_dataclass
+from time import perf_counter
+
+# pylint: disable=too-few-public-methods
+# pylint: disable=missing-function-docstring
+
+
+def payload_size(obj: object) -> int:
+    """ shallow size in bytes of obj and its direct attributes (not recursive) """
+    size = sys.getsizeof(obj)
+    if is_dataclass(obj):
+        size += sum(sys.getsizeof(getattr(obj, f.name)) for f in fields(obj))
+    elif hasattr(obj, '__dict__'):
+        size += sum(sys.getsizeof(value) for value in vars(obj).values())
+    return size
+
+
+class Hook(ABC):
+    """ receives one record per stage call, e.g. per producer item or processor call
+
+    stage is one of 'input', 'process', 'output' for the pipeline itself,
+    'merge', 'chain' and 'tee' for the components inside a Merge, Chain or
+    Tee, and 'error' for inputs skipped because the processor failed.
+    component is the class name; several components of one class inside a
+    Tee, Merge or Chain are told apart by their position ('Writer#0').
+    Hooks may be called from worker threads (see Execution).
+    """
+    @abstractmethod
+    def record(self, stage: str, component: str, seconds: float, payload: object) -> None: ...
+
+    def queue_depth(self, queue: str, depth: int) -> None:    # noqa: B027 - optional hook, ignored by default
+        """ current fill level of a queue, e.g. items in flight or a Tee buffer """
+
+    def finish(self) -> None:                                   # noqa: B027 - optional hook, ignored by default
+        """ called at the end of each IPO.stream and AsyncIPO.stream """
+
+
+@dataclass(frozen=True, slots=True)
+class TraceEvent:
+    """ one structured trace record """
+    stage: str
+    component: str
+    seconds: float
+    size: int
+
+
+class Trace(Hook):
+    """ records every stage call as a TraceEvent (memory grows with the number of items) """
+
+    def __init__(self, *, with_sizes: bool = True) -> None:
+        self.with_sizes = with_sizes
+        self.events: list[TraceEvent] = []
+
+    def record(self, stage: str, component: str, seconds: float, payload: object) -> None:
+        size = payload_size(payload) if self.with_sizes else 0
+        self.events.append(TraceEvent(stage, component, seconds, size))
+
+    def totals(self) -> dict[tuple[str, str], float]:
+        """ cumulative seconds per (stage, component) """
+        out: dict[tuple[str, str], float] = defaultdict(float)
+        for event in self.events:
+            out[(event.stage, event.component)] += event.seconds
+        return dict(out)
+
+
+class StageTotals(Hook):
+    """ call counts and cumulative seconds per stage, constant memory """
+
+    def __init__(self) -> None:
+        self.counts: dict[str, int] = defaultdict(int)
+        self.seconds: dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, component: str, seconds: float, payload: object) -> None:
+        with self._lock:
+            self.counts[stage] += 1
+            self.seconds[stage] += seconds
+
+
+class Hooks(Hook):
+    """ forwards every record to several hooks """
+
+    def __init__(self, *hooks: Hook) -> None:
+        self.hooks = hooks
+
+    def record(self, stage: str, component: str, seconds: float, payload: object) -> None:
+        for hook in self.hooks:
+            hook.record(stage, component, seconds, payload)
+
+    def queue_depth(self, queue: str, depth: int) -> None:
+        for hook in self.hooks:
+            hook.queue_depth(queue, depth)
+
+    def finish(self) -> None:
+        for hook in self.hooks:
+            hook.finish()
+
+
+class _Latencies:
+    """ call count, sum, a bounded uniform sample (reservoir) of latencies and
+    the window from the start of the first to the end of the last call """
+    __slots__ = ('calls', 'total', 'max', 'samples', 'first', 'last')
+
+    def __init__(self, now: float, seconds: float) -> None:
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: list[float] = []
+        self.first = self.last = now - seconds
+
+    def add(self, now: float, seconds: float, max_samples: int, rng: random.Random) -> None:
+        self.last = now
+        self.calls += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self.samples) < max_samples:
+            self.samples.append(seconds)
+        elif (i := rng.randrange(self.calls)) < max_samples:
+            self.samples[i] = seconds
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    """ nearest-rank percentile of an ordered, non-empty list """
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+class Profiler(Hook):
+    """ per-component call counts, latencies (mean, p50/p90/p99, max), items/s
+    and peak queue depths
+
+    items/s of a component are its calls over the time from the start of
+    its first to the end of its last call, so stages running in parallel
+    are not averaged over the whole run.
+
+    path        : if given, the JSON report is written there at the end of
+                  every stream (overwritten by the next one)
+    max_samples : latencies kept per component for the percentiles
+    """
+
+    def __init__(self, path: str | os.PathLike | None = None, *, max_samples: int = 10_000) -> None:
+        self.path = path
+        self.max_samples = max_samples
+        self.latencies: dict[tuple[str, str], _Latencies] = {}
+        self.peak_depths: dict[str, int] = {}
+        self._first = self._last = 0.0
+        self._rng = random.Random(0)
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, component: str, seconds: float, payload: object) -> None:
+        now = perf_counter()
+        with self._lock:
+            if not self.latencies:
+                self._first = now - seconds
+            self._last = now
+            if (latencies := self.latencies.get((stage, component))) is None:
+                latencies = self.latencies[(stage, component)] = _Latencies(now, seconds)
+            latencies.add(now, seconds, self.max_samples, self._rng)
+
+    def queue_depth(self, queue: str, depth: int) -> None:
+        if depth > self.peak_depths.get(queue, -1):
+            with self._lock:
+                self.peak_depths[queue] = max(depth, self.peak_depths.get(queue, 0))
+
+    def finish(self) -> None:
+        if self.path is not None:
+            with open(self.path, "w", encoding="utf-8") as file:
+                json.dump(self.report(), file, indent=2)
+
+    def report(self) -> dict:
+        """ the machine-readable report, see also format() """
+        with self._lock:
+            wall_time = self._last - self._first
+            stages = []
+            for (stage, component), latencies in self.latencies.items():
+                ordered = sorted(latencies.samples)
+                window = latencies.last - latencies.first
+                stages.append({
+                    "stage": stage,
+                    "component": component,
+                    "calls": latencies.calls,
+                    "total_s": latencies.total,
+                    "mean_s": latencies.total / latencies.calls,
+                    "p50_s": _percentile(ordered, 50),
+                    "p90_s": _percentile(ordered, 90),
+                    "p99_s": _percentile(ordered, 99),
+                    "max_s": latencies.max,
+                    "items_per_s": latencies.calls / window if window > 0 else None,
+                })
+            return {"wall_time_s": wall_time, "stages": stages, "peak_queue_depths": dict(self.peak_depths)}
+
+    def format(self) -> str:
+        """ the report as a text table """
+        report = self.report()
+        lines = [f"{'stage':<8} {'component':<28} {'calls':>7} {'total ms':>10} {'p50 µs':>9} "
+                 f"{'p99 µs':>9} {'items/s':>10}"]
+        for row in report["stages"]:
+            items_per_s = f"{row['items_per_s']:10.1f}" if row["items_per_s"] else f"{'-':>10}"
+            lines.append(f"{row['stage']:<8} {row['component']:<28} {row['calls']:>7} "
+                         f"{row['total_s'] * 1e3:10.3f} {row['p50_s'] * 1e6:9.1f} "
+                         f"{row['p99_s'] * 1e6:9.1f} {items_per_s}")
+        for queue, depth in report["peak_queue_depths"].items():
+            lines.append(f"peak depth of {queue!r}: {depth}")
+        return "\n".join(lines)
+
+
+trace_ctx: ContextVar[Hook | None] = ContextVar('trace_ctx', default=None)
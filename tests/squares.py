@@ -0,0 +1,130 @@
+# (C) Alexander Voß, a.voss@fh-aachen.de, info@codebasedlearning.dev
+
+"""
+A small IPO problem for the tests: numbers in, squares out.
+
+The classes live in a module of their own (not in a test file), so that
+process pools can unpickle them.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, replace
+from itertools import count
+from typing import Self
+
+from gropro import IPO, Consumer, Processor, Producer
+
+
+@dataclass
+class InputData:
+    x: int = 0
+
+
+@dataclass
+class ProcessData:
+    x: int
+
+    @classmethod
+    def of(cls, input_data: InputData) -> Self:
+        return cls(input_data.x)
+
+
+@dataclass
+class OutputData:
+    x: int
+    y: int
+
+    @classmethod
+    def of(cls, input_data: InputData, process_data: ProcessData) -> Self:
+        return cls(input_data.x, process_data.x)
+
+
+class Numbers(Producer[InputData]):
+    """ the given numbers, one InputData each """
+    def __init__(self, *values: int) -> None:
+        self.values = values
+
+    def read(self, input_data: InputData) -> Iterator[InputData]:
+        for value in self.values:
+            yield InputData(value)
+
+
+class Counter(Producer[InputData]):
+    """ start, start+step, ... without end """
+    def __init__(self, start: int = 0, step: int = 1) -> None:
+        self.start = start
+        self.step = step
+
+    def read(self, input_data: InputData) -> Iterator[InputData]:
+        for value in count(self.start, self.step):
+            yield InputData(value)
+
+
+class Add(Producer[InputData]):
+    """ refines the input by adding n to x """
+    def __init__(self, n: int) -> None:
+        self.n = n
+
+    def read(self, input_data: InputData) -> Iterator[InputData]:
+        yield replace(input_data, x=input_data.x + self.n)
+
+
+class Square(Processor[ProcessData]):
+    """ x*x; raises ValueError for x in fail, sleeps a little for x in slow """
+    def __init__(self, fail: tuple[int, ...] = (), slow: tuple[int, ...] = ()) -> None:
+        self.fail = fail
+        self.slow = slow
+        self.calls: list[int] = []
+        self.batches: list[int] = []
+
+    def apply(self, process_data: ProcessData) -> ProcessData:
+        self.calls.append(process_data.x)
+        if process_data.x in self.fail:
+            raise ValueError(f"cannot square {process_data.x}")
+        if process_data.x in self.slow:
+            time.sleep(0.2)
+        return ProcessData(process_data.x * process_data.x)
+
+    def apply_batch(self, batch: list[ProcessData]) -> list[ProcessData]:
+        self.batches.append(len(batch))
+        return super().apply_batch(batch)
+
+
+class Collector(Consumer[OutputData]):
+    """ keeps the outputs; counts close() """
+    def __init__(self) -> None:
+        self.items: list[OutputData] = []
+        self.closed = 0
+
+    def write(self, output_data: OutputData) -> None:
+        self.items.append(output_data)
+
+    def close(self) -> None:
+        self.closed += 1
+
+
+class Gate(Consumer[int]):
+    """ a slow sink: the first write waits until open() is called """
+    def __init__(self, fail_at: int | None = None) -> None:
+        self.items: list[int] = []
+        self.fail_at = fail_at
+        self.started = threading.Event()
+        self.opened = threading.Event()
+
+    def open(self) -> None:
+        self.opened.set()
+
+    def write(self, output_data: int) -> None:
+        self.started.set()
+        self.opened.wait(5.0)
+        if output_data == self.fail_at:
+            raise ValueError(f"cannot write {output_data}")
+        self.items.append(output_data)
+
+
+class SquaresProblem(IPO[InputData, ProcessData, OutputData]):
+    """ binds Input/Process/Output classes to the generic IPO solver """
@@ -0,0 +1,83 @@
+# (C) Alexander Voß, a.voss@fh-aachen.de, info@codebasedlearning.dev
+
+"""
+Tests of gropro.aio.AsyncIPO: results, error propagation and early exit.
+"""
+
+import asyncio
+import contextlib
+
+import pytest
+from squares import Collector, Counter, InputData, Numbers, OutputData, ProcessData, Square
+
+from gropro import AsyncIPO, Trace, ipo_context, trace_ctx
+
+VALUES = tuple(range(20))
+SQUARES = [x * x for x in VALUES]
+
+
+class SquaresProblem(AsyncIPO[InputData, ProcessData, OutputData]):
+    """ binds Input/Process/Output classes to the async IPO solver """
+
+
+class Finished(Trace):
+    """ a trace that counts finish() """
+    def __init__(self) -> None:
+        super().__init__()
+        self.finished = 0
+
+    def finish(self) -> None:
+        self.finished += 1
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_results(workers):
+    consumer = Collector()
+    outputs = asyncio.run(SquaresProblem.of(Numbers(*VALUES), Square(), consumer, workers=workers).solve())
+    assert sorted(o.y for o in outputs) == SQUARES
+    assert sorted(o.y for o in consumer.items) == SQUARES
+    assert consumer.closed == 1
+
+
+def test_single_worker_keeps_order():
+    outputs = asyncio.run(SquaresProblem.of(Numbers(*VALUES), Square(), queue_size=1).solve())
+    assert [o.y for o in outputs] == SQUARES
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_error_propagates(workers):
+    consumer, trace = Collector(), Finished()
+
+    async def main() -> None:
+        with ipo_context(trace_ctx, trace):
+            await SquaresProblem.of(Counter(), Square(fail=(7,)), consumer, workers=workers, queue_size=2).solve()
+
+    with pytest.raises(ExceptionGroup) as info:
+        asyncio.run(main())
+    assert info.group_contains(ValueError, match="cannot square 7")
+    assert consumer.closed == 1
+    assert trace.finished == 1
+
+
+def test_early_exit_stops_stages():
+    consumer, trace = Collector(), Finished()
+
+    async def main() -> int:
+        with ipo_context(trace_ctx, trace):
+            stream = SquaresProblem.of(Counter(), Square(), consumer, queue_size=2).stream()
+            async with contextlib.aclosing(stream) as outputs:
+                async for output_data in outputs:
+                    if output_data.x == 3:
+                        break
+        await asyncio.sleep(0)
+        return len(asyncio.all_tasks())
+
+    assert asyncio.run(main()) == 1             # only main() is left
+    assert len(consumer.items) < 20
+    assert consumer.closed == 1
+    assert trace.finished == 1
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        SquaresProblem(workers=0)
@@ -0,0 +1,90 @@
+# (C) Alexander Voß, a.voss@fh-aachen.de, info@codebasedlearning.dev
+
+"""
+Tests of gropro.buffer.SinkBuffer: the overflow policies and consumer errors.
+"""
+
+import threading
+
+import pytest
+from squares import Gate
+
+from gropro.buffer import SinkBuffer
+
+
+def busy_sink(overflow: str, capacity: int = 2) -> tuple[SinkBuffer, Gate]:
+    """ a sink whose worker is stuck on item 0, with an empty queue """
+    gate = Gate()
+    sink = SinkBuffer(gate, capacity, overflow)
+    sink.put(0)
+    assert gate.started.wait(5.0)
+    return sink, gate
+
+
+def test_block_waits_for_free_space():
+    sink, gate = busy_sink("block")
+    sink.put(1)
+    sink.put(2)
+    writer = threading.Thread(target=sink.put, args=(3,))
+    writer.start()
+    writer.join(0.2)
+    assert writer.is_alive()                    # the queue is full, put waits
+    gate.open()
+    writer.join(5.0)
+    assert not writer.is_alive()
+    sink.close()
+    assert gate.items == [0, 1, 2, 3]
+    assert sink.dropped == 0
+    assert sink.peak_depth == 2
+
+
+def test_drop_oldest_keeps_newest():
+    sink, gate = busy_sink("drop-oldest")
+    for item in range(1, 6):
+        sink.put(item)
+    assert sink.depth == 2
+    gate.open()
+    sink.close()
+    assert gate.items == [0, 4, 5]
+    assert sink.dropped == 3
+
+
+def test_spill_keeps_order():
+    sink, gate = busy_sink("spill")
+    for item in range(1, 8):
+        sink.put(item)
+    assert sink.depth == 7
+    gate.open()
+    sink.close()
+    assert gate.items == list(range(8))
+    assert sink.dropped == 0
+    assert sink.peak_depth == 7
+
+
+def test_spill_reuses_drained_file():
+    sink, gate = busy_sink("spill", capacity=1)
+    gate.open()
+    for item in range(1, 50):
+        sink.put(item)
+    sink.close()
+    assert gate.items == list(range(50))
+
+
+def test_consumer_error_is_raised():
+    gate = Gate(fail_at=1)
+    gate.open()
+    sink = SinkBuffer(gate, 4)
+    sink.put(0)
+    sink.put(1)
+    with pytest.raises(ValueError, match="cannot write 1"):
+        sink.close()
+    with pytest.raises(ValueError):
+        sink.put(2)
+    assert gate.items == [0]
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        SinkBuffer(Gate(), 0)
+    with pytest.raises(ValueError):
+        SinkBuffer(Gate(), 1, "drop-newest")
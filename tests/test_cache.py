@@ -0,0 +1,177 @@
+# (C) Alexander Voß, a.voss@fh-aachen.de, info@codebasedlearning.dev
+
+"""
+Tests of gropro.cache: fingerprint, hits and evictions, the disk store.
+"""
+
+import time
+from array import array
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+
+import pytest
+from squares import ProcessData, Square
+
+from gropro import CachedProcessor, Processor, fingerprint
+
+
+class Color(Enum):
+    RED = 1
+    GREEN = 2
+
+
+@dataclass
+class Budgeted:
+    x: int
+    optimal: bool
+
+
+class Scale(Processor[ProcessData]):
+    """ x*factor """
+    def __init__(self, factor: int) -> None:
+        self.factor = factor
+
+    def apply(self, process_data: ProcessData) -> ProcessData:
+        return ProcessData(process_data.x * self.factor)
+
+
+class Anytime(Processor[Budgeted]):
+    """ a search that stops at its budget for odd x """
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def apply(self, process_data: Budgeted) -> Budgeted:
+        self.calls += 1
+        return Budgeted(process_data.x, optimal=process_data.x % 2 == 0)
+
+
+def test_fingerprint_ignores_order():
+    assert fingerprint({"a": 1, "b": {2, 3}}) == fingerprint({"b": {3, 2}, "a": 1})
+    assert fingerprint([1, 2]) != fingerprint([2, 1])
+    assert fingerprint([1, 2]) != fingerprint((1, 2))
+
+
+def test_fingerprint_of_buffers_and_values():
+    assert fingerprint(bytearray(b"abc")) == fingerprint(bytearray(b"abc"))
+    assert fingerprint(bytearray(b"abc")) != fingerprint(bytearray(b"abd"))
+    assert fingerprint(array('i', [1, 2])) != fingerprint(array('i', [1, 3]))
+    assert fingerprint(array('i', [1, 2])) != fingerprint(array('q', [1, 2]))
+    assert fingerprint(Color.RED) != fingerprint(Color.GREEN)
+    assert fingerprint(Path("a/b")) == fingerprint(Path("a") / "b")
+    assert fingerprint(ProcessData(3)) != fingerprint(ProcessData(4))
+
+
+def test_fingerprint_rejects_opaque_objects():
+    with pytest.raises(TypeError, match="cannot fingerprint"):
+        fingerprint(object())
+    with pytest.raises(TypeError):
+        fingerprint({"callback": lambda: 0})
+
+
+def test_hits():
+    inner = Square()
+    cached = CachedProcessor(inner)
+    first = cached.apply(ProcessData(3))
+    second = cached.apply(ProcessData(3))
+    assert first == second == ProcessData(9)
+    assert first is not second                  # every hit is a fresh copy
+    assert inner.calls == [3]
+    assert (cached.stats.hits, cached.stats.misses) == (1, 1)
+    assert cached.stats.hit_rate == 0.5
+
+
+def test_lru_eviction():
+    inner = Square()
+    cached = CachedProcessor(inner, maxsize=2)
+    for x in (1, 2, 1, 3):                      # 2 is the least recently used when 3 arrives
+        cached.apply(ProcessData(x))
+    cached.apply(ProcessData(1))
+    cached.apply(ProcessData(2))
+    assert inner.calls == [1, 2, 3, 2]
+    assert cached.stats.evictions == 2
+
+
+def test_max_bytes_eviction():
+    cached = CachedProcessor(Square(), max_bytes=1)
+    cached.apply(ProcessData(1))
+    cached.apply(ProcessData(2))
+    assert cached.stats.evictions == 1          # the newest entry is kept even if too large
+    cached.apply(ProcessData(2))
+    assert cached.stats.hits == 1
+
+
+def test_max_age():
+    inner = Square()
+    cached = CachedProcessor(inner, max_age=0.05)
+    cached.apply(ProcessData(2))
+    time.sleep(0.1)
+    cached.apply(ProcessData(2))
+    assert inner.calls == [2, 2]
+    assert cached.stats.expirations == 1
+
+
+def test_disk_store_is_shared(tmp_path):
+    CachedProcessor(Square(), directory=tmp_path).apply(ProcessData(5))
+    inner = Square()
+    cached = CachedProcessor(inner, directory=tmp_path)
+    assert cached.apply(ProcessData(5)) == ProcessData(25)
+    assert inner.calls == []
+    assert cached.stats.disk_hits == 1
+    cached.clear()
+    cached.apply(ProcessData(5))
+    assert inner.calls == [5]
+
+
+def test_key_includes_processor_config(tmp_path):
+    assert CachedProcessor(Scale(2), directory=tmp_path).apply(ProcessData(5)) == ProcessData(10)
+    cached = CachedProcessor(Scale(3), directory=tmp_path)
+    assert cached.apply(ProcessData(5)) == ProcessData(15)
+    assert cached.stats.disk_hits == 0
+
+
+def test_budgeted_results_are_not_stored():
+    inner = Anytime()
+    cached = CachedProcessor(inner)
+    for x in (1, 1, 2, 2):
+        cached.apply(Budgeted(x, optimal=False))
+    assert inner.calls == 3                     # x=1 stopped at the budget, twice
+    assert cached.stats.uncached == 2
+    assert cached.stats.hits == 1
+
+
+def test_store_if():
+    inner = Anytime()
+    cached = CachedProcessor(inner, store_if=lambda result: True)
+    cached.apply(Budgeted(1, optimal=False))
+    cached.apply(Budgeted(1, optimal=False))
+    assert inner.calls == 1
+
+
+def test_max_disk_bytes(tmp_path):
+    cached = CachedProcessor(Square(), directory=tmp_path, max_disk_bytes=200)
+    for x in range(20):
+        cached.apply(ProcessData(x))
+    sizes = [path.stat().st_size for path in tmp_path.glob("*/*.pickle")]
+    assert sum(sizes) <= 200
+    assert cached.stats.disk_evictions == 20 - len(sizes)
+    reopened = CachedProcessor(Square(), directory=tmp_path, max_disk_bytes=200)
+    assert reopened.apply(ProcessData(19)) == ProcessData(361)  # the newest files are kept
+    assert reopened.stats.disk_hits == 1
+
+
+def test_sweep_on_open_removes_expired_files(tmp_path):
+    CachedProcessor(Square(), directory=tmp_path).apply(ProcessData(5))
+    time.sleep(0.1)
+    cached = CachedProcessor(Square(), directory=tmp_path, max_age=0.05)
+    assert list(tmp_path.glob("*/*.pickle")) == []
+    assert cached.stats.expirations == 1
+
+
+def test_sweep_on_write(tmp_path):
+    cached = CachedProcessor(Square(), directory=tmp_path, max_age=0.05)
+    cached.apply(ProcessData(1))
+    time.sleep(0.1)
+    cached.apply(ProcessData(2))                # the sweep is due, the file of x=1 has expired
+    assert len(list(tmp_path.glob("*/*.pickle"))) == 1
+    assert cached.stats.expirations == 1
@@ -0,0 +1,195 @@
+# (C) Alexander Voß, a.voss@fh-aachen.de, info@codebasedlearning.dev
+
+"""
+Tests of the crossword solver (snippets/b_ipo/d_crosswords.py): the areas of
+the task examples, edge cases, the input parsing, the parallel and the
+budgeted search, and the rendered output.
+"""
+
+import pytest
+from d_crosswords import (
+    EXAMPLE_1,
+    EXAMPLE_2,
+    EXAMPLE_3,
+    EXAMPLE_4,
+    EXAMPLE_5,
+    VALUE_ORDERS,
+    WORD_ORDERS,
+    BatchedWriterConsumer,
+    ConsoleConsumer,
+    CrosswordSolver,
+    CrosswordsProblem,
+    InputData,
+    OutputData,
+    StreamProducer,
+)
+
+from gropro import CachedProcessor, Execution
+
+EXAMPLES = [
+    ("example_1", EXAMPLE_1, 28),
+    ("example_2", EXAMPLE_2, 36),
+    ("example_3", EXAMPLE_3, 85),
+    ("example_4", EXAMPLE_4, 98),
+    ("example_5", EXAMPLE_5, 98),
+]
+
+
+def solve(textblock: str, solver: CrosswordSolver | None = None) -> OutputData:
+    output_data, = CrosswordsProblem.of(input=StreamProducer([("test", textblock)]),
+                                        process=solver or CrosswordSolver()).solve()
+    return output_data
+
+
+def words(*items: str) -> str:
+    return "# test\n" + ", ".join(items) + "\n"
+
+
+def assert_valid(d: OutputData) -> None:
+    """ every word is on the grid, the grid has no other letters, the area fits the bounds """
+    assert sorted(i for i, *_ in d.best_placements) == list(range(len(d.words)))
+    cells = {}
+    for i, y, x, vertical in d.best_placements:
+        for k, char in enumerate(d.words[i]):
+            cell = (y + k, x) if vertical else (y, x + k)
+            assert cells.setdefault(cell, char) == char
+    assert cells == d.best_grid
+    min_y, max_y, min_x, max_x = d.best_bounds
+    assert d.best_size == (max_y - min_y + 1) * (max_x - min_x + 1)
+    assert all(min_y <= y <= max_y and min_x <= x <= max_x for y, x in cells)
+
+
+@pytest.mark.parametrize("source, textblock, area", EXAMPLES, ids=[source for source, *_ in EXAMPLES])
+def test_examples(source, textblock, area):
+    d = solve(textblock)
+    assert d.best_size == area
+    assert d.optimal
+    assert_valid(d)
+
+
+def test_examples_on_pool():
+    examples = [(source, textblock) for source, textblock, _ in EXAMPLES[:2]]
+    outputs = CrosswordsProblem.of(input=StreamProducer(examples), process=CrosswordSolver(),
+                                   execute=Execution(mode="process", workers=2)).solve()
+    assert [d.best_size for d in outputs] == [28, 36]
+
+
+@pytest.mark.parametrize("items, area", [
+    (("ABC",), 3),
+    (("ABC", "CDE"), 9),
+    (("NETT", "NETT"), 16),
+    (("AB", "BA", "AB"), 4),
+])
+def test_edge_cases(items, area):
+    d = solve(words(*items))
+    assert d.best_size == area
+    assert d.optimal
+    assert_valid(d)
+
+
+def test_empty_word_list():
+    d = solve("# nothing\n")
+    assert d.words == []
+    assert d.best_size == 0
+
+
+def test_input_parsing():
+    input_data = InputData.of("test", "\n# first\n# second\n matse ,nett,, essen\nignored\n")
+    assert input_data.comment == "# first"
+    assert input_data.words == ["MATSE", "NETT", "ESSEN"]
+
+
+def test_small_transposition_table():
+    assert solve(EXAMPLE_2, CrosswordSolver(table_size=1)).best_size == 36
+
+
+def test_invalid_table_size():
+    with pytest.raises(ValueError):
+        CrosswordSolver(table_size=0)
+
+
+@pytest.mark.parametrize("source, textblock, area", [EXAMPLES[0], EXAMPLES[2]], ids=["example_1", "example_3"])
+def test_parallel_search(source, textblock, area):
+    d = solve(textblock, CrosswordSolver(workers=2))
+    assert d.best_size == area
+    assert d.optimal
+    assert_valid(d)
+
+
+@pytest.mark.parametrize("items", [("ABC",), ("NETT", "NETT")])
+def test_edge_cases_parallel(items):
+    assert solve(words(*items), CrosswordSolver(workers=2)).best_size == solve(words(*items)).best_size
+
+
+def test_invalid_workers():
+    with pytest.raises(ValueError):
+        CrosswordSolver(workers=0)
+
+
+def test_budget_stops_search():
+    d = solve(EXAMPLE_3, CrosswordSolver(node_budget=10))
+    assert not d.optimal
+    assert d.best_size >= 85
+    assert_valid(d)
+
+
+def test_time_budget_used_up_before_any_grid(capsys):
+    d = solve(EXAMPLE_4, CrosswordSolver(time_budget=0.0))
+    assert (d.best_size, d.optimal) == (0, False)
+    ConsoleConsumer(with_filled=False).write(d)
+    assert "Suchbudget war vorher erschöpft" in capsys.readouterr().out
+
+
+def test_no_common_letters(capsys):
+    d = solve(words("AB", "CD"))
+    assert (d.best_size, d.optimal) == (0, True)
+    ConsoleConsumer(with_filled=False).write(d)
+    assert "keine gemeinsamen Buchstaben" in capsys.readouterr().out
+
+
+def test_cache_keeps_only_complete_searches(tmp_path):
+    budgeted = CachedProcessor(CrosswordSolver(node_budget=10), directory=tmp_path)
+    CrosswordsProblem.of(input=StreamProducer([("example_3", EXAMPLE_3)]), process=budgeted).solve()
+    assert budgeted.stats.uncached == 1
+    cached = CachedProcessor(CrosswordSolver(), directory=tmp_path)
+    problem = CrosswordsProblem.of(input=StreamProducer([("example_1", EXAMPLE_1)]), process=cached)
+    assert problem.solve()[0].best_size == 28
+    assert problem.solve()[0].best_size == 28
+    assert (cached.stats.misses, cached.stats.hits) == (1, 1)
+
+
+def test_rendered_grid(capsys):
+    ConsoleConsumer(with_filled=False).write(solve(words("ABC", "CDE")))
+    out = capsys.readouterr().out
+    assert " A | B | C \n---|---|---\n   |   | D \n---|---|---\n   |   | E " in out
+    assert "Diese Lösung nimmt 9 Felder ein." in out
+
+
+@pytest.mark.parametrize("batch_size", [1, 256])
+def test_batched_writer_matches_console(tmp_path, capsys, batch_size):
+    outputs = [solve(textblock) for _, textblock, _ in EXAMPLES[:3]]
+    for d in outputs:
+        ConsoleConsumer(seed=1).write(d)
+    expected = capsys.readouterr().out
+    writer = BatchedWriterConsumer(tmp_path / "out.txt", seed=1, batch_size=batch_size)
+    for d in outputs:
+        writer.write(d)
+    writer.close()
+    assert (tmp_path / "out.txt").read_text(encoding="utf-8") == expected
+
+
+@pytest.mark.parametrize("word_order", WORD_ORDERS)
+@pytest.mark.parametrize("value_order", VALUE_ORDERS)
+def test_orderings_find_the_same_area(word_order, value_order):
+    solver = CrosswordSolver(word_order=word_order, value_order=value_order)
+    for _, textblock, area in EXAMPLES[:3]:
+        d = solve(textblock, solver)
+        assert (d.best_size, d.optimal) == (area, True)
+        assert_valid(d)
+
+
+def test_invalid_orderings():
+    with pytest.raises(ValueError):
+        CrosswordSolver(word_order="random")
+    with pytest.raises(ValueError):
+        CrosswordSolver(value_order="random")
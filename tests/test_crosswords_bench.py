@@ -0,0 +1,25 @@
+# (C) Alexander Voß, a.voss@fh-aachen.de, info@codebasedlearning.dev
+
+"""
+Tests of the crossword benchmark corpus (snippets/b_ipo/e_crosswords_bench.py).
+"""
+
+import random
+
+from d_crosswords import InputData
+from e_crosswords_bench import corpus, generate_word_list
+
+
+def test_generated_words_are_connected():
+    words = generate_word_list(12, 8, random.Random(1))
+    assert len(set(words)) == 12
+    assert all(set(word) <= set("ABCDEFGH") and 3 <= len(word) <= 10 for word in words)
+    assert all(any(set(word) & set(other) for other in words[:k]) for k, word in enumerate(words) if k)
+
+
+def test_corpus_is_seeded():
+    assert corpus(seed=7) == corpus(seed=7)
+    assert corpus(seed=7) != corpus(seed=8)
+    items = corpus(sizes=(5,), alphabets=(8, 20))
+    assert [source for source, _ in items][5:] == ["gen_05w_08a", "gen_05w_20a"]
+    assert len(InputData.of(*items[-1]).words) == 5
@@ -0,0 +1,226 @@
+# (C) Alexander Voß, a.voss@fh-aachen.de, info@codebasedlearning.dev
+
+"""
+Tests of gropro.ipo: execution modes, error policy, batching, reducers, Merge and Tee.
+"""
+
+from itertools import islice
+
+import pytest
+from squares import Add, Collector, Counter, InputData, Numbers, Square, SquaresProblem
+
+from gropro import Best, Chain, Execution, Fold, Merge, Tally, Tee, Trace, ipo_context, trace_ctx
+
+VALUES = tuple(range(10))
+SQUARES = [x * x for x in VALUES]
+
+
+def ys(outputs) -> list[int]:
+    return [o.y for o in outputs]
+
+
+@pytest.mark.parametrize("execution", [
+    Execution(),
+    Execution(mode="thread", workers=3),
+    Execution(mode="thread", workers=2, window=1),
+    Execution(mode="process", workers=2),
+])
+def test_ordered_map_keeps_input_order(execution):
+    consumer = Collector()
+    outputs = SquaresProblem.of(input=Numbers(*VALUES), process=Square(), output=consumer,
+                                execute=execution).solve()
+    assert ys(outputs) == SQUARES
+    assert ys(consumer.items) == SQUARES
+    assert consumer.closed == 1
+
+
+def test_unordered_map_yields_as_completed():
+    execution = Execution(mode="thread", workers=2, ordered=False)
+    outputs = SquaresProblem.of(input=Numbers(*VALUES), process=Square(slow=(0,)), execute=execution).solve()
+    assert sorted(ys(outputs)) == SQUARES
+    assert outputs[0].x != 0                    # the slow first item is overtaken
+
+
+def test_ordered_map_waits_for_slow_item():
+    execution = Execution(mode="thread", workers=2)
+    outputs = SquaresProblem.of(input=Numbers(*VALUES), process=Square(slow=(0,)), execute=execution).solve()
+    assert ys(outputs) == SQUARES
+
+
+def test_parallel_map_is_lazy():
+    execution = Execution(mode="thread", workers=2, window=4)
+    processor = Square()
+    stream = SquaresProblem.of(input=Counter(), process=processor, execute=execution).stream()
+    assert ys(islice(stream, 5)) == [0, 1, 4, 9, 16]
+    stream.close()
+    assert len(processor.calls) <= 5 + 4         # at most window items in flight
+
+
+def test_execute_per_call():
+    problem = SquaresProblem.of(input=Numbers(*VALUES), process=Square())
+    assert ys(problem.stream(Execution(mode="thread", workers=2))) == SQUARES
+    assert problem.execution == Execution()
+
+
+@pytest.mark.parametrize("execution", [Execution(), Execution(mode="thread", workers=2)])
+def test_errors_raise(execution):
+    consumer = Collector()
+    problem = SquaresProblem.of(input=Numbers(*VALUES), process=Square(fail=(3,)), output=consumer,
+                                execute=execution)
+    with pytest.raises(ValueError, match="cannot square 3"):
+        problem.solve()
+    assert consumer.closed == 1
+
+
+@pytest.mark.parametrize("execution", [
+    Execution(errors="skip"),
+    Execution(mode="thread", workers=2, errors="skip"),
+    Execution(mode="process", workers=2, errors="skip"),
+])
+def test_errors_skip(execution):
+    problem = SquaresProblem.of(input=Numbers(*VALUES), process=Square(fail=(3, 7)), execute=execution)
+    summary = problem.run(Fold(lambda acc, o: acc + [o.x], []))
+    assert summary.count == 8
+    assert summary.errors == 2
+    assert summary.reduced["Fold"] == [0, 1, 2, 4, 5, 6, 8, 9]
+
+
+def test_invalid_execution():
+    with pytest.raises(ValueError):
+        Execution(mode="fibers")
+    with pytest.raises(ValueError):
+        Execution(workers=0)
+    with pytest.raises(ValueError):
+        Execution(window=0)
+
+
+@pytest.mark.parametrize("execution", [
+    Execution(batch_size=4),
+    Execution(mode="thread", workers=2, batch_size=4),
+    Execution(mode="thread", workers=2, batch_size=4, ordered=False),
+])
+def test_batching(execution):
+    processor = Square()
+    outputs = SquaresProblem.of(input=Numbers(*VALUES), process=processor, execute=execution).solve()
+    assert sorted(ys(outputs)) == SQUARES
+    if execution.ordered:
+        assert ys(outputs) == SQUARES
+    assert sorted(processor.batches) == [2, 4, 4]
+
+
+def test_batch_size_one_calls_apply():
+    processor = Square()
+    SquaresProblem.of(input=Numbers(*VALUES), process=processor).solve()
+    assert processor.batches == []
+
+
+def test_chain_passes_batches_on():
+    first, second = Square(), Square()
+    outputs = SquaresProblem.of(input=Numbers(1, 2, 3), process=Chain(first, second),
+                                execute=Execution(batch_size=2)).solve()
+    assert ys(outputs) == [1, 16, 81]
+    assert first.batches == second.batches == [2, 1]
+
+
+def test_invalid_batch_size():
+    with pytest.raises(ValueError):
+        Execution(batch_size=0)
+
+
+def test_batching_skips_failed_batch():
+    execution = Execution(batch_size=4, errors="skip")
+    problem = SquaresProblem.of(input=Numbers(*VALUES), process=Square(fail=(5,)), execute=execution)
+    summary = problem.run()
+    assert summary.count == 6                   # the batch 4..7 is skipped as a whole
+    assert summary.errors == 4
+
+
+def test_run_reducers():
+    summary = SquaresProblem.of(input=Numbers(*VALUES), process=Square()).run(
+        Best(lambda o: o.y, largest=True), Tally(lambda o: o.y % 2))
+    assert summary.count == len(VALUES)
+    assert summary.reduced["Best"].x == 9
+    assert summary.reduced["Tally"] == {0: 5, 1: 5}
+
+
+def test_drain_writes_everything():
+    consumer = Collector()
+    count = SquaresProblem.of(input=Numbers(*VALUES), process=Square(), output=consumer).drain()
+    assert count == len(VALUES)
+    assert ys(consumer.items) == SQUARES
+
+
+def test_invalid_errors_policy():
+    with pytest.raises(ValueError):
+        Execution(errors="ignore")
+
+
+def read(merge: Merge, x: int = 0) -> list[int]:
+    return [item.x for item in merge.read(InputData(x))]
+
+
+def test_merge_fold():
+    assert read(Merge(Add(1), Add(10), Add(100))) == [111]
+
+
+def test_merge_latest():
+    assert read(Merge(Add(1), Add(10), Add(100), strategy="latest")) == [1, 11, 111]
+
+
+def test_merge_concat():
+    assert read(Merge(Numbers(1, 2), Numbers(), Numbers(3), strategy="concat")) == [1, 2, 3]
+
+
+def test_merge_interleave():
+    merge = Merge(Numbers(1, 2, 3), Numbers(10), Numbers(20, 21), strategy="interleave")
+    assert read(merge) == [1, 10, 20, 2, 21, 3]
+
+
+def test_merge_kmerge():
+    merge = Merge(Numbers(1, 4, 7), Numbers(2, 3, 9), Numbers(5), strategy="kmerge", key=lambda item: item.x)
+    assert read(merge) == [1, 2, 3, 4, 5, 7, 9]
+
+
+@pytest.mark.parametrize("strategy", ["interleave", "kmerge"])
+def test_merge_is_lazy(strategy):
+    merge = Merge(Counter(0, 2), Counter(1, 2), strategy=strategy, key=lambda item: item.x)
+    assert [item.x for item in islice(merge.read(InputData()), 6)] == [0, 1, 2, 3, 4, 5]
+
+
+def test_merge_in_pipeline():
+    merge = Merge(Numbers(3, 1), Numbers(2), strategy="concat")
+    assert ys(SquaresProblem.of(input=merge, process=Square()).solve()) == [9, 1, 4]
+
+
+def test_merge_invalid():
+    with pytest.raises(ValueError):
+        Merge(Numbers(1), strategy="zip")
+    with pytest.raises(TypeError):
+        Merge(Numbers(1), Square())
+
+
+@pytest.mark.parametrize("buffer", [0, 2])
+def test_tee_writes_all_consumers(buffer):
+    first, second = Collector(), Collector()
+    SquaresProblem.of(input=Numbers(*VALUES), process=Square(), output=Tee(first, second, buffer=buffer)).solve()
+    assert ys(first.items) == ys(second.items) == SQUARES
+    assert first.closed == second.closed == 1
+
+
+def test_components_named_by_position():
+    trace = Trace()
+    tee = Tee(Collector(), Collector())
+    merge = Merge(Numbers(1), Numbers(2), strategy="concat")
+    assert tee.names == ("Collector#0", "Collector#1")
+    assert merge.names == ("Numbers#0", "Numbers#1")
+    with ipo_context(trace_ctx, trace):
+        SquaresProblem.of(input=merge, process=Square(), output=tee).solve()
+    components = {(event.stage, event.component) for event in trace.events}
+    assert {("merge", "Numbers#0"), ("merge", "Numbers#1"),
+            ("tee", "Collector#0"), ("tee", "Collector#1")} <= components
+
+
+def test_default_stages_are_not_shared():
+    first, second = SquaresProblem.of(), SquaresProblem.of()
+    assert first.producer is not second.producer
+    assert first.consumer is not second.consumer
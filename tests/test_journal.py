@@ -0,0 +1,92 @@
+# (C) Alexander Voß, a.voss@fh-aachen.de, info@codebasedlearning.dev
+
+"""
+Tests of gropro.journal: resuming a pipeline and recovering a torn journal.
+"""
+
+import pytest
+from squares import Collector, InputData, Numbers, OutputData, Square, SquaresProblem
+
+from gropro import Journal
+
+VALUES = tuple(range(6))
+SQUARES = [x * x for x in VALUES]
+
+
+def crashed_run(path) -> None:
+    """ a run that stops at x=3, after 0, 1 and 2 were written """
+    with Journal(path) as journal:
+        problem = SquaresProblem.of(input=Numbers(*VALUES), process=Square(fail=(3,)), checkpoint=journal)
+        with pytest.raises(ValueError):
+            problem.solve()
+        assert len(journal) == 3
+
+
+@pytest.mark.parametrize("rewrite", [True, False])
+def test_resume(tmp_path, rewrite):
+    path = tmp_path / "run.journal"
+    crashed_run(path)
+    processor, consumer = Square(), Collector()
+    with Journal(path, rewrite=rewrite) as journal:
+        outputs = SquaresProblem.of(input=Numbers(*VALUES), process=processor, output=consumer,
+                                    checkpoint=journal).solve()
+        assert len(journal) == len(VALUES)
+    assert [o.y for o in outputs] == SQUARES
+    assert processor.calls == [3, 4, 5]
+    assert [o.x for o in consumer.items] == (list(VALUES) if rewrite else [3, 4, 5])
+
+
+def test_resume_completed_run(tmp_path):
+    path = tmp_path / "run.journal"
+    with Journal(path) as journal:
+        SquaresProblem.of(input=Numbers(*VALUES), process=Square(), checkpoint=journal).solve()
+    processor = Square()
+    with Journal(path) as journal:
+        outputs = SquaresProblem.of(input=Numbers(*VALUES), process=processor, checkpoint=journal).solve()
+    assert [o.y for o in outputs] == SQUARES
+    assert processor.calls == []
+
+
+def test_get_and_custom_key(tmp_path):
+    with Journal(tmp_path / "run.journal", key=lambda input_data: f"x={input_data.x}") as journal:
+        SquaresProblem.of(input=Numbers(2, 3), process=Square(), checkpoint=journal).solve()
+        assert list(journal) == ["x=2", "x=3"]
+        assert journal.get("x=3") == OutputData(3, 9)
+
+
+@pytest.mark.parametrize("cut", [1, 4, 8, 20])
+def test_torn_tail_is_dropped(tmp_path, cut):
+    path = tmp_path / "run.journal"
+    with Journal(path) as journal:
+        for x in range(3):
+            journal.append(f"k{x}", OutputData(x, x * x))
+    size = path.stat().st_size
+    with open(path, "r+b") as file:
+        file.truncate(size - cut)               # the last record was cut off by a crash
+    with Journal(path) as journal:
+        assert list(journal) == ["k0", "k1"]
+        journal.append("k2", OutputData(2, 4))
+    with Journal(path) as journal:
+        assert list(journal) == ["k0", "k1", "k2"]
+        assert journal.get("k1") == OutputData(1, 1)
+        assert journal.get("k2") == OutputData(2, 4)
+    assert path.stat().st_size == size
+
+
+def test_partial_header_is_dropped(tmp_path):
+    path = tmp_path / "run.journal"
+    with Journal(path) as journal:
+        journal.append("k0", OutputData(0, 0))
+    with open(path, "ab") as file:
+        file.write(b"\x02\x00\x00")
+    with Journal(path) as journal:
+        assert list(journal) == ["k0"]
+        journal.append("k1", OutputData(1, 1))
+    with Journal(path) as journal:
+        assert journal.get("k1") == OutputData(1, 1)
+
+
+def test_durable(tmp_path):
+    with Journal(tmp_path / "sub" / "run.journal", durable=True) as journal:
+        journal.append(repr(InputData(1)), OutputData(1, 1))
+        assert len(journal) == 1
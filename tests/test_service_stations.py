@@ -0,0 +1,138 @@
+# (C) Alexander Voß, a.voss@fh-aachen.de, info@codebasedlearning.dev
+
+"""
+Tests of the service stations solver (snippets/b_ipo/f_service_stations.py):
+the data files against the counts in their comments, the budgets, the
+parser and re-planning.
+"""
+
+import re
+
+import pytest
+from f_service_stations import (
+    DATA,
+    EXAMPLE_1,
+    FileProducer,
+    FolderProducer,
+    IncrementalCover,
+    InputData,
+    OutputData,
+    ServiceStationsProblem,
+    StationCoverSolver,
+    StreamProducer,
+)
+
+from gropro import Execution
+
+FILES = sorted(DATA.rglob("*.txt"))
+
+
+def solve(producer, execution: Execution | None = None, **budgets) -> list[OutputData]:
+    return ServiceStationsProblem.of(input=producer, process=StationCoverSolver(**budgets),
+                                     execute=execution or Execution()).solve()
+
+
+def expected(comment: str) -> int | None:
+    """ the size of the optimal cover, as given in '# ... => n; ...' """
+    match = re.search(r"=>\s*(\d+)", comment)
+    return int(match.group(1)) if match else None
+
+
+def assert_cover(input_data: InputData, stations: list[str]) -> None:
+    """ every train stops at one of the stations """
+    for t in range(input_data.train_count):
+        assert set(input_data.train(t)) & set(stations), input_data.train(t)
+
+
+@pytest.mark.parametrize("path", FILES, ids=[path.name for path in FILES])
+def test_data_files(path):
+    textblock = path.read_text(encoding="utf-8")
+    d, = solve(StreamProducer([(path.name, textblock)]))
+    assert d.optimal
+    assert_cover(InputData.of(path.name, textblock), d.service_stations)
+    if (n := expected(d.comment)) is not None:
+        assert len(d.service_stations) == n
+
+
+def test_inline_example():
+    d, = solve(StreamProducer([("example_1", EXAMPLE_1)]))
+    assert len(d.service_stations) == 2
+    assert_cover(InputData.of("example_1", EXAMPLE_1), d.service_stations)
+
+
+def test_folder_on_pool():
+    serial = solve(FolderProducer(DATA))
+    pooled = solve(FolderProducer(DATA), Execution(mode="process", workers=2))
+    assert [d.source for d in serial] == [d.source for d in pooled]
+    assert [len(d.service_stations) for d in serial] == [len(d.service_stations) for d in pooled]
+
+
+def test_budget_keeps_valid_cover():
+    path = DATA / "input_3_special" / "test_3_2.txt"
+    textblock = path.read_text(encoding="utf-8")
+    d, = solve(StreamProducer([(path.name, textblock)]), node_budget=1)
+    assert len(d.service_stations) >= d.lower_bound
+    assert_cover(InputData.of(path.name, textblock), d.service_stations)
+
+
+def test_time_budget_covers_the_reductions():
+    path = DATA / "input_3_special" / "test_3_2.txt"
+    textblock = path.read_text(encoding="utf-8")
+    d, = solve(StreamProducer([(path.name, textblock)]), time_budget=0.0)
+    assert not d.optimal
+    assert len(d.service_stations) >= d.lower_bound
+    assert_cover(InputData.of(path.name, textblock), d.service_stations)
+
+
+def test_parsing():
+    input_data = InputData.of("test", "\n# first\n# second\n hh ; H;;B\r\nK, ffm ,\n\t\nHH,H;X\n  \n")
+    assert input_data.comment == "# first"
+    assert input_data.names == ["HH", "H", "B", "K", "FFM", "HH,H", "X"]
+    assert [input_data.train(t) for t in range(input_data.train_count)] == \
+        [["HH", "H", "B"], ["K", "FFM"], ["HH,H", "X"]]
+
+
+def test_file_and_text_are_parsed_alike(tmp_path):
+    path = tmp_path / "example.txt"
+    path.write_text(EXAMPLE_1, encoding="utf-8")
+    (tmp_path / "empty.txt").write_bytes(b"")
+    parsed, empty = FileProducer(path, tmp_path / "empty.txt").read(None)
+    assert parsed == InputData.of("example.txt", EXAMPLE_1)
+    assert empty.train_count == 0
+
+
+def test_replan_matches_fresh_solve():
+    trains = [line for line in EXAMPLE_1.splitlines() if line and not line.startswith("#")]
+    with IncrementalCover.of(InputData.of("example_1", EXAMPLE_1)) as solver:
+        solver.replan()
+        for edit, train in (("-", "HH,FFM,M"), ("+", "K,DA"), ("-", "K,FFM,S"), ("+", "B,L,S")):
+            if edit == "+":
+                solver.add(train.split(","))
+                trains.append(train)
+            else:
+                solver.remove(train.split(","))
+                trains.remove(train)
+            solver.replan()
+            textblock = "\n".join(trains) + "\n"
+            d, = solve(StreamProducer([("edited", textblock)]))
+            assert solver.optimal
+            assert len(solver.cover) == len(d.service_stations)
+            assert_cover(InputData.of("edited", textblock), solver.cover)
+
+
+def test_remove_unknown_train():
+    with IncrementalCover.of(InputData.of("example_1", EXAMPLE_1)) as solver:
+        with pytest.raises(ValueError):
+            solver.remove(["X", "Y"])
+
+
+@pytest.mark.parametrize("path", FILES, ids=[path.name for path in FILES])
+def test_replan_on_pool_matches_fresh_solve(path):
+    textblock = path.read_text(encoding="utf-8")
+    d, = solve(StreamProducer([(path.name, textblock)]))
+    with IncrementalCover.of(InputData.of(path.name, textblock),
+                             execution=Execution(mode="thread", workers=2)) as solver:
+        solver.replan()
+        assert solver.optimal
+        assert len(solver.cover) == len(d.service_stations)
+        assert_cover(InputData.of(path.name, textblock), solver.cover)
@@ -0,0 +1,33 @@
+# (C) Alexander Voß, a.voss@fh-aachen.de, info@codebasedlearning.dev
+
+"""
+Tests of the service stations network generator (snippets/b_ipo/g_service_stations_bench.py).
+"""
+
+import random
+
+import pytest
+from f_service_stations import FileProducer, ServiceStationsProblem, StationCoverSolver
+from g_service_stations_bench import generate_network, write_network
+
+
+def test_network_is_seeded():
+    network = generate_network(400, 300, 0.6, random.Random(1))
+    assert network == generate_network(400, 300, 0.6, random.Random(1))
+    assert len(network) == 300
+    assert all(len(train) >= 2 and all(0 <= int(name[1:]) < 400 for name in train) for train in network)
+
+
+def test_written_network_is_solved(tmp_path):
+    path = tmp_path / "net.txt"
+    network = generate_network(200, 100, 0.2, random.Random(2))
+    write_network(path, network, "generated")
+    d, = ServiceStationsProblem.of(input=FileProducer(path), process=StationCoverSolver()).solve()
+    assert d.comment == "# generated"
+    assert d.optimal
+    assert all(set(train) & set(d.service_stations) for train in network)
+
+
+def test_invalid_overlap():
+    with pytest.raises(ValueError):
+        generate_network(100, 10, 0.0, random.Random(0))
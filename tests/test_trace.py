@@ -0,0 +1,144 @@
+# (C) Alexander Voß, a.voss@fh-aachen.de, info@codebasedlearning.dev
+
+"""
+Tests of gropro.trace, the Profiler and the debug logging of IPO.stream.
+"""
+
+import json
+import logging
+
+import pytest
+import squares
+from squares import Collector, Numbers, Square, SquaresProblem
+
+from gropro import Chain, Execution, Hooks, Profiler, StageTotals, Tee, Trace, ipo_context, trace_ctx
+from gropro import trace as trace_module
+
+VALUES = tuple(range(5))
+
+
+def solve(**kwargs) -> list[int]:
+    problem = SquaresProblem.of(input=Numbers(*VALUES), process=Square(), output=Collector(), **kwargs)
+    return [o.y for o in problem.solve()]
+
+
+def test_trace_records_every_stage():
+    trace = Trace()
+    with ipo_context(trace_ctx, trace):
+        solve()
+    events = [(event.stage, event.component) for event in trace.events]
+    for stage, component in (("input", "Numbers"), ("process", "Square"), ("output", "Collector")):
+        assert events.count((stage, component)) == len(VALUES)
+    assert all(event.seconds >= 0 and event.size > 0 for event in trace.events)
+    assert set(trace.totals()) == {("input", "Numbers"), ("process", "Square"), ("output", "Collector")}
+
+
+def test_trace_without_sizes():
+    trace = Trace(with_sizes=False)
+    with ipo_context(trace_ctx, trace):
+        solve()
+    assert all(event.size == 0 for event in trace.events)
+
+
+def test_chain_records_each_processor():
+    trace = Trace()
+    with ipo_context(trace_ctx, trace):
+        problem = SquaresProblem.of(input=Numbers(2), process=Chain(Square(), Square()))
+        assert [o.y for o in problem.solve()] == [16]
+    assert [event.component for event in trace.events if event.stage == "chain"] == ["Square#0", "Square#1"]
+
+
+def test_stage_totals_and_hooks():
+    totals, trace = StageTotals(), Trace()
+    with ipo_context(trace_ctx, Hooks(totals, trace)):
+        solve()
+    assert totals.counts == {"input": 5, "process": 5, "output": 5}
+    assert len(trace.events) == 15
+
+
+def test_hook_is_reset_after_context():
+    with ipo_context(trace_ctx, Trace()):
+        pass
+    assert trace_ctx.get() is None
+
+
+def test_debug_logging(caplog):
+    with caplog.at_level(logging.DEBUG, logger="ipo"):
+        assert solve() == [x * x for x in VALUES]
+    messages = [record.getMessage() for record in caplog.records if record.name == "ipo"]
+    assert sum("read from" in message for message in messages) == len(VALUES)
+    assert sum("write to" in message for message in messages) == len(VALUES)
+
+
+def test_disabled_logging_formats_nothing(monkeypatch, caplog):
+    def no_repr(self):
+        raise AssertionError("data formatted although logging is off")
+
+    for cls in (squares.InputData, squares.ProcessData, squares.OutputData):
+        monkeypatch.setattr(cls, "__repr__", no_repr)
+    with caplog.at_level(logging.INFO, logger="ipo"):
+        assert solve() == [x * x for x in VALUES]
+    with caplog.at_level(logging.DEBUG, logger="ipo"), pytest.raises(AssertionError):
+        solve()
+
+
+def rows(profiler: Profiler) -> dict[tuple[str, str], dict]:
+    return {(row["stage"], row["component"]): row for row in profiler.report()["stages"]}
+
+
+def test_profiler_percentiles():
+    profiler = Profiler()
+    for ms in range(100, 0, -1):
+        profiler.record("process", "Square", ms / 1000, None)
+    row = rows(profiler)[("process", "Square")]
+    assert row["calls"] == 100
+    assert row["mean_s"] == pytest.approx(0.0505)
+    assert (row["p50_s"], row["p90_s"], row["p99_s"], row["max_s"]) == (0.05, 0.09, 0.099, 0.1)
+
+
+def test_profiler_items_per_s_per_component(monkeypatch):
+    clock = iter([1.0, 2.0, 3.0, 10.0, 20.0])
+    monkeypatch.setattr(trace_module, "perf_counter", lambda: next(clock))
+    profiler = Profiler()
+    for _ in range(3):
+        profiler.record("input", "Numbers", 0.0, None)          # 3 calls from 1s to 3s
+    profiler.record("output", "Collector", 0.0, None)           # 2 calls from 10s to 20s
+    profiler.record("output", "Collector", 0.0, None)
+    stages = rows(profiler)
+    assert stages[("input", "Numbers")]["items_per_s"] == 1.5
+    assert stages[("output", "Collector")]["items_per_s"] == 0.2
+    assert profiler.report()["wall_time_s"] == 19.0
+
+
+def test_profiler_peak_queue_depths():
+    profiler = Profiler()
+    for depth in (1, 3, 2):
+        profiler.queue_depth("tee[0]", depth)
+    profiler.queue_depth("tee[1]", 0)
+    assert profiler.report()["peak_queue_depths"] == {"tee[0]": 3, "tee[1]": 0}
+
+
+def test_profiler_writes_json_on_finish(tmp_path):
+    profiler = Profiler(path=tmp_path / "profile.json")
+    with ipo_context(trace_ctx, profiler):
+        problem = SquaresProblem.of(input=Numbers(*VALUES), process=Square(),
+                                    output=Tee(Collector(), Collector(), buffer=2),
+                                    execute=Execution(mode="thread", workers=2))
+        problem.drain()
+    with open(profiler.path, encoding="utf-8") as file:
+        report = json.load(file)
+    components = {(row["stage"], row["component"]): row["calls"] for row in report["stages"]}
+    assert components[("input", "Numbers")] == components[("process", "Square")] == len(VALUES)
+    assert components[("tee", "Collector#0")] == components[("tee", "Collector#1")] == len(VALUES)
+    assert report["peak_queue_depths"]
+    assert report == json.loads(json.dumps(profiler.report()))
+
+
+def test_profiler_format():
+    profiler = Profiler()
+    profiler.record("process", "Square", 0.002, None)
+    profiler.queue_depth("tee[0]", 4)
+    lines = profiler.format().splitlines()
+    assert lines[0].split() == ["stage", "component", "calls", "total", "ms", "p50", "µs", "p99", "µs", "items/s"]
+    assert lines[1].split()[:5] == ["process", "Square", "1", "2.000", "2000.0"]
+    assert lines[2] == "peak depth of 'tee[0]': 4"
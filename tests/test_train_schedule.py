@@ -0,0 +1,58 @@
+# (C) Alexander Voß, a.voss@fh-aachen.de, info@codebasedlearning.dev
+
+"""
+Tests of the train schedule solver (snippets/b_ipo/h_train_schedule.py): the
+plans of the task examples.
+"""
+
+import pytest
+from h_train_schedule import (
+    EXAMPLE_1,
+    EXAMPLE_2,
+    EXAMPLE_3,
+    OutputData,
+    StreamProducer,
+    TimetableSolver,
+    TrainScheduleProblem,
+    format_output,
+)
+
+EXAMPLES = {"example_1": EXAMPLE_1, "example_2": EXAMPLE_2, "example_3": EXAMPLE_3}
+
+
+def solve(textblock: str) -> OutputData:
+    output_data, = TrainScheduleProblem.of(input=StreamProducer([("test", textblock)]),
+                                           process=TimetableSolver()).solve()
+    return output_data
+
+
+@pytest.mark.parametrize("textblock", EXAMPLES.values(), ids=EXAMPLES.keys())
+def test_waiting_plans_have_no_collisions(textblock):
+    d = solve(textblock)
+    assert [plan.name for plan in d.plans] == ["Einfache Fahrt", "Einseitiges Warten", "Beidseitiges Warten"]
+    for plan in d.plans[1:]:
+        assert plan.collisions == []
+        assert plan.forward.duration == d.min_duration + plan.forward.total_wait
+        assert plan.backward.duration == d.min_duration + plan.backward.total_wait
+
+
+@pytest.mark.parametrize("textblock, collisions, scores", [
+    (EXAMPLE_1, [], [0, 0, 0]),
+    (EXAMPLE_2, [1], [0, 256, 0]),
+    (EXAMPLE_3, [0, 3], [0, 64, 32]),
+], ids=EXAMPLES.keys())
+def test_scores(textblock, collisions, scores):
+    d = solve(textblock)
+    assert d.plans[0].collisions == collisions
+    assert [plan.score for plan in d.plans] == scores
+
+
+def test_two_sided_is_not_worse():
+    for textblock in EXAMPLES.values():
+        _, one_sided, two_sided = solve(textblock).plans
+        assert two_sided.score <= one_sided.score
+
+
+def test_format_output():
+    text = format_output(solve(EXAMPLE_3))
+    assert "Beidseitiges Warten" in text